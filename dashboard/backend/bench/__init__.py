@@ -0,0 +1 @@
+"""Benchmarks du backend : base synthétique (seed) et charge HTTP par endpoint (run)."""
@@ -0,0 +1,43 @@
+-- ============================================
+-- BENCHMARK: N8N CORE TABLES
+-- ============================================
+-- portfolio_items et portfolio_events sont créées par les workflows n8n en production.
+-- Version minimale (colonnes lues par le backend) pour une base de benchmark autonome.
+CREATE TABLE IF NOT EXISTS portfolio_items (
+    id SERIAL PRIMARY KEY,
+    repo VARCHAR(200) UNIQUE NOT NULL,
+    title VARCHAR(300) NOT NULL,
+    short_pitch TEXT NOT NULL,
+    long_desc TEXT NOT NULL,
+    tags TEXT[] DEFAULT '{}',
+    stack TEXT[] DEFAULT '{}',
+    impact TEXT NOT NULL DEFAULT '',
+    github_url VARCHAR(500) NOT NULL,
+    github_stars INTEGER DEFAULT 0,
+    github_forks INTEGER DEFAULT 0,
+    github_language VARCHAR(50),
+    last_commit_date TIMESTAMP,
+    ai_confidence_score NUMERIC(4, 3) DEFAULT 0,
+    status VARCHAR(30) DEFAULT 'draft',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    human_reviewed BOOLEAN DEFAULT FALSE,
+    business_metrics JSONB DEFAULT '{}',
+    technical_metrics JSONB DEFAULT '{}',
+    achievements JSONB DEFAULT '[]',
+    complexity_score INTEGER DEFAULT 3,
+    team_size INTEGER DEFAULT 1,
+    project_duration_months INTEGER DEFAULT 1,
+    demo_url VARCHAR(500),
+    live_url VARCHAR(500)
+);
+
+CREATE TABLE IF NOT EXISTS portfolio_events (
+    id BIGSERIAL PRIMARY KEY,
+    ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    source VARCHAR(50) NOT NULL,
+    repo VARCHAR(200),
+    action VARCHAR(100) NOT NULL,
+    payload JSONB,
+    status VARCHAR(30) DEFAULT 'ok'
+);
@@ -0,0 +1,167 @@
+"""Faux serveur de l'API GitHub pour tester github_sync sans réseau ni quota.
+
+Sert /users/<user>/repos (paginé, en-tête Link) et /repos/<owner>/<name>/readme avec ETag,
+réponses 304 sur If-None-Match et en-têtes X-RateLimit-*. POST /_touch/<name> simule un push
+(pushed_at et README modifiés), POST /_ratelimit?remaining=0&reset=<epoch> épuise le quota.
+
+Usage (depuis dashboard/backend) :
+    python -m bench.fake_github --repos 250 --port 8765
+    GITHUB_API_URL=http://127.0.0.1:8765 GITHUB_USERNAME=bench uvicorn main:app --port 8000
+"""
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+RATE_LIMIT = 5000
+
+
+class FakeGitHub:
+    """Dépôts en mémoire ; chaque réponse 200 ou 304 est comptée"""
+
+    def __init__(self, username: str = "bench", repos: int = 10, per_page_max: int = 100):
+        self.username = username
+        self.per_page_max = per_page_max
+        self.lock = threading.Lock()
+        started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.repos: Dict[str, dict] = {}
+        self.readmes: Dict[str, str] = {}
+        for index in range(repos):
+            name = f"project-{index:03d}"
+            self.repos[name] = {
+                "name": name,
+                "full_name": f"{username}/{name}",
+                "html_url": f"https://github.com/{username}/{name}",
+                "description": f"Synthetic project {index}",
+                "fork": index % 7 == 6,
+                "stargazers_count": index % 5,
+                "forks_count": index % 3,
+                "language": ("Python", "TypeScript", "Go")[index % 3],
+                "topics": ["bench"],
+                "pushed_at": (started + timedelta(days=index)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            self.readmes[name] = f"# {name}\n\nSynthetic README, revision 0.\n"
+        self.remaining = RATE_LIMIT
+        self.reset = int(time.time()) + 3600
+        self.hits: Dict[int, int] = {}
+
+    def touch(self, name: str):
+        with self.lock:
+            repo = self.repos[name]
+            pushed = datetime.fromisoformat(repo["pushed_at"].replace("Z", "+00:00")) + timedelta(seconds=1)
+            repo["pushed_at"] = max(pushed, datetime.now(timezone.utc)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.readmes[name] += f"\nRevision {repo['pushed_at']}.\n"
+
+    def rate_limit_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(RATE_LIMIT),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+
+    def resource(self, path: str, query: dict) -> Tuple[int, Optional[object], Dict[str, str]]:
+        """(statut, corps JSON, en-têtes) d'un GET, avant la gestion de l'ETag"""
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "users" and parts[2] == "repos":
+            if parts[1] != self.username:
+                return 404, {"message": "Not Found"}, {}
+            per_page = min(int(query.get("per_page", ["30"])[0]), self.per_page_max)
+            page = int(query.get("page", ["1"])[0])
+            repos = sorted(self.repos.values(), key=lambda repo: repo["pushed_at"], reverse=True)
+            body = repos[(page - 1) * per_page:page * per_page]
+            headers = {}
+            if page * per_page < len(repos):
+                headers["Link"] = (f'<{path}?per_page={per_page}&page={page + 1}>; rel="next"')
+            return 200, body, headers
+        if len(parts) == 4 and parts[0] == "repos" and parts[3] == "readme":
+            readme = self.readmes.get(parts[2]) if parts[1] == self.username else None
+            if readme is None:
+                return 404, {"message": "Not Found"}, {}
+            return 200, {
+                "name": "README.md",
+                "encoding": "base64",
+                "content": base64.encodebytes(readme.encode()).decode(),
+            }, {}
+        return 404, {"message": "Not Found"}, {}
+
+
+def make_handler(fake: FakeGitHub):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def reply(self, status: int, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if body is not None:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body is not None:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            with fake.lock:
+                if fake.remaining <= 0 and time.time() < fake.reset:
+                    fake.hits[403] = fake.hits.get(403, 0) + 1
+                    return self.reply(403, b'{"message": "API rate limit exceeded"}', fake.rate_limit_headers())
+                if fake.remaining <= 0:
+                    fake.remaining, fake.reset = RATE_LIMIT, int(time.time()) + 3600
+                status, payload, headers = fake.resource(url.path, parse_qs(url.query))
+                body = json.dumps(payload).encode()
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, None  # comme GitHub, un 304 ne décompte pas le quota
+                else:
+                    fake.remaining -= 1
+                fake.hits[status] = fake.hits.get(status, 0) + 1
+                headers = {**headers, **fake.rate_limit_headers()}
+                if status in (200, 304):
+                    headers["ETag"] = etag
+            self.reply(status, body, headers)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path.startswith("/_touch/"):
+                fake.touch(url.path[len("/_touch/"):])
+            elif url.path == "/_ratelimit":
+                query = parse_qs(url.query)
+                with fake.lock:
+                    fake.remaining = int(query.get("remaining", ["0"])[0])
+                    fake.reset = int(query.get("reset", [str(int(time.time()) + 60)])[0])
+            elif url.path == "/_hits":
+                pass
+            else:
+                return self.reply(404, b'{"message": "Not Found"}')
+            with fake.lock:
+                body = json.dumps({str(status): count for status, count in fake.hits.items()}).encode()
+            self.reply(200, body)
+
+    return Handler
+
+
+def serve(fake: FakeGitHub, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Démarrer le serveur dans un thread ; l'URL de base est http://host:server.server_port"""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake GitHub API for the incremental sync")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FakeGitHub(args.username, args.repos)))
+    print(f"Fake GitHub API for {args.username} ({args.repos} repos) on http://{args.host}:{args.port}")
+    server.serve_forever()
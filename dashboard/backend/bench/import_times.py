@@ -0,0 +1,106 @@
+"""Temps d'import du backend par module (démarrage à froid d'un worker uvicorn).
+
+Usage (depuis dashboard/backend) :
+    python -m bench.import_times --runs 5 --top 20
+    python -m bench.import_times --budget 400   # code de sortie 1 si `import main` dépasse 400 ms
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Modules qui ne doivent jamais être importés au démarrage (chargés au premier usage)
+LAZY_MODULES = ("reportlab", "pdf_render")
+
+CHECK_LAZY = (
+    "import json, sys, main; "
+    f"print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({LAZY_MODULES!r}))))"
+)
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int, int]]:
+    """(module, profondeur, self µs, cumulé µs) d'après python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def direct_imports(rows: List[Tuple[str, int, int, int]], module: str) -> Dict[str, int]:
+    """Imports de premier niveau du module (cumulé µs) ; les lignes d'un module précèdent la sienne"""
+    end = max(index for index, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return {name: cumulative for name, depth, _, cumulative in rows[start:end] if depth == 1}
+
+
+def median_ms(values: List[int]) -> float:
+    return round(statistics.median(values) / 1000, 1)
+
+
+def main(args) -> int:
+    totals: List[int] = []
+    direct: Dict[str, List[int]] = defaultdict(list)
+    self_times: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(args.runs):
+        rows = import_profile(args.module)
+        totals.append(next(cumulative for name, depth, _, cumulative in reversed(rows)
+                           if name == args.module and depth == 0))
+        for name, cumulative in direct_imports(rows, args.module).items():
+            direct[name].append(cumulative)
+        for name, _, self_us, _ in rows:
+            self_times[name].append(self_us)
+
+    total_ms = median_ms(totals)
+    print(f"import {args.module}: {total_ms} ms (median of {args.runs} runs)\n")
+    print("Direct imports (cumulative ms)")
+    for name, values in sorted(direct.items(), key=lambda item: -statistics.median(item[1]))[:args.top]:
+        print(f"  {name:<40} {median_ms(values):>8}")
+    print("\nSlowest modules (self ms)")
+    for name, values in sorted(self_times.items(), key=lambda item: -statistics.median(item[1]))[:args.top]:
+        print(f"  {name:<40} {median_ms(values):>8}")
+
+    loaded = json.loads(subprocess.run(
+        [sys.executable, "-c", CHECK_LAZY], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout)
+    status = 0
+    if loaded:
+        print(f"\nImported at startup but expected to be lazy: {', '.join(loaded)}")
+        status = 1
+    if args.budget is not None and total_ms > args.budget:
+        print(f"\nimport {args.module} took {total_ms} ms, over the {args.budget} ms budget")
+        status = 1
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "module": args.module,
+            "total_ms": total_ms,
+            "direct_ms": {name: median_ms(values) for name, values in direct.items()},
+            "eager_lazy_modules": loaded,
+        }, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report backend import time per module")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, help="Fail if the median import time exceeds this (ms)")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    sys.exit(main(parser.parse_args()))
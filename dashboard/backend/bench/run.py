@@ -0,0 +1,308 @@
+"""Charge HTTP par endpoint : débit et latences p50/p95/p99, résultats enregistrés en JSON.
+
+Le backend doit tourner sur la base de benchmark (DB_NAME=portfolio_bench, voir bench.seed).
+Usage (depuis dashboard/backend) :
+    python -m bench.run --concurrency 16 --duration 10 --label baseline
+    python -m bench.run --routes /api/blog /api/search --compare bench/results/<run>.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from bench.seed import BENCH_DB_NAME, connect
+
+RESULTS_DIR = Path(__file__).with_name("results")
+
+# (méthode, url, corps JSON)
+Request = Tuple[str, str, Optional[object]]
+RouteKey = Tuple[str, str]
+
+# Routes qui modifient le contenu éditorial : exclues sauf --writes
+WRITE_ROUTES = {
+    ("PUT", "/api/portfolio/{item_id}/status"),
+    ("PUT", "/api/profile"),
+    ("POST", "/api/timeline"),
+    ("POST", "/api/contact"),
+    ("POST", "/api/github/sync"),
+    ("POST", "/api/github/sync/commit"),
+    ("POST", "/api/projects/bulk"),
+    ("POST", "/api/summaries"),
+    ("DELETE", "/api/summaries/{repo_full_name:path}"),
+}
+
+
+class Fixtures:
+    """Identifiants réels de la base de benchmark, tirés au hasard par les scénarios"""
+
+    async def load(self):
+        conn = await connect(BENCH_DB_NAME)
+        try:
+            self.item_ids = [r['id'] for r in await conn.fetch("SELECT id FROM portfolio_items ORDER BY random() LIMIT 200")]
+            self.project_slugs = [r['slug'] for r in await conn.fetch(
+                "SELECT slug FROM projects WHERE is_published = TRUE ORDER BY random() LIMIT 200")]
+            self.blog_slugs = [r['slug'] for r in await conn.fetch(
+                "SELECT slug FROM blog_posts WHERE is_published = TRUE ORDER BY random() LIMIT 200")]
+            self.session_ids = [str(r['id']) for r in await conn.fetch("SELECT id FROM visitor_sessions LIMIT 1000")]
+            self.content_types = [r['content_type'] for r in await conn.fetch(
+                "SELECT DISTINCT content_type FROM mode_content_overrides")] or ["hero_pitch"]
+        finally:
+            await conn.close()
+
+
+def analytics_event(fixtures: Fixtures) -> dict:
+    return {
+        "session_id": random.choice(fixtures.session_ids),
+        "event_type": random.choice(["page_view", "project_click", "scroll"]),
+        "event_category": "engagement",
+        "portfolio_mode": random.choice(["cdi", "freelance"]),
+        "page_url": "/",
+        "target_type": None, "target_id": None, "event_label": None, "event_value": None,
+        "referrer_url": None, "metadata": {"bench": True}
+    }
+
+
+def synced_project(slug: str) -> dict:
+    """Projet tel qu'envoyé par la synchronisation GitHub (étoiles aléatoires : mises à jour et lignes inchangées)"""
+    return {
+        "title": slug.replace("-", " ").title(), "slug": slug, "short_description": "Benchmark",
+        "long_description": None, "github_url": f"https://github.com/bench/{slug}", "github_repo_name": slug,
+        "github_stars": random.choice([0, 1]), "github_forks": 0, "github_language": "Python",
+        "category": "automation", "technologies": ["python"], "business_impact": None
+    }
+
+
+def summary_input(f: Fixtures) -> dict:
+    """Contenu d'un dépôt soumis au cache des résumés (un slug = une entrée)"""
+    slug = random.choice(f.project_slugs)
+    return {"repo_full_name": f"bench/{slug}", "repo_description": "Benchmark", "readme_text": f"# {slug}\n"}
+
+
+def scenarios(f: Fixtures) -> Dict[RouteKey, Callable[[], Request]]:
+    """Une requête représentative par route de main.py"""
+    mode = lambda: random.choice(["cdi", "freelance"])
+    return {
+        ("GET", "/"): lambda: ("GET", "/", None),
+        ("GET", "/api/portfolio"): lambda: ("GET", "/api/portfolio?limit=50", None),
+        ("GET", "/api/portfolio/{item_id}"): lambda: ("GET", f"/api/portfolio/{random.choice(f.item_ids)}", None),
+        ("GET", "/api/stats"): lambda: ("GET", "/api/stats", None),
+        ("GET", "/api/events"): lambda: ("GET", "/api/events?limit=20", None),
+        ("PUT", "/api/portfolio/{item_id}/status"): lambda: (
+            "PUT", f"/api/portfolio/{random.choice(f.item_ids)}/status?status=approved", None),
+        ("GET", "/api/export/pdf/{item_id}"): lambda: ("GET", f"/api/export/pdf/{random.choice(f.item_ids)}", None),
+        ("GET", "/api/export/portfolio-summary"): lambda: ("GET", "/api/export/portfolio-summary", None),
+        ("GET", "/api/export/json"): lambda: ("GET", "/api/export/json?stream=true", None),
+        ("GET", "/api/share/linkedin/{item_id}"): lambda: ("GET", f"/api/share/linkedin/{random.choice(f.item_ids)}", None),
+        ("GET", "/api/share/stackoverflow/{item_id}"): lambda: (
+            "GET", f"/api/share/stackoverflow/{random.choice(f.item_ids)}", None),
+        ("GET", "/api/share/twitter/{item_id}"): lambda: ("GET", f"/api/share/twitter/{random.choice(f.item_ids)}", None),
+        ("GET", "/api/social-analytics"): lambda: ("GET", "/api/social-analytics", None),
+        ("GET", "/api/profile"): lambda: ("GET", "/api/profile", None),
+        ("PUT", "/api/profile"): lambda: ("PUT", "/api/profile", {"availability": "Disponible"}),
+        ("GET", "/api/timeline"): lambda: ("GET", "/api/timeline", None),
+        ("POST", "/api/timeline"): lambda: ("POST", "/api/timeline", {
+            "date": "2024-01-01", "title": "Bench", "category": "work", "tags": ["bench"]}),
+        ("GET", "/api/skills"): lambda: ("GET", "/api/skills", None),
+        ("GET", "/api/skills/grouped"): lambda: ("GET", "/api/skills/grouped", None),
+        ("GET", "/api/social-links"): lambda: ("GET", "/api/social-links", None),
+        ("GET", "/api/projects"): lambda: ("GET", "/api/projects", None),
+        ("GET", "/api/projects/{slug}"): lambda: ("GET", f"/api/projects/{random.choice(f.project_slugs)}", None),
+        ("GET", "/api/blog"): lambda: ("GET", "/api/blog?limit=10", None),
+        ("GET", "/api/blog/{slug}"): lambda: ("GET", f"/api/blog/{random.choice(f.blog_slugs)}", None),
+        ("GET", "/api/testimonials"): lambda: ("GET", "/api/testimonials", None),
+        ("GET", "/api/github-stats"): lambda: ("GET", "/api/github-stats", None),
+        ("POST", "/api/contact"): lambda: ("POST", "/api/contact", {
+            "name": "Bench", "email": "bench@example.com", "company": None, "subject": None,
+            "message": "Benchmark", "contact_reason": None}),
+        ("GET", "/api/modes"): lambda: ("GET", "/api/modes", None),
+        ("GET", "/api/content"): lambda: ("GET", f"/api/content?mode={mode()}&types=hero_pitch,title,availability", None),
+        ("GET", "/api/content/{content_type}"): lambda: (
+            "GET", f"/api/content/{random.choice(f.content_types)}?mode={mode()}", None),
+        ("GET", "/api/mode-projects"): lambda: ("GET", f"/api/mode-projects?mode={mode()}", None),
+        ("POST", "/api/analytics/event"): lambda: ("POST", "/api/analytics/event", analytics_event(f)),
+        ("POST", "/api/analytics/events"): lambda: (
+            "POST", "/api/analytics/events", [analytics_event(f) for _ in range(20)]),
+        ("POST", "/api/analytics/session"): lambda: ("POST", "/api/analytics/session", {
+            "landing_page": "/", "landing_mode": mode(), "referrer_source": "bench", "utm_source": None,
+            "utm_medium": None, "utm_campaign": None, "user_agent": "bench", "device_type": "desktop",
+            "browser": None, "os": None, "screen_resolution": None, "ip_address": None}),
+        ("PATCH", "/api/analytics/session/{session_id}"): lambda: (
+            "PATCH", f"/api/analytics/session/{random.choice(f.session_ids)}", {"page_views": 1}),
+        ("GET", "/api/analytics/summary"): lambda: ("GET", f"/api/analytics/summary?days={random.choice([7, 30, 90])}", None),
+        ("GET", "/api/analytics/mode-comparison"): lambda: ("GET", "/api/analytics/mode-comparison", None),
+        ("GET", "/api/search"): lambda: (
+            "GET", f"/api/search?q={random.choice(['python', 'machine learning', 'docker', 'pipeline production'])}", None),
+        ("GET", "/api/bundle/home"): lambda: ("GET", f"/api/bundle/home?mode={mode()}", None),
+        ("POST", "/api/github/sync"): lambda: ("POST", "/api/github/sync", None),
+        ("POST", "/api/github/sync/commit"): lambda: ("POST", "/api/github/sync/commit", {"watermarks": []}),
+        ("POST", "/api/projects/bulk"): lambda: ("POST", "/api/projects/bulk", [
+            synced_project(slug) for slug in random.sample(f.project_slugs, min(20, len(f.project_slugs)))]),
+        ("POST", "/api/summaries/lookup"): lambda: ("POST", "/api/summaries/lookup", summary_input(f)),
+        ("POST", "/api/summaries"): lambda: ("POST", "/api/summaries", {
+            **summary_input(f), "summary": {"title": "Bench"}, "inference_ms": 3000}),
+        ("GET", "/api/summaries/stats"): lambda: ("GET", "/api/summaries/stats", None),
+        ("DELETE", "/api/summaries/{repo_full_name:path}"): lambda: (
+            "DELETE", f"/api/summaries/bench/{random.choice(f.project_slugs)}", None),
+        ("GET", "/metrics"): lambda: ("GET", "/metrics", None),
+    }
+
+
+def app_routes() -> List[RouteKey]:
+    """Routes déclarées dans main.py (pour signaler celles sans scénario)"""
+    from fastapi.routing import APIRoute
+    from main import app
+    return [
+        (method, route.path)
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def drive(client: httpx.AsyncClient, build: Callable[[], Request], concurrency: int, duration: float):
+    """Boucle fermée : `concurrency` clients enchaînent les requêtes pendant `duration` secondes"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            method, url, body = build()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(method: str, path: str, latencies: List[float], statuses: Counter, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 400)
+    return {
+        "method": method,
+        "route": path,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1e3, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1e3, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1e3, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1e3, 2),
+        "max_ms": round(latencies[-1] * 1e3, 2) if latencies else 0.0,
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: List[dict], previous: Dict[RouteKey, dict]):
+    print(f"{'route':<48} {'req':>7} {'err':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for r in results:
+        line = (f"{r['method'] + ' ' + r['route']:<48} {r['requests']:>7} {r['errors']:>5} {r['rps']:>9.1f} "
+                f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+        before = previous.get((r['method'], r['route']))
+        if before and before['p95_ms'] and before['rps']:
+            line += (f"   rps {100 * (r['rps'] / before['rps'] - 1):+.0f}%"
+                     f" p95 {100 * (r['p95_ms'] / before['p95_ms'] - 1):+.0f}%")
+        print(line)
+
+
+async def main(args):
+    fixtures = Fixtures()
+    await fixtures.load()
+    plan = scenarios(fixtures)
+
+    missing = [key for key in app_routes() if key not in plan]
+    if missing:
+        print("Routes without a benchmark scenario:", ", ".join(f"{m} {p}" for m, p in missing))
+
+    selected = [
+        key for key in plan
+        if (args.writes or key not in WRITE_ROUTES)
+        and (not args.routes or any(pattern in key[1] for pattern in args.routes))
+    ]
+
+    previous: Dict[RouteKey, dict] = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        previous = {(r['method'], r['route']): r for r in baseline['results']}
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        for method, path in selected:
+            build = plan[(method, path)]
+            if args.warmup:
+                await drive(client, build, args.concurrency, args.warmup)
+            latencies, statuses, elapsed = await drive(client, build, args.concurrency, args.duration)
+            results.append(summarize(method, path, latencies, statuses, elapsed))
+            print(f"  {method} {path}: {results[-1]['rps']} rps, p95 {results[-1]['p95_ms']} ms")
+
+    print()
+    print_table(results, previous)
+
+    run = {
+        "meta": {
+            "label": args.label,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "python": platform.python_version(),
+            "host": platform.node(),
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now():%Y%m%d-%H%M%S}{'-' + args.label if args.label else ''}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run, indent=2))
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every backend route")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per route")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds per route (caches, pool)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--routes", nargs="*", help="Only routes whose path contains one of these strings")
+    parser.add_argument("--writes", action="store_true", help="Also benchmark routes that modify content")
+    parser.add_argument("--label", default="", help="Name of the run, added to the output file name")
+    parser.add_argument("--output", help="Output JSON file (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to diff against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,272 @@
+"""Crée la base de benchmark : schémas sql/phase1 à phase4 puis données synthétiques.
+
+Usage (depuis dashboard/backend) :
+    python -m bench.seed --scale 1 --reset
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import asyncpg
+
+import db
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "portfolio_bench")
+
+# dashboard/backend/bench -> racine du dépôt
+SQL_DIR = Path(os.getenv("BENCH_SQL_DIR", Path(__file__).resolve().parents[3] / "sql"))
+CORE_SCHEMA = Path(__file__).with_name("core_schema.sql")
+
+SCHEMA_FILES = [
+    "phase1_schema.sql", "phase1_seed.sql",
+    "phase2_schema.sql", "phase2_seed.sql",
+    "phase3_schema.sql", "phase3_seed.sql",
+]
+
+# Volumes pour --scale 1
+BASE_COUNTS = {
+    "projects": 200,
+    "blog_posts": 100,
+    "portfolio_items": 500,
+    "portfolio_events": 20_000,
+    "visitor_sessions": 100_000,
+    "analytics_events": 1_000_000,
+}
+
+ANALYTICS_DAYS = 180
+INSERT_CHUNK = 200_000
+
+# Vocabulaire des textes générés (recherche plein texte réaliste)
+WORDS = (
+    "données modèle python pipeline production machine learning prédiction client churn "
+    "automatisation workflow api dashboard analyse visualisation sql postgres docker "
+    "déploiement monitoring performance cache index requête optimisation entreprise "
+    "projet résultat impact équipe architecture cloud streaming temps réel qualité test"
+).split()
+
+TEXT_EXPR = "array_to_string(ARRAY(SELECT ($2::TEXT[])[1 + floor(random() * array_length($2::TEXT[], 1))::INT] FROM generate_series(1, {words}) WHERE g > 0), ' ')"
+
+SEED_QUERIES = {
+    "projects": f"""
+        INSERT INTO projects (
+            title, slug, short_description, long_description, github_language, category,
+            tags, technologies, metrics, is_featured, is_published, display_order, project_date,
+            target_modes, mode_priority
+        )
+        SELECT
+            initcap({TEXT_EXPR.format(words=4)}),
+            'bench-project-' || g,
+            {TEXT_EXPR.format(words=20)},
+            {TEXT_EXPR.format(words=200)},
+            (ARRAY['Python', 'TypeScript', 'SQL', 'Go'])[1 + g % 4],
+            (ARRAY['ml', 'data_viz', 'automation', 'web_app', 'analysis'])[1 + g % 5],
+            ARRAY['bench', 'tag' || (g % 20)],
+            ARRAY['Python', 'PostgreSQL', 'Docker'],
+            jsonb_build_object('accuracy', round(random()::NUMERIC, 2)),
+            g % 10 = 0,
+            g % 7 <> 0,
+            g % 50,
+            CURRENT_DATE - (g % 1000),
+            CASE g % 3 WHEN 0 THEN ARRAY['cdi'] WHEN 1 THEN ARRAY['freelance'] ELSE ARRAY['cdi', 'freelance'] END,
+            jsonb_build_object('cdi', g % 10, 'freelance', (g * 7) % 10)
+        FROM generate_series(1, $1) g
+    """,
+    "blog_posts": f"""
+        INSERT INTO blog_posts (
+            title, slug, excerpt, content, keywords, category, tags, read_time_minutes,
+            view_count, is_published, is_featured, published_at
+        )
+        SELECT
+            initcap({TEXT_EXPR.format(words=8)}),
+            'bench-post-' || g,
+            {TEXT_EXPR.format(words=30)},
+            {TEXT_EXPR.format(words=800)},
+            ARRAY['bench', 'mot' || (g % 30)],
+            (ARRAY['tutorial', 'case_study', 'opinion', 'technical'])[1 + g % 4],
+            ARRAY['bench'],
+            3 + g % 12,
+            (random() * 5000)::INT,
+            g % 9 <> 0,
+            g % 15 = 0,
+            CASE WHEN g % 9 <> 0 THEN LOCALTIMESTAMP - (g || ' hours')::INTERVAL END
+        FROM generate_series(1, $1) g
+    """,
+    "portfolio_items": f"""
+        INSERT INTO portfolio_items (
+            repo, title, short_pitch, long_desc, tags, stack, impact, github_url, github_stars,
+            github_forks, github_language, last_commit_date, ai_confidence_score, status,
+            created_at, human_reviewed, business_metrics, technical_metrics, achievements
+        )
+        SELECT
+            'bench-repo-' || g,
+            initcap({TEXT_EXPR.format(words=4)}),
+            {TEXT_EXPR.format(words=25)},
+            {TEXT_EXPR.format(words=150)},
+            ARRAY['bench', 'tag' || (g % 20)],
+            ARRAY['Python', 'FastAPI'],
+            {TEXT_EXPR.format(words=12)},
+            'https://github.com/bench/repo-' || g,
+            (random() * 500)::INT,
+            (random() * 50)::INT,
+            (ARRAY['Python', 'TypeScript', 'SQL', 'Go'])[1 + g % 4],
+            LOCALTIMESTAMP - (g || ' hours')::INTERVAL,
+            round(random()::NUMERIC, 3),
+            (ARRAY['draft', 'approved', 'published', 'rejected'])[1 + g % 4],
+            LOCALTIMESTAMP - (g || ' minutes')::INTERVAL,
+            g % 2 = 0,
+            jsonb_build_object('roi_percentage', g % 100),
+            jsonb_build_object('performance_score', g % 100),
+            '["bench"]'::JSONB
+        FROM generate_series(1, $1) g
+    """,
+    "portfolio_events": """
+        INSERT INTO portfolio_events (ts, source, repo, action, payload, status, platform, event_kind)
+        SELECT
+            LOCALTIMESTAMP - (g || ' seconds')::INTERVAL,
+            CASE WHEN g % 5 = 0 THEN 'social_share' ELSE 'github' END,
+            'bench-repo-' || (1 + g % 500),
+            CASE WHEN g % 5 = 0 THEN (ARRAY['linkedin', 'twitter', 'stackoverflow'])[1 + g % 3] || '_share' ELSE 'sync' END,
+            jsonb_build_object('n', g),
+            'ok',
+            CASE WHEN g % 5 = 0 THEN (ARRAY['linkedin', 'twitter', 'stackoverflow'])[1 + g % 3] END,
+            CASE WHEN g % 5 = 0 THEN 'share' END
+        FROM generate_series(1, $1) g
+    """,
+    "visitor_sessions": f"""
+        INSERT INTO visitor_sessions (
+            first_seen_at, last_seen_at, landing_page, landing_mode, referrer_source,
+            device_type, browser, os, page_views, projects_viewed, contact_submitted,
+            cv_downloaded, modes_viewed
+        )
+        SELECT
+            t, t + ((g % 900) || ' seconds')::INTERVAL,
+            '/', (ARRAY['cdi', 'freelance'])[1 + g % 2],
+            (ARRAY['google', 'linkedin', 'direct', 'github'])[1 + g % 4],
+            (ARRAY['desktop', 'mobile', 'tablet'])[1 + g % 3],
+            'Firefox', 'Linux', 1 + g % 12, g % 6, g % 50 = 0, g % 30 = 0,
+            ARRAY[(ARRAY['cdi', 'freelance'])[1 + g % 2]]
+        FROM generate_series(1, $1) g,
+             LATERAL (SELECT LOCALTIMESTAMP - random() * INTERVAL '{ANALYTICS_DAYS} days' AS t WHERE g > 0) ts
+    """,
+    # $1 = nombre d'événements du lot, $2 = décalage des numéros de session
+    "analytics_events": f"""
+        INSERT INTO analytics_events (
+            session_id, event_type, event_category, portfolio_mode, page_url,
+            target_type, target_id, created_at
+        )
+        SELECT
+            s.id,
+            (ARRAY['page_view', 'page_view', 'page_view', 'project_click', 'mode_switch',
+                   'scroll', 'contact', 'cv_download'])[1 + g % 8],
+            'engagement',
+            (ARRAY['cdi', 'freelance'])[1 + g % 2],
+            '/',
+            CASE WHEN g % 8 = 3 THEN 'project' END,
+            CASE WHEN g % 8 = 3 THEN 1 + g % 200 END,
+            LOCALTIMESTAMP - random() * INTERVAL '{ANALYTICS_DAYS} days'
+        FROM generate_series(1, $1) g
+        JOIN bench_sessions s ON s.n = 1 + (g + $2) % (SELECT count(*) FROM bench_sessions)
+    """,
+}
+
+
+async def connect(database: str) -> asyncpg.Connection:
+    return await asyncpg.connect(**{**db.DB_CONFIG, "database": database})
+
+
+async def create_database(reset: bool):
+    conn = await connect("postgres")
+    try:
+        if reset:
+            await conn.execute(f'DROP DATABASE IF EXISTS "{BENCH_DB_NAME}" WITH (FORCE)')
+        exists = await conn.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", BENCH_DB_NAME)
+        if not exists:
+            await conn.execute(f'CREATE DATABASE "{BENCH_DB_NAME}"')
+    finally:
+        await conn.close()
+
+
+async def apply_schemas(conn: asyncpg.Connection):
+    if await conn.fetchval("SELECT to_regclass('profile') IS NOT NULL"):
+        print("Schemas already applied, skipping (use --reset to rebuild)")
+        return
+    for path in [SQL_DIR / name for name in SCHEMA_FILES] + [CORE_SCHEMA, SQL_DIR / "phase4_schema.sql"]:
+        print(f"  applying {path.name}")
+        await conn.execute(path.read_text(encoding="utf-8"))
+
+
+async def seed(conn: asyncpg.Connection, scale: float):
+    counts = {table: max(1, int(count * scale)) for table, count in BASE_COUNTS.items()}
+    words = list(WORDS)
+
+    for table in ("projects", "blog_posts", "portfolio_items", "portfolio_events", "visitor_sessions"):
+        started = time.perf_counter()
+        if "$2" in SEED_QUERIES[table]:
+            await conn.execute(SEED_QUERIES[table], counts[table], words)
+        else:
+            await conn.execute(SEED_QUERIES[table], counts[table])
+        print(f"  {table}: {counts[table]} rows in {time.perf_counter() - started:.1f}s")
+
+    # Partitions mensuelles couvrant toute la période générée
+    await conn.execute(
+        """
+        SELECT create_analytics_events_partition(m::DATE)
+        FROM generate_series(
+            date_trunc('month', LOCALTIMESTAMP - make_interval(days => $1)),
+            date_trunc('month', LOCALTIMESTAMP), INTERVAL '1 month'
+        ) m
+        """,
+        ANALYTICS_DAYS
+    )
+    await conn.execute(
+        "CREATE TEMP TABLE bench_sessions AS SELECT row_number() OVER () AS n, id FROM visitor_sessions"
+    )
+    await conn.execute("CREATE INDEX ON bench_sessions(n)")
+
+    started = time.perf_counter()
+    for offset in range(0, counts["analytics_events"], INSERT_CHUNK):
+        size = min(INSERT_CHUNK, counts["analytics_events"] - offset)
+        await conn.execute(SEED_QUERIES["analytics_events"], size, offset)
+    print(f"  analytics_events: {counts['analytics_events']} rows in {time.perf_counter() - started:.1f}s")
+
+    # Agrégats analytics à jour avant la mesure
+    started = time.perf_counter()
+    while await conn.fetchval("SELECT refresh_analytics_rollups(500000)") > 0:
+        pass
+    print(f"  analytics rollups in {time.perf_counter() - started:.1f}s")
+
+    await conn.execute(
+        """
+        INSERT INTO portfolio_share_counters (repo, platform, shares, last_share_at)
+        SELECT repo, platform, COUNT(*), MAX(ts)
+        FROM portfolio_events
+        WHERE event_kind = 'share'
+        GROUP BY repo, platform
+        ON CONFLICT (repo, platform) DO UPDATE
+            SET shares = EXCLUDED.shares, last_share_at = EXCLUDED.last_share_at
+        """
+    )
+    await conn.execute("ANALYZE")
+
+
+async def main(args):
+    await create_database(args.reset)
+    conn = await connect(BENCH_DB_NAME)
+    try:
+        print(f"Database {BENCH_DB_NAME}")
+        await apply_schemas(conn)
+        if not args.schema_only:
+            print(f"Seeding synthetic data (scale {args.scale})")
+            await seed(conn, args.scale)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the benchmark database")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to BASE_COUNTS")
+    parser.add_argument("--reset", action="store_true", help=f"Drop and recreate {BENCH_DB_NAME} first")
+    parser.add_argument("--schema-only", action="store_true", help="Apply schemas without synthetic data")
+    asyncio.run(main(parser.parse_args()))
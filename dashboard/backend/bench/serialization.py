@@ -0,0 +1,161 @@
+"""Coût CPU de la sérialisation des listes : response_model (modèles Pydantic) contre fast_json.ModelEncoder.
+
+Lignes synthétiques au format de bench.seed, telles que les routes les passent à model_list.
+Usage (depuis dashboard/backend) :
+    python -m bench.serialization --rows 50
+    python -m bench.serialization --min-speedup 5   # code de sortie 1 si un modèle est en dessous
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import main
+from bench.seed import WORDS
+from fast_json import encoder_for
+
+STARTED = datetime(2024, 1, 1, 9, 30)
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def portfolio_item(rng: random.Random, index: int) -> dict:
+    return {
+        "id": index, "repo": f"bench-repo-{index}", "title": text(rng, 4).title(),
+        "short_pitch": text(rng, 25), "long_desc": text(rng, 150),
+        "tags": rng.sample(WORDS, 4), "stack": rng.sample(WORDS, 3), "impact": text(rng, 12),
+        "github_url": f"https://github.com/bench/bench-repo-{index}",
+        "github_stars": rng.randint(0, 500), "github_forks": rng.randint(0, 50), "github_language": "Python",
+        "last_commit_date": (STARTED + timedelta(hours=index)).replace(tzinfo=timezone.utc),
+        # NUMERIC : asyncpg renvoie des Decimal
+        "ai_confidence_score": Decimal(f"0.{rng.randint(50, 99)}"), "status": "approved",
+        "created_at": STARTED + timedelta(days=index, microseconds=index),
+        "updated_at": (STARTED + timedelta(days=index)).replace(tzinfo=timezone.utc),
+        "human_reviewed": True,
+        "business_metrics": {"users": rng.randint(10, 10_000), "roi": round(rng.uniform(1, 4), 2)},
+        "technical_metrics": {"latency_ms": rng.randint(5, 400), "accuracy": round(rng.random(), 4)},
+        "achievements": [text(rng, 6) for _ in range(3)], "complexity_score": 3, "team_size": 1,
+        "project_duration_months": rng.randint(1, 12), "demo_url": None, "live_url": None,
+    }
+
+
+def project(rng: random.Random, index: int) -> dict:
+    return {
+        "id": index, "title": text(rng, 4).title(), "slug": f"bench-project-{index}",
+        "short_description": text(rng, 20), "long_description": text(rng, 200),
+        "github_url": None, "github_repo_name": None, "github_stars": rng.randint(0, 500),
+        "github_forks": rng.randint(0, 50), "github_language": "Python", "demo_url": None, "image_url": None,
+        "category": "data", "tags": rng.sample(WORDS, 4), "technologies": rng.sample(WORDS, 5),
+        "metrics": {"accuracy": round(rng.random(), 4), "users": rng.randint(10, 10_000)},
+        "business_impact": text(rng, 12), "is_featured": index % 4 == 0, "is_published": True,
+        "display_order": index, "project_date": date(2024, 1, 1) + timedelta(days=index),
+        "duration_months": 3, "team_size": 2, "role": "Lead",
+        "created_at": STARTED + timedelta(days=index), "updated_at": STARTED + timedelta(days=index + 1),
+    }
+
+
+def timeline_event(rng: random.Random, index: int) -> dict:
+    return {
+        "id": index, "date": date(2020, 1, 1) + timedelta(days=30 * index), "end_date": None,
+        "title": text(rng, 5).title(), "description": text(rng, 40), "category": "experience", "icon": None,
+        "metrics": {"projects": rng.randint(1, 20)}, "tags": rng.sample(WORDS, 3), "link_url": None,
+        "display_order": index, "is_highlight": index % 3 == 0, "created_at": STARTED,
+    }
+
+
+def blog_post(rng: random.Random, index: int) -> dict:
+    return {
+        "id": index, "title": text(rng, 8).title(), "slug": f"bench-post-{index}", "excerpt": text(rng, 30),
+        "content": text(rng, 800), "meta_title": None, "meta_description": None,
+        "keywords": rng.sample(WORDS, 5), "cover_image_url": None, "category": "data",
+        "tags": rng.sample(WORDS, 3), "read_time_minutes": 4, "view_count": rng.randint(0, 5000),
+        "like_count": rng.randint(0, 300), "is_published": True, "is_featured": False,
+        "published_at": (STARTED + timedelta(days=index)).replace(tzinfo=timezone.utc),
+        "created_at": STARTED + timedelta(days=index), "updated_at": STARTED + timedelta(days=index),
+    }
+
+
+# Modèle des routes converties -> générateur de lignes
+SCENARIOS: Dict[str, tuple] = {
+    "PortfolioItem (/api/portfolio)": (main.PortfolioItem, portfolio_item),
+    "Project (/api/projects, /api/mode-projects)": (main.Project, project),
+    "TimelineEvent (/api/timeline)": (main.TimelineEvent, timeline_event),
+    "BlogPost (/api/blog)": (main.BlogPost, blog_post),
+}
+
+
+async def best_per_call(call: Callable, loops: int, repeats: int) -> float:
+    """Meilleure moyenne (secondes par appel) sur `repeats` séries de `loops` appels"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            await call()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best
+
+
+async def measure(model, items: List[dict], loops: int, repeats: int) -> Dict[str, float]:
+    field = create_response_field(name="bench", type_=List[model])
+    renderer = JSONResponse(None)
+    encoder = encoder_for(model)
+
+    async def response_model_path() -> bytes:
+        # Ce que fait une route qui renvoie [model(**item)] : validation, sérialisation, json.dumps
+        content = await serialize_response(field=field, response_content=[model(**item) for item in items],
+                                           is_coroutine=True)
+        return renderer.render(content)
+
+    async def fast_path() -> bytes:
+        return encoder.encode(items)
+
+    if await response_model_path() != await fast_path():
+        raise SystemExit(f"{model.__name__}: fast path bytes differ from response_model")
+    baseline = await best_per_call(response_model_path, loops, repeats)
+    fast = await best_per_call(fast_path, loops, repeats)
+    return {"response_model_ms": baseline * 1000, "fast_ms": fast * 1000, "speedup": baseline / fast}
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    report = {}
+    print(f"{args.rows} rows per list, best of {args.repeats} x {args.loops} calls\n")
+    print(f"  {'model':<46} {'response_model':>14} {'fast_json':>10} {'speedup':>8}")
+    for name, (model, make_row) in SCENARIOS.items():
+        items = [make_row(rng, index) for index in range(1, args.rows + 1)]
+        result = await measure(model, items, args.loops, args.repeats)
+        report[name] = result
+        print(f"  {name:<46} {result['response_model_ms']:>11.3f} ms {result['fast_ms']:>7.3f} ms "
+              f"{result['speedup']:>7.1f}x")
+
+    status = 0
+    slowest = min(result["speedup"] for result in report.values())
+    if args.min_speedup is not None and slowest < args.min_speedup:
+        print(f"\nSlowest speedup {slowest:.1f}x is below the {args.min_speedup}x target")
+        status = 1
+    if args.output:
+        Path(args.output).write_text(json.dumps({"rows": args.rows, "models": report}, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare response_model and fast_json list serialization")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--loops", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-speedup", type=float, help="Fail if any model is below this speedup")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,301 @@
+"""Tampons d'écriture en mémoire, vidés en tâche de fond vers PostgreSQL."""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+import asyncpg
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Configuration du tampon analytics
+ANALYTICS_BUFFER_MAX_SIZE = int(os.getenv("ANALYTICS_BUFFER_MAX_SIZE", "1000"))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "1.0"))
+ANALYTICS_BUFFER_MAX_PENDING = int(os.getenv("ANALYTICS_BUFFER_MAX_PENDING", "100000"))
+
+# Configuration de l'accumulateur de sessions
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "5.0"))
+
+# Configuration du compteur de vues du blog
+BLOG_VIEWS_FLUSH_INTERVAL = float(os.getenv("BLOG_VIEWS_FLUSH_INTERVAL", "10.0"))
+
+# Erreurs transitoires : le lot est remis en file et retenté au prochain flush
+TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.InterfaceError, db.PoolTimeoutError)
+
+
+class PeriodicFlusher(ABC):
+    """Boucle de fond qui appelle flush() toutes les `interval` secondes ou sur demande"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def flush(self):
+        """Écrire ce qui est en attente (boucle de fond, wake() et arrêt)"""
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Arrêter la boucle puis vider ce qui reste"""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            # L'arrêt continue (fermeture du pool) même si le dernier flush échoue
+            logger.exception("%s final flush failed", type(self).__name__)
+
+    async def _run(self):
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("%s flush failed", type(self).__name__)
+
+
+class AnalyticsEventBuffer(PeriodicFlusher):
+    """Regroupe les événements analytics de toutes les requêtes et les insère par COPY"""
+
+    TABLE = "analytics_events"
+    COLUMNS = (
+        "session_id", "event_type", "event_category", "event_label", "event_value",
+        "portfolio_mode", "page_url", "referrer_url", "target_type", "target_id",
+        "metadata"
+    )  # created_at : CURRENT_TIMESTAMP de la base au COPY
+
+    def __init__(
+        self,
+        max_size: int = ANALYTICS_BUFFER_MAX_SIZE,
+        flush_interval: float = ANALYTICS_FLUSH_INTERVAL,
+        max_pending: int = ANALYTICS_BUFFER_MAX_PENDING
+    ):
+        super().__init__(flush_interval)
+        self.max_size = max_size
+        self.max_pending = max_pending
+        self._records: List[tuple] = []
+        self._flush_lock = asyncio.Lock()
+        self.flushed = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, records: List[tuple]):
+        """Ajouter des lignes (dans l'ordre de COLUMNS) sans toucher à la base"""
+        self._records.extend(records)
+        overflow = len(self._records) - self.max_pending
+        if overflow > 0:
+            # Base indisponible trop longtemps : on sacrifie les plus anciens
+            del self._records[:overflow]
+            self.dropped += overflow
+            logger.warning("Analytics buffer full, dropped %d events", overflow)
+        if len(self._records) >= self.max_size:
+            self.wake()
+
+    async def flush(self):
+        async with self._flush_lock:
+            while self._records:
+                batch = self._records[:self.max_size]
+                del self._records[:len(batch)]
+                # Pile de lots à copier : un lot rejeté y est remis coupé en deux
+                chunks = [batch]
+                try:
+                    conn = await db.acquire()
+                    try:
+                        while chunks:
+                            chunk = chunks.pop()
+                            try:
+                                await conn.copy_records_to_table(self.TABLE, records=chunk, columns=self.COLUMNS)
+                            except (asyncpg.PostgresError, ValueError):
+                                # Rejet déterministe (valeur trop longue, hors bornes, non encodable...)
+                                self._reject(chunks, chunk)
+                                continue
+                            except TRANSIENT_ERRORS:
+                                chunks.append(chunk)
+                                raise
+                            except Exception:
+                                self._reject(chunks, chunk)
+                                continue
+                            self.flushed += len(chunk)
+                    finally:
+                        await db.release(conn)
+                except TRANSIENT_ERRORS:
+                    # Seules les lignes pas encore copiées sont remises en file, dans leur ordre
+                    self._records[:0] = [record for chunk in reversed(chunks) for record in chunk]
+                    raise
+
+    def _reject(self, chunks: List[List[tuple]], chunk: List[tuple]):
+        """Couper un lot rejeté en deux pour ne perdre que les lignes fautives, pas celles des autres clients"""
+        if len(chunk) > 1:
+            middle = len(chunk) // 2
+            chunks.extend((chunk[middle:], chunk[:middle]))
+            return
+        self.dropped += 1
+        logger.exception("Dropped an analytics event rejected by PostgreSQL")
+
+
+class SessionActivityAccumulator(PeriodicFlusher):
+    """Fusionne les mises à jour de visitor_sessions pour n'écrire qu'une ligne par session et par flush"""
+
+    COUNTERS = ("page_views", "projects_viewed", "blog_posts_viewed", "mode_switches")
+    FLAGS = ("contact_submitted", "cv_downloaded")
+
+    UPDATE_QUERY = """
+        -- name: session_activity_flush
+        UPDATE visitor_sessions AS vs
+        SET page_views = COALESCE(vs.page_views, 0) + u.page_views,
+            projects_viewed = COALESCE(vs.projects_viewed, 0) + u.projects_viewed,
+            blog_posts_viewed = COALESCE(vs.blog_posts_viewed, 0) + u.blog_posts_viewed,
+            mode_switches = COALESCE(vs.mode_switches, 0) + u.mode_switches,
+            contact_submitted = COALESCE(vs.contact_submitted, FALSE) OR u.contact_submitted,
+            cv_downloaded = COALESCE(vs.cv_downloaded, FALSE) OR u.cv_downloaded,
+            modes_viewed = CASE
+                WHEN jsonb_array_length(u.modes_viewed::JSONB) = 0 THEN vs.modes_viewed
+                ELSE ARRAY(
+                    SELECT DISTINCT m
+                    FROM unnest(COALESCE(vs.modes_viewed, '{}'::TEXT[])
+                                || ARRAY(SELECT jsonb_array_elements_text(u.modes_viewed::JSONB))) AS m
+                )
+            END,
+            last_seen_at = GREATEST(vs.last_seen_at, CURRENT_TIMESTAMP)  -- horloge de la base, comme created_at
+        FROM unnest(
+            $1::UUID[], $2::INTEGER[], $3::INTEGER[], $4::INTEGER[], $5::INTEGER[],
+            $6::BOOLEAN[], $7::BOOLEAN[], $8::TEXT[]
+        ) AS u(id, page_views, projects_viewed, blog_posts_viewed, mode_switches,
+               contact_submitted, cv_downloaded, modes_viewed)
+        WHERE vs.id = u.id
+    """
+
+    def __init__(self, flush_interval: float = SESSION_FLUSH_INTERVAL):
+        super().__init__(flush_interval)
+        self._pending: Dict[uuid.UUID, dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self.flushed = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _new_delta(self) -> dict:
+        delta = {key: 0 for key in self.COUNTERS}
+        delta.update({key: False for key in self.FLAGS})
+        delta["modes_viewed"] = []
+        return delta
+
+    def _merge(self, session_id: uuid.UUID, other: dict):
+        delta = self._pending.get(session_id)
+        if delta is None:
+            delta = self._pending[session_id] = self._new_delta()
+        for key in self.COUNTERS:
+            delta[key] += other.get(key, 0)
+        for key in self.FLAGS:
+            delta[key] = delta[key] or other.get(key, False)
+        for mode in other.get("modes_viewed", []):
+            if mode not in delta["modes_viewed"]:
+                delta["modes_viewed"].append(mode)
+
+    def add(self, session_id: uuid.UUID, updates: dict):
+        """Accumuler une mise à jour (compteurs additionnés, flags en OU, modes en union)"""
+        self._merge(session_id, updates)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            ids = list(pending)
+            columns = [[pending[i][key] for i in ids] for key in self.COUNTERS + self.FLAGS]
+            # Un tableau JSON (texte) par session : une liste de listes serait lue comme un tableau 2D
+            modes = [json.dumps(pending[i]["modes_viewed"]) for i in ids]
+            try:
+                conn = await db.acquire()
+                try:
+                    await conn.execute(self.UPDATE_QUERY, ids, *columns, modes)
+                finally:
+                    await db.release(conn)
+            except TRANSIENT_ERRORS:
+                # Réintégrer les deltas non écrits (sans écraser ceux arrivés entre-temps)
+                for session_id, delta in pending.items():
+                    self._merge(session_id, delta)
+                raise
+            except asyncpg.PostgresError:
+                logger.exception("Dropped activity updates for %d sessions", len(ids))
+                return
+            self.flushed += len(ids)
+
+
+class BlogViewCounter(PeriodicFlusher):
+    """Compte les vues d'articles en mémoire et les écrit en un seul UPDATE groupé"""
+
+    UPDATE_QUERY = """
+        -- name: blog_views_flush
+        UPDATE blog_posts AS bp
+        SET view_count = COALESCE(bp.view_count, 0) + u.delta
+        FROM unnest($1::INTEGER[], $2::INTEGER[]) AS u(id, delta)
+        WHERE bp.id = u.id
+    """
+
+    def __init__(self, flush_interval: float = BLOG_VIEWS_FLUSH_INTERVAL):
+        super().__init__(flush_interval)
+        self._pending: Dict[int, int] = {}
+        # Vues en cours d'écriture : encore comptées par pending() jusqu'au commit de l'UPDATE
+        self._inflight: Dict[int, int] = {}
+        self._flush_lock = asyncio.Lock()
+        self.flushed = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def increment(self, post_id: int, count: int = 1):
+        self._pending[post_id] = self._pending.get(post_id, 0) + count
+
+    def pending(self, post_id: int) -> int:
+        return self._pending.get(post_id, 0) + self._inflight.get(post_id, 0)
+
+    def total(self, post_id: int, persisted: Optional[int]) -> int:
+        """Compteur persisté + vues pas encore écrites"""
+        return (persisted or 0) + self.pending(post_id)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._inflight = pending
+            ids = list(pending)
+            try:
+                conn = await db.acquire()
+                try:
+                    await conn.execute(self.UPDATE_QUERY, ids, [pending[i] for i in ids])
+                    # Committé : view_count les contient, avant même de rendre la connexion
+                    self._inflight = {}
+                finally:
+                    await db.release(conn)
+            except TRANSIENT_ERRORS:
+                for post_id, count in pending.items():
+                    self.increment(post_id, count)
+                raise
+            except asyncpg.PostgresError:
+                logger.exception("Dropped view counts for %d blog posts", len(ids))
+                return
+            finally:
+                self._inflight = {}
+            self.flushed += sum(pending.values())
@@ -0,0 +1,117 @@
+"""Index en mémoire par mode : overrides de contenu (mode_content_overrides) et ordre des projets (project_modes)."""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Canal NOTIFY émis par le trigger de mode_content_overrides (sql/phase4_schema.sql)
+OVERRIDES_CHANNEL = "mode_content_overrides_changed"
+
+IndexKey = Tuple[str, str, Optional[int]]
+
+
+class ModeContentIndex:
+    """(mode_key, content_type, content_id) -> {override_field: override_value}, priorités résolues"""
+
+    LOAD_QUERY = """
+        -- name: mode_overrides_load
+        SELECT mode_key, content_type, content_id, override_field, override_value
+        FROM mode_content_overrides
+        WHERE is_active = TRUE
+        ORDER BY priority ASC, id ASC
+    """
+
+    def __init__(self):
+        self._index: Dict[IndexKey, Dict[str, str]] = {}
+        self._loaded = False
+        self._reload_task: Optional[asyncio.Task] = None
+        self._reload_pending = False
+        self.reloads = 0
+
+    async def load(self):
+        conn = await db.acquire()
+        try:
+            rows = await conn.fetch(self.LOAD_QUERY)
+        finally:
+            await db.release(conn)
+
+        index: Dict[IndexKey, Dict[str, str]] = {}
+        for row in rows:
+            # Tri par priorité croissante : la priorité la plus haute écrase les autres
+            key = (row['mode_key'], row['content_type'], row['content_id'])
+            index.setdefault(key, {})[row['override_field']] = row['override_value']
+
+        # Remplacement atomique : les lecteurs voient l'ancien ou le nouvel index, jamais un mélange
+        self._index = index
+        self._loaded = True
+        self.reloads += 1
+
+    def request_reload(self, _payload: Optional[str] = None):
+        """Handler NOTIFY : recharger en tâche de fond (les rafales sont regroupées)"""
+        self._reload_pending = True
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._reload())
+
+    async def _reload(self):
+        # Une notification reçue pendant un rechargement en déclenche un nouveau
+        while self._reload_pending:
+            self._reload_pending = False
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Could not reload mode content overrides")
+                self._loaded = False
+
+    async def ensure_loaded(self):
+        if not self._loaded:
+            await self.load()
+
+    def get(self, mode: str, content_type: str, content_id: Optional[int] = None) -> Dict[str, str]:
+        return dict(self._index.get((mode, content_type, content_id), {}))
+
+
+class ModeProjectOrder:
+    """mode -> ids des projets publiés dans l'ordre d'affichage, gardés en mémoire jusqu'au prochain changement de projects"""
+
+    ORDER_QUERY = """
+        -- name: mode_project_order
+        SELECT project_id, is_featured
+        FROM project_modes
+        WHERE mode_key = $1 AND is_published = TRUE
+        ORDER BY priority DESC NULLS LAST, project_date DESC, project_id DESC
+    """
+
+    # Le mode vient de la query string : nombre d'entrées borné
+    MAX_MODES = 32
+
+    def __init__(self):
+        self._orders: Dict[str, List[Tuple[int, bool]]] = {}
+        # Un ordre lu pendant une modification de projects n'est pas conservé
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def ids(self, conn, mode: str, featured_only: bool = False) -> List[int]:
+        order = self._orders.get(mode)
+        if order is None:
+            self.misses += 1
+            generation = self._generation
+            rows = await conn.fetch(self.ORDER_QUERY, mode)
+            order = [(row['project_id'], row['is_featured']) for row in rows]
+            if generation == self._generation and len(self._orders) < self.MAX_MODES:
+                self._orders[mode] = order
+        else:
+            self.hits += 1
+        return [project_id for project_id, is_featured in order if is_featured or not featured_only]
+
+    def invalidate(self):
+        self._generation += 1
+        self._orders = {}
+
+    def on_table_changed(self, payload: Optional[str]):
+        """Handler NOTIFY table_version_changed ; payload None = notifications possiblement perdues"""
+        if payload is None or payload.rpartition(':')[0] == "projects":
+            self.invalidate()
@@ -0,0 +1,211 @@
+"""Pool de connexions PostgreSQL partagé par toutes les routes du dashboard."""
+import asyncio
+import json
+import os
+from time import perf_counter
+from typing import Optional
+
+import asyncpg
+
+import metrics
+from query_log import slow_query_log
+
+# Configuration base de données
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", "5432")),
+    "user": os.getenv("DB_USER", "admin_user_db"),
+    "password": os.getenv("DB_PASSWORD", "O2ZkUw6Qjh5HCJT97mNWFgtzDaPv1LeA"),
+    "database": os.getenv("DB_NAME", "n8n_database")
+}
+
+# Configuration du pool
+POOL_CONFIG = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "5")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "20")),
+    "max_inactive_connection_lifetime": float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300")),
+    "command_timeout": float(os.getenv("DB_COMMAND_TIMEOUT", "30")),
+    "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256")),
+}
+
+# Temps d'attente max pour obtenir une connexion libre (secondes)
+ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5"))
+
+# Durée max d'un EXPLAIN ANALYZE de requête lente (secondes)
+EXPLAIN_TIMEOUT = float(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT", "10"))
+
+_pool: Optional[asyncpg.Pool] = None
+
+
+class PoolTimeoutError(Exception):
+    """Aucune connexion libre dans le délai ACQUIRE_TIMEOUT"""
+
+
+class InstrumentedConnection(asyncpg.Connection):
+    """Connexion qui mesure chaque requête : métriques par nom de requête, journal des requêtes lentes, trace"""
+
+    async def execute(self, query, *args, **kwargs):
+        started = perf_counter()
+        rows = None
+        try:
+            status = await super().execute(query, *args, **kwargs)
+            # "UPDATE 3", "INSERT 0 1" : le dernier nombre est le nombre de lignes
+            last = status.rpartition(" ")[2]
+            rows = int(last) if last.isdigit() else None
+            return status
+        finally:
+            observe_query(query, args, rows, started)
+
+    async def executemany(self, command, args, **kwargs):
+        started = perf_counter()
+        try:
+            return await super().executemany(command, args, **kwargs)
+        finally:
+            observe_query(command, (), None, started)
+
+    async def fetch(self, query, *args, **kwargs):
+        started = perf_counter()
+        rows = None
+        try:
+            result = await super().fetch(query, *args, **kwargs)
+            rows = len(result)
+            return result
+        finally:
+            observe_query(query, args, rows, started, readonly=True)
+
+    async def fetchrow(self, query, *args, **kwargs):
+        started = perf_counter()
+        rows = None
+        try:
+            result = await super().fetchrow(query, *args, **kwargs)
+            rows = 0 if result is None else 1
+            return result
+        finally:
+            observe_query(query, args, rows, started, readonly=True)
+
+    async def fetchval(self, query, *args, **kwargs):
+        started = perf_counter()
+        rows = None
+        try:
+            result = await super().fetchval(query, *args, **kwargs)
+            rows = 0 if result is None else 1
+            return result
+        finally:
+            observe_query(query, args, rows, started, readonly=True)
+
+    async def copy_records_to_table(self, table_name, **kwargs):
+        started = perf_counter()
+        try:
+            return await super().copy_records_to_table(table_name, **kwargs)
+        finally:
+            metrics.QUERY_DURATION.observe((f"copy {table_name}",), perf_counter() - started)
+
+
+def observe_query(query: str, args: tuple, rows: Optional[int], started: float, readonly: bool = False):
+    duration = perf_counter() - started
+    if metrics.METRICS_ENABLED:
+        metrics.QUERY_DURATION.observe((metrics.query_name(query),), duration)
+    if slow_query_log.observe(query, len(args), rows, duration) and readonly:
+        slow_query_log.schedule_explain(explain_query, query, args)
+
+
+async def explain_query(query: str, args: tuple):
+    """EXPLAIN (ANALYZE, BUFFERS) sur une autre connexion, dans une transaction toujours annulée"""
+    conn = await acquire()
+    try:
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            await conn.execute(
+                f"-- name: slow_query_explain\nSET LOCAL statement_timeout = {int(EXPLAIN_TIMEOUT * 1000)}"
+            )
+            return await conn.fetchval(
+                "-- name: slow_query_explain\nEXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, *args
+            )
+        finally:
+            await transaction.rollback()
+    finally:
+        await release(conn)
+
+
+def _encode_jsonb(value) -> bytes:
+    # Format binaire jsonb : octet de version (1) puis le texte JSON
+    return b"\x01" + json.dumps(value).encode()
+
+
+def _decode_jsonb(data: bytes):
+    return json.loads(data[1:])
+
+
+async def init_connection(conn: asyncpg.Connection):
+    """Initialisation de chaque nouvelle connexion : codecs JSON/JSONB"""
+    # Codecs binaires : copy_records_to_table (COPY binaire) n'accepte pas les codecs texte
+    await conn.set_type_codec(
+        "json", encoder=lambda value: json.dumps(value).encode(), decoder=json.loads,
+        schema="pg_catalog", format="binary"
+    )
+    await conn.set_type_codec(
+        "jsonb", encoder=_encode_jsonb, decoder=_decode_jsonb, schema="pg_catalog", format="binary"
+    )
+
+
+async def warm_up(pool: asyncpg.Pool):
+    """Ouvrir et valider min_size connexions avant de recevoir du trafic"""
+    async def ping():
+        async with pool.acquire(timeout=ACQUIRE_TIMEOUT) as conn:
+            await conn.fetchval("SELECT 1")
+
+    await asyncio.gather(*(ping() for _ in range(pool.get_min_size())))
+
+
+async def open_pool() -> asyncpg.Pool:
+    """Créer le pool global (appelé au démarrage de l'application)"""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            **DB_CONFIG, **POOL_CONFIG,
+            init=init_connection,
+            connection_class=(
+                InstrumentedConnection if metrics.METRICS_ENABLED or slow_query_log.enabled else asyncpg.Connection
+            )
+        )
+        await warm_up(_pool)
+    return _pool
+
+
+async def close_pool():
+    """Fermer proprement le pool global (appelé à l'arrêt de l'application)"""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+def get_pool() -> asyncpg.Pool:
+    if _pool is None:
+        raise RuntimeError("Database pool is not initialized")
+    return _pool
+
+
+async def acquire() -> asyncpg.Connection:
+    """Emprunter une connexion au pool, avec timeout"""
+    started = perf_counter()
+    try:
+        conn = await get_pool().acquire(timeout=ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.POOL_ACQUIRE_TIMEOUTS.inc()
+        raise PoolTimeoutError(f"No database connection available after {ACQUIRE_TIMEOUT}s")
+    metrics.POOL_ACQUIRE_DURATION.observe((), perf_counter() - started)
+    return conn
+
+
+async def release(conn: asyncpg.Connection):
+    """Rendre une connexion au pool"""
+    await get_pool().release(conn)
+
+
+def pool_stats():
+    """(taille, connexions libres, taille max) du pool, pour /metrics"""
+    if _pool is None:
+        return []
+    return [(("size",), _pool.get_size()), (("idle",), _pool.get_idle_size()), (("max",), _pool.get_max_size())]
@@ -0,0 +1,202 @@
+"""Sérialisation rapide des listes : mêmes octets que response_model, sans construire de modèles Pydantic."""
+import json
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur json (plus lent, mêmes octets)
+    orjson = None
+
+# Chemin rapide activé pour les endpoints de liste (désactivé par défaut)
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() == "true"
+
+# Hors de cet intervalle, orjson écrit les flottants autrement que repr() (1e16 vs 1e+16)
+SAFE_FLOAT_MIN = 1e-4
+SAFE_FLOAT_MAX = 1e16
+
+_MISSING = object()
+
+
+class PreSerializedJSON(Response):
+    """Corps JSON déjà encodé, renvoyé tel quel (FastAPI ne repasse pas par response_model)"""
+    media_type = "application/json"
+
+
+def _datetime(value: datetime) -> str:
+    # Même format que Pydantic en mode JSON : UTC écrit 'Z'
+    text = value.isoformat()
+    if value.tzinfo is not None and text.endswith("+00:00"):
+        text = text[:-6] + "Z"
+    return text
+
+
+def _unwrap(annotation):
+    """Optional[X] -> X"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _converter(annotation) -> Optional[Tuple[type, Callable[[Any], Any]]]:
+    """(type attendu, conversion) appliqués par Pydantic pour ce champ, None = valeur telle quelle"""
+    annotation = _unwrap(annotation)
+    origin = get_origin(annotation)
+    if annotation is datetime:
+        # orjson écrit déjà les datetime comme Pydantic (OPT_UTC_Z)
+        return None if orjson is not None else (str, _datetime)
+    if annotation is date:
+        return None if orjson is not None else (str, date.isoformat)
+    if annotation is float:
+        return float, float
+    if annotation is int:
+        return int, int
+    if origin is list or annotation is list:
+        return list, list
+    return None
+
+
+def _may_hold_floats(annotation) -> bool:
+    annotation = _unwrap(annotation)
+    if annotation in (float, dict, list, Any):
+        return True
+    origin = get_origin(annotation)
+    if origin in (dict, list):
+        # List[str] ne contient jamais de flottant
+        return any(_may_hold_floats(arg) for arg in get_args(annotation))
+    return False
+
+
+def _unsafe_float(value) -> bool:
+    if not value:
+        return False
+    if isinstance(value, float):
+        return value != 0.0 and not SAFE_FLOAT_MIN <= abs(value) < SAFE_FLOAT_MAX
+    if isinstance(value, dict):
+        return any(_unsafe_float(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_unsafe_float(item) for item in value)
+    return False
+
+
+def _default(value):
+    # Repli json : dates non converties par ModelEncoder (valeurs hors champs typés)
+    if isinstance(value, datetime):
+        return _datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value, exact: bool = False) -> bytes:
+    """Encodage identique à JSONResponse ; exact=True force le module json"""
+    if orjson is not None and not exact:
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class ModelEncoder:
+    """Encode des dicts comme le ferait response_model=List[model]"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model_fields = model.model_fields
+        self.names = tuple(model.model_fields)
+        self.getter = itemgetter(*self.names)
+        # Seuls les champs dont le type Python peut différer de celui du modèle sont convertis
+        self.conversions = [
+            (name, converter[0], converter[1])
+            for name, field in model.model_fields.items()
+            if (converter := _converter(field.annotation)) is not None
+        ]
+        # Flottants scalaires vérifiés directement, conteneurs (dict, list) parcourus par _unsafe_float
+        self.scalar_float_fields = [
+            name for name, field in model.model_fields.items() if _unwrap(field.annotation) is float
+        ]
+        self.float_fields = [
+            name for name, field in model.model_fields.items()
+            if _may_hold_floats(field.annotation) and name not in self.scalar_float_fields
+        ]
+        # Colonnes déjà dans l'ordre du modèle (SELECT des colonnes du modèle) : simple copie du dict
+        self._order = list(self.names)
+
+    def row(self, item: dict) -> dict:
+        if list(item) == self._order:
+            out = item.copy()
+        else:
+            out = self._reordered(item)
+        for name, expected, convert in self.conversions:
+            value = out[name]
+            if value is not None and type(value) is not expected:
+                out[name] = convert(value)
+        return out
+
+    def _reordered(self, item: dict) -> dict:
+        try:
+            return dict(zip(self.names, self.getter(item)))
+        except KeyError:
+            # Colonne absente : valeur par défaut du modèle
+            return {
+                name: item[name] if name in item else field.get_default(call_default_factory=True)
+                for name, field in self.model_fields.items()
+            }
+
+    def _unsafe_floats(self, rows: List[dict]) -> bool:
+        for name in self.scalar_float_fields:
+            for row in rows:
+                value = row[name]
+                # NaN et infinis aussi : json refuse de les écrire, comme la réponse response_model
+                if value and not SAFE_FLOAT_MIN <= abs(value) < SAFE_FLOAT_MAX:
+                    return True
+        for name in self.float_fields:
+            for row in rows:
+                if _unsafe_float(row[name]):
+                    return True
+        return False
+
+    def encode(self, items: Iterable[dict]) -> bytes:
+        rows = [self.row(item) for item in items]
+        return dumps(rows, exact=orjson is not None and self._unsafe_floats(rows))
+
+
+@lru_cache(maxsize=None)
+def encoder_for(model: Type[BaseModel]) -> ModelEncoder:
+    return ModelEncoder(model)
+
+
+def model_list(model: Type[BaseModel], items: List[dict], response: Optional[Response] = None):
+    """Liste de modèles (chemin normal) ou corps JSON pré-encodé (FAST_SERIALIZATION)
+
+    `response` est la réponse injectée par FastAPI : ses en-têtes (X-Next-Cursor...) sont
+    recopiés, FastAPI ne les appliquant pas quand la route renvoie elle-même une Response.
+    """
+    if FAST_SERIALIZATION:
+        result = PreSerializedJSON(encoder_for(model).encode(items))
+        if response is not None:
+            for name, value in response.raw_headers:
+                if name not in (b"content-length", b"content-type"):
+                    result.raw_headers.append((name, value))
+        return result
+    return [model(**item) for item in items]
+
+
+def splice_object(values: dict) -> bytes:
+    """Objet JSON dont les valeurs PreSerializedJSON sont insérées sans ré-encodage"""
+    parts = []
+    for key, value in values.items():
+        if isinstance(value, PreSerializedJSON):
+            encoded = value.body
+        else:
+            encoded = dumps(jsonable_encoder(value), exact=True)
+        parts.append(dumps(key) + b":" + encoded)
+    return b"{" + b",".join(parts) + b"}"
@@ -0,0 +1,351 @@
+"""Synchronisation incrémentale des dépôts GitHub : requêtes conditionnelles (ETag) et concurrence bornée."""
+import asyncio
+import base64
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Configuration de la synchronisation GitHub
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")  # faux serveur local en dev
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+GITHUB_USERNAME = os.getenv("GITHUB_USERNAME", "RaoufAddeche")
+GITHUB_SYNC_CONCURRENCY = int(os.getenv("GITHUB_SYNC_CONCURRENCY", "4"))
+GITHUB_SYNC_MIN_STARS = int(os.getenv("GITHUB_SYNC_MIN_STARS", "1"))
+# Requêtes gardées en réserve : en dessous, on attend la remise à zéro du quota
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "10"))
+# Attente max pour un quota épuisé (secondes) ; au-delà la synchronisation échoue
+GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "300"))
+GITHUB_REQUEST_TIMEOUT = float(os.getenv("GITHUB_REQUEST_TIMEOUT", "20"))
+
+MAX_RETRIES = 3
+REPOS_PER_PAGE = 100
+
+# (etag, pushed_at) par ressource : "repos:<user>:<page>" ou "repo:<owner>/<name>"
+Watermark = Tuple[Optional[str], Optional[datetime]]
+# (etag, texte) du dernier README lu, par ressource "repo:<owner>/<name>"
+CachedReadme = Tuple[str, str]
+
+
+class GitHubRateLimitError(Exception):
+    """Quota GitHub épuisé pour plus de GITHUB_RATE_LIMIT_MAX_WAIT secondes"""
+
+
+class GitHubSyncError(Exception):
+    """Réponse GitHub inattendue"""
+
+
+@dataclass
+class SyncedRepo:
+    """Dépôt modifié depuis la dernière synchronisation (champs du workflow n8n « Prepare Data »)"""
+    repo_name: str
+    repo_full_name: str
+    repo_description: Optional[str]
+    repo_url: str
+    repo_stars: int
+    repo_forks: int
+    repo_language: Optional[str]
+    repo_topics: List[str]
+    pushed_at: Optional[datetime]
+    # Copie en cache si GitHub répond 304 (readme_changed False) ; None si le README est absent
+    readme_text: Optional[str] = None
+    readme_changed: bool = False
+
+
+@dataclass
+class SyncResult:
+    repos: List[SyncedRepo] = field(default_factory=list)
+    # Dépôts de pages modifiées mais sans nouveau push (métadonnées seules : étoiles, description...)
+    unchanged: int = 0
+    requests: int = 0
+    not_modified: int = 0
+    # Filigranes à enregistrer une fois les dépôts traités (commit)
+    watermarks: Dict[str, Watermark] = field(default_factory=dict)
+    # README relus (réponses 200), mis en cache dès la synchronisation
+    readmes: Dict[str, CachedReadme] = field(default_factory=dict)
+
+
+def parse_github_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+class MemorySyncState:
+    """Filigranes en mémoire (tests contre un faux serveur GitHub)"""
+
+    def __init__(self):
+        self.watermarks: Dict[str, Watermark] = {}
+        self.readmes: Dict[str, CachedReadme] = {}
+
+    async def load(self, resources: List[str]) -> Dict[str, Watermark]:
+        return {resource: self.watermarks[resource] for resource in resources if resource in self.watermarks}
+
+    async def save(self, watermarks: Dict[str, Watermark]):
+        self.watermarks.update(watermarks)
+
+    async def load_readmes(self, resources: List[str]) -> Dict[str, CachedReadme]:
+        return {resource: self.readmes[resource] for resource in resources if resource in self.readmes}
+
+    async def save_readmes(self, readmes: Dict[str, CachedReadme]):
+        self.readmes.update(readmes)
+
+
+class PostgresSyncState:
+    """Filigranes dans la table github_sync_state"""
+
+    async def load(self, resources: List[str]) -> Dict[str, Watermark]:
+        conn = await db.acquire()
+        try:
+            rows = await conn.fetch(
+                """
+                -- name: github_sync_state_load
+                SELECT resource, etag, pushed_at FROM github_sync_state WHERE resource = ANY($1::TEXT[])
+                """,
+                resources
+            )
+        finally:
+            await db.release(conn)
+        return {row['resource']: (row['etag'], row['pushed_at']) for row in rows}
+
+    async def save(self, watermarks: Dict[str, Watermark]):
+        if not watermarks:
+            return
+        resources = list(watermarks)
+        conn = await db.acquire()
+        try:
+            await conn.execute(
+                """
+                -- name: github_sync_state_save
+                INSERT INTO github_sync_state (resource, etag, pushed_at, synced_at)
+                SELECT resource, etag, pushed_at, CURRENT_TIMESTAMP
+                FROM unnest($1::TEXT[], $2::TEXT[], $3::TIMESTAMPTZ[]) AS w(resource, etag, pushed_at)
+                ON CONFLICT (resource) DO UPDATE
+                    SET etag = EXCLUDED.etag, pushed_at = EXCLUDED.pushed_at, synced_at = EXCLUDED.synced_at
+                """,
+                resources,
+                [watermarks[resource][0] for resource in resources],
+                [watermarks[resource][1] for resource in resources]
+            )
+        finally:
+            await db.release(conn)
+
+    async def load_readmes(self, resources: List[str]) -> Dict[str, CachedReadme]:
+        if not resources:
+            return {}
+        conn = await db.acquire()
+        try:
+            rows = await conn.fetch(
+                """
+                -- name: github_readme_cache_load
+                SELECT resource, etag, readme_text FROM github_readme_cache WHERE resource = ANY($1::TEXT[])
+                """,
+                resources
+            )
+        finally:
+            await db.release(conn)
+        return {row['resource']: (row['etag'], row['readme_text']) for row in rows}
+
+    async def save_readmes(self, readmes: Dict[str, CachedReadme]):
+        if not readmes:
+            return
+        resources = list(readmes)
+        conn = await db.acquire()
+        try:
+            await conn.execute(
+                """
+                -- name: github_readme_cache_save
+                INSERT INTO github_readme_cache (resource, etag, readme_text, fetched_at)
+                SELECT resource, etag, readme_text, CURRENT_TIMESTAMP
+                FROM unnest($1::TEXT[], $2::TEXT[], $3::TEXT[]) AS r(resource, etag, readme_text)
+                ON CONFLICT (resource) DO UPDATE
+                    SET etag = EXCLUDED.etag, readme_text = EXCLUDED.readme_text, fetched_at = EXCLUDED.fetched_at
+                """,
+                resources,
+                [readmes[resource][0] for resource in resources],
+                [readmes[resource][1] for resource in resources]
+            )
+        finally:
+            await db.release(conn)
+
+
+class GitHubClient:
+    """GET conditionnels sur l'API GitHub, concurrence bornée et respect des en-têtes de quota"""
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_API_URL,
+        token: str = GITHUB_TOKEN,
+        concurrency: int = GITHUB_SYNC_CONCURRENCY,
+        reserve: int = GITHUB_RATE_LIMIT_RESERVE,
+        max_wait: float = GITHUB_RATE_LIMIT_MAX_WAIT,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self._client = httpx.AsyncClient(
+            base_url=base_url, headers=headers, timeout=GITHUB_REQUEST_TIMEOUT, transport=transport
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.reserve = reserve
+        self.max_wait = max_wait
+        # Epoch à partir duquel le quota est de nouveau disponible
+        self._resume_at = 0.0
+        self.requests = 0
+        self.not_modified = 0
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def _wait_for_quota(self):
+        delay = self._resume_at - time.time()
+        if delay <= 0:
+            return
+        if delay > self.max_wait:
+            raise GitHubRateLimitError(f"GitHub rate limit exhausted for another {delay:.0f}s")
+        logger.info("GitHub rate limit reached, waiting %.0fs", delay)
+        await asyncio.sleep(delay)
+
+    def _note_rate_limit(self, response: httpx.Response):
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None and int(remaining) <= self.reserve:
+            self._resume_at = max(self._resume_at, float(reset))
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None:
+            # Limite secondaire (abus) : délai explicite
+            self._resume_at = max(self._resume_at, time.time() + float(retry_after))
+
+    async def get(self, path: str, etag: Optional[str] = None, params: Optional[dict] = None) -> httpx.Response:
+        """GET avec If-None-Match ; renvoie la réponse 200, 304 ou 404"""
+        headers = {"If-None-Match": etag} if etag else {}
+        async with self._semaphore:
+            for _ in range(MAX_RETRIES):
+                await self._wait_for_quota()
+                response = await self._client.get(path, headers=headers, params=params)
+                self.requests += 1
+                self._note_rate_limit(response)
+                if response.status_code in (403, 429) and (
+                    response.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in response.headers
+                ):
+                    continue  # quota épuisé : nouvelle tentative après la remise à zéro
+                if response.status_code == 304:
+                    self.not_modified += 1
+                    return response
+                if response.status_code in (200, 404):
+                    return response
+                raise GitHubSyncError(f"GET {path} returned HTTP {response.status_code}")
+        raise GitHubRateLimitError(f"GET {path} still rate limited after {MAX_RETRIES} attempts")
+
+
+class GitHubSync:
+    """Liste des dépôts (un 304 si rien n'a changé), puis README des seuls dépôts poussés depuis la dernière fois"""
+
+    def __init__(self, client: GitHubClient, state=None, username: str = GITHUB_USERNAME,
+                 min_stars: int = GITHUB_SYNC_MIN_STARS):
+        self.client = client
+        self.state = state if state is not None else PostgresSyncState()
+        self.username = username
+        self.min_stars = min_stars
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self) -> SyncResult:
+        async with self._lock:
+            requests, not_modified = self.client.requests, self.client.not_modified
+            result = SyncResult()
+            repos = await self._changed_repos(result)
+            watermarks = await self.state.load([f"repo:{repo['full_name']}" for repo in repos])
+
+            to_fetch = []
+            for repo in repos:
+                resource = f"repo:{repo['full_name']}"
+                etag, pushed_at = watermarks.get(resource, (None, None))
+                synced = self._synced_repo(repo)
+                if pushed_at is not None and synced.pushed_at is not None and synced.pushed_at <= pushed_at:
+                    result.unchanged += 1
+                    continue
+                to_fetch.append((synced, resource, etag))
+
+            # README des réponses 304 : copie lue lors d'une synchronisation précédente
+            cached = await self.state.load_readmes([resource for _, resource, etag in to_fetch if etag])
+            await asyncio.gather(*(self._fetch_readme(result, cached, *item) for item in to_fetch))
+            # Contenu indexé par ETag : valable même si les filigranes ne sont jamais enregistrés
+            await self.state.save_readmes(result.readmes)
+            result.repos = [synced for synced, _, _ in to_fetch]
+            result.requests = self.client.requests - requests
+            result.not_modified = self.client.not_modified - not_modified
+            return result
+
+    async def commit(self, watermarks: Dict[str, Watermark]):
+        """Enregistrer les filigranes d'une synchronisation, une fois ses dépôts modifiés traités"""
+        await self.state.save(watermarks)
+
+    async def _changed_repos(self, result: SyncResult) -> List[dict]:
+        """Dépôts des pages de la liste modifiées depuis la dernière synchronisation"""
+        repos: List[dict] = []
+        page = 1
+        while True:
+            resource = f"repos:{self.username}:{page}"
+            etag, _ = (await self.state.load([resource])).get(resource, (None, None))
+            response = await self.client.get(
+                f"/users/{self.username}/repos", etag=etag,
+                params={"per_page": REPOS_PER_PAGE, "page": page, "sort": "pushed"}
+            )
+            if response.status_code == 404:
+                raise GitHubSyncError(f"GitHub user {self.username} not found")
+            if response.status_code == 200:
+                result.watermarks[resource] = (response.headers.get("etag"), None)
+                repos.extend(
+                    repo for repo in response.json()
+                    if not repo.get("fork") and (repo.get("stargazers_count") or 0) >= self.min_stars
+                )
+            if 'rel="next"' not in response.headers.get("link", ""):
+                break
+            page += 1
+        return repos
+
+    def _synced_repo(self, repo: dict) -> SyncedRepo:
+        return SyncedRepo(
+            repo_name=repo["name"],
+            repo_full_name=repo["full_name"],
+            repo_description=repo.get("description"),
+            repo_url=repo["html_url"],
+            repo_stars=repo.get("stargazers_count") or 0,
+            repo_forks=repo.get("forks_count") or 0,
+            repo_language=repo.get("language"),
+            repo_topics=repo.get("topics") or [],
+            pushed_at=parse_github_datetime(repo.get("pushed_at"))
+        )
+
+    async def _fetch_readme(self, result: SyncResult, cached: Dict[str, CachedReadme], synced: SyncedRepo,
+                            resource: str, etag: Optional[str]):
+        cached_etag, readme_text = cached.get(resource, (None, None))
+        # Sans copie en cache de cette version, un 304 ne donnerait pas le texte : GET complet
+        response = await self.client.get(
+            f"/repos/{synced.repo_full_name}/readme", etag=etag if cached_etag == etag else None
+        )
+        if response.status_code == 200:
+            payload = response.json()
+            content = payload.get("content") or ""
+            synced.readme_text = base64.b64decode(content).decode("utf-8", errors="replace")
+            synced.readme_changed = True
+            etag = response.headers.get("etag")
+            if etag:
+                result.readmes[resource] = (etag, synced.readme_text)
+        elif response.status_code == 304:
+            synced.readme_text = readme_text
+        elif response.status_code == 404:
+            synced.readme_changed = etag is not None  # README supprimé
+            etag = None
+        result.watermarks[resource] = (etag, synced.pushed_at)
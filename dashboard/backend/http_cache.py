@@ -0,0 +1,110 @@
+"""Requêtes conditionnelles (ETag / If-None-Match) pilotées par les versions de tables."""
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Canal NOTIFY émis par bump_table_version() (sql/phase4_schema.sql), payload "table:version"
+TABLE_VERSION_CHANNEL = "table_version_changed"
+
+
+class TableVersions:
+    """Copie en mémoire de table_versions, tenue à jour par NOTIFY"""
+
+    def __init__(self, salt: str = ""):
+        self.salt = salt
+        self._versions: Dict[str, int] = {}
+        self._reload_task: Optional[asyncio.Task] = None
+
+    async def load(self):
+        conn = await db.acquire()
+        try:
+            rows = await conn.fetch("-- name: table_versions_load\nSELECT table_name, version FROM table_versions")
+        finally:
+            await db.release(conn)
+        self._versions = {row['table_name']: row['version'] for row in rows}
+
+    def on_notify(self, payload: Optional[str]):
+        """Handler NOTIFY ; payload None = notifications possiblement perdues, on relit tout"""
+        if payload is None:
+            if self._reload_task is None or self._reload_task.done():
+                self._reload_task = asyncio.create_task(self.refresh())
+            return
+        table, _, version = payload.rpartition(':')
+        try:
+            version = int(version)
+        except ValueError:
+            logger.warning("Malformed table version notification: %r", payload)
+            return
+        if version > self._versions.get(table, 0):
+            self._versions[table] = version
+
+    async def refresh(self):
+        """Recharger les versions sans jamais lever d'erreur"""
+        try:
+            await self.load()
+        except Exception:
+            # Sans versions fiables, plus d'ETag jusqu'au prochain chargement réussi
+            logger.exception("Could not reload table versions")
+            self._versions = {}
+
+    def get(self, table: str) -> Optional[int]:
+        return self._versions.get(table)
+
+    def etag(self, path: str, query: bytes, tables: Iterable[str]) -> Optional[str]:
+        """ETag fort de la ressource, ou None si une des versions est inconnue"""
+        parts = [self.salt, path, query.decode('latin-1')]
+        for table in tables:
+            version = self._versions.get(table)
+            if version is None:
+                return None
+            parts.append(f"{table}:{version}")
+        return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """Middleware ASGI : 304 sans appeler la route si If-None-Match correspond à l'ETag courant"""
+
+    def __init__(self, app, versions: TableVersions, routes: Mapping[str, Tuple[str, ...]]):
+        self.app = app
+        self.versions = versions
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        tables = self.routes.get(scope["path"])
+        if tables is None:
+            return await self.app(scope, receive, send)
+
+        # Version lue avant la requête : si les données changent pendant, l'ETag sera déjà périmé
+        etag = self.versions.etag(scope["path"], scope["query_string"], tables)
+        if etag is None:
+            return await self.app(scope, receive, send)
+
+        cache_headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+
+        for name, value in scope["headers"]:
+            if name == b"if-none-match" and etag_matches(value.decode('latin-1'), etag):
+                await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message = {**message, "headers": list(message.get("headers", [])) + cache_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
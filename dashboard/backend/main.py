@@ -1,27 +1,177 @@
 from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from typing import List, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import os
 import asyncpg
 from datetime import datetime, date
+from decimal import Decimal
 import json
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-import io
 import base64
 import urllib.parse
+import uuid
+from dataclasses import asdict
+import db
+from buffers import AnalyticsEventBuffer, SessionActivityAccumulator, BlogViewCounter
+from rollups import AnalyticsRollupRefresher, AnalyticsPartitionMaintainer
+from pdf_cache import PdfCache, pdf_cache_key
+from pdf_workers import PdfRenderPool, PdfQueueFullError, PdfRenderTimeoutError, PDF_PREWARM
+from notifications import NotificationListener
+from content_index import ModeContentIndex, ModeProjectOrder, OVERRIDES_CHANNEL
+from search_index import SearchRankCache
+from http_cache import TableVersions, ConditionalGetMiddleware, TABLE_VERSION_CHANNEL
+from response_cache import ResponseCache, ResponseCacheMiddleware, CachePolicy
+from fast_json import PreSerializedJSON, model_list, splice_object
+import metrics
+from metrics import CallbackMetric, MetricsMiddleware
+from query_log import QUERY_TRACE, QueryTraceMiddleware, slow_query_log
+from github_sync import GitHubClient, GitHubSync, GitHubRateLimitError, GitHubSyncError
+from project_ingest import SYNC_COLUMNS, upsert_projects
+from summary_cache import SummaryCache, summary_key, SUMMARY_MODEL, SUMMARY_PROMPT_VERSION
+
+# Tampon partagé des événements analytics (vidé par COPY en tâche de fond)
+analytics_buffer = AnalyticsEventBuffer()
+# Mises à jour de sessions fusionnées en mémoire (un UPDATE par session et par flush)
+session_accumulator = SessionActivityAccumulator()
+# Vues des articles de blog, écrites par lots hors du chemin de lecture
+blog_view_counter = BlogViewCounter()
+# Agrégats analytics horaires / journaliers, rafraîchis à partir du dernier id traité
+analytics_rollups = AnalyticsRollupRefresher()
+# Partitions mensuelles de analytics_events : création à l'avance et rétention
+analytics_partitions = AnalyticsPartitionMaintainer()
+# PDF déjà générés, indexés par (item, template, updated_at)
+pdf_cache = PdfCache()
+# Rendu ReportLab hors de la boucle asyncio (module importé au premier export ou pré-chargé)
+pdf_pool = PdfRenderPool()
+# Overrides de contenu par mode, rechargés sur NOTIFY
+content_index = ModeContentIndex()
+notification_listener = NotificationListener()
+notification_listener.subscribe(OVERRIDES_CHANNEL, content_index.request_reload)
+# Ordre des projets par mode (project_modes), oublié dès que projects change
+mode_project_order = ModeProjectOrder()
+search_rank_cache = SearchRankCache()
+# Versions des tables (table_versions) servant à calculer les ETags
+table_versions = TableVersions(salt="1.0.0")
+notification_listener.subscribe(TABLE_VERSION_CHANNEL, table_versions.on_notify)
+notification_listener.subscribe(TABLE_VERSION_CHANNEL, mode_project_order.on_table_changed)
+notification_listener.subscribe(TABLE_VERSION_CHANNEL, search_rank_cache.on_table_changed)
+
+# Cache des réponses ; les tags sont les noms des tables lues (invalidés par NOTIFY et par les écritures)
+response_cache = ResponseCache()
+notification_listener.subscribe(TABLE_VERSION_CHANNEL, response_cache.on_table_changed)
+
+# Synchronisation GitHub incrémentale (filigranes ETag / pushed_at dans github_sync_state)
+github_sync = GitHubSync(GitHubClient())
+# Résumés LLM déjà générés, par empreinte du README et des métadonnées (table llm_summary_cache)
+summary_cache = SummaryCache()
+
+# Métriques lues au scrape de /metrics : aucun coût sur le chemin des requêtes
+CallbackMetric(
+    "ingestion_buffer_depth", "Records waiting in the in-memory write buffers", "gauge",
+    lambda: [
+        (("analytics_events",), len(analytics_buffer)),
+        (("session_activity",), len(session_accumulator)),
+        (("blog_views",), len(blog_view_counter)),
+    ],
+    ("buffer",)
+)
+CallbackMetric(
+    "ingestion_dropped_total", "Analytics events dropped (buffer overflow or rejected event)", "counter",
+    lambda: analytics_buffer.dropped
+)
+CallbackMetric("db_pool_connections", "Database pool connections", "gauge", db.pool_stats, ("state",))
+CallbackMetric(
+    "db_slow_queries_total", "Queries slower than SLOW_QUERY_MS", "counter", lambda: slow_query_log.slow_queries
+)
+CallbackMetric("pdf_render_in_flight", "PDF renders running or queued", "gauge", lambda: pdf_pool.in_flight)
+CallbackMetric(
+    "mode_project_order_lookups_total", "Per-mode project order lookups by result", "counter",
+    lambda: [(("hit",), mode_project_order.hits), (("miss",), mode_project_order.misses)],
+    ("result",)
+)
+CallbackMetric(
+    "search_rank_cache_lookups_total", "Full-text search ranking lookups by result", "counter",
+    lambda: [(("hit",), search_rank_cache.hits), (("miss",), search_rank_cache.misses)],
+    ("result",)
+)
+CallbackMetric(
+    "llm_summary_cache_lookups_total", "LLM summary cache lookups by result", "counter",
+    lambda: [(("hit",), summary_cache.hits), (("miss",), summary_cache.misses)],
+    ("result",)
+)
+CallbackMetric(
+    "llm_summary_cache_saved_seconds_total", "Inference time avoided by LLM summary cache hits", "counter",
+    lambda: summary_cache.saved_seconds
+)
+CallbackMetric(
+    "response_cache_lookups_total", "Response cache lookups by result", "counter",
+    lambda: [(("hit",), response_cache.hits), (("miss",), response_cache.misses)],
+    ("result",)
+)
+
+# Routes supportant If-None-Match -> tables dont dépend leur réponse
+ETAG_ROUTES = {
+    "/api/portfolio": ("portfolio_items",),
+    "/api/stats": ("portfolio_items",),
+    "/api/profile": ("profile",),
+    "/api/timeline": ("timeline_events",),
+    "/api/skills": ("skills",),
+    "/api/skills/grouped": ("skills",),
+    "/api/projects": ("projects",),
+    "/api/mode-projects": ("projects",),
+    "/api/testimonials": ("testimonials",),
+    "/api/modes": ("portfolio_modes",),
+}
+
+# Routes mises en cache -> tags et TTL (secondes) ; mêmes dépendances que pour les ETags
+CACHE_ROUTES = {
+    path: CachePolicy(tags=tables, ttl=60 if tables == ("portfolio_items",) else 300)
+    for path, tables in ETAG_ROUTES.items()
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ouvrir le pool DB au démarrage et le fermer à l'arrêt"""
+    await db.open_pool()
+    await analytics_buffer.start()
+    await session_accumulator.start()
+    await blog_view_counter.start()
+    await analytics_rollups.start()
+    await analytics_partitions.start()
+    pdf_pool.start()
+    await content_index.load()
+    await table_versions.refresh()
+    await notification_listener.start()
+    if PDF_PREWARM:
+        pdf_pool.schedule_prewarm()
+    try:
+        yield
+    finally:
+        await notification_listener.stop()
+        await github_sync.client.close()
+        pdf_pool.shutdown()
+        await analytics_partitions.stop()
+        await analytics_rollups.stop()
+        await blog_view_counter.stop()
+        await session_accumulator.stop()
+        await analytics_buffer.stop()
+        await db.close_pool()
 
 app = FastAPI(
     title="Portfolio Dashboard",
     description="Dashboard professionnel pour portfolio automatisé",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Cache de réponses puis ETag / 304, ajoutés avant CORS pour que toutes les réponses portent les en-têtes CORS
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache, routes=CACHE_ROUTES)
+app.add_middleware(ConditionalGetMiddleware, versions=table_versions, routes=ETAG_ROUTES)
+
 # CORS pour permettre au frontend React d'accéder à l'API
 app.add_middleware(
     CORSMiddleware,
@@ -29,19 +179,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # pagination par curseur
 )
 
-# Configuration base de données
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": int(os.getenv("DB_PORT", "5432")),
-    "user": os.getenv("DB_USER", "admin_user_db"),
-    "password": os.getenv("DB_PASSWORD", "O2ZkUw6Qjh5HCJT97mNWFgtzDaPv1LeA"),
-    "database": os.getenv("DB_NAME", "n8n_database")
-}
+# Requêtes SQL de chaque requête HTTP : en-tête Server-Timing et journal complet si l'une est lente
+if QUERY_TRACE:
+    app.add_middleware(QueryTraceMiddleware)
+
+# Latence par route mesurée au plus près du serveur (réponses du cache et 304 comprises)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, routes=app.routes)
 
 # Models Pydantic
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class BusinessMetrics(BaseModel):
@@ -87,6 +237,9 @@ class PortfolioItem(BaseModel):
     demo_url: Optional[str] = None
     live_url: Optional[str] = None
 
+# Colonnes lues par les routes : jamais SELECT *, qui transférerait aussi le tsvector search_vector
+PORTFOLIO_ITEM_COLUMNS = ", ".join(PortfolioItem.model_fields)
+
 class PortfolioStats(BaseModel):
     total_projects: int
     approved_projects: int
@@ -104,9 +257,49 @@ class PortfolioEvent(BaseModel):
     payload: Optional[dict]
     status: str
 
-# Connexion DB
+# Connexion DB (pool partagé, voir db.py)
 async def get_db_connection():
-    return await asyncpg.connect(**DB_CONFIG)
+    try:
+        return await db.acquire()
+    except db.PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+async def release_db_connection(conn):
+    await db.release(conn)
+
+# Pagination par curseur (keyset) : le curseur encode (clé de tri, id) de la dernière ligne servie
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def pack_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def unpack_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    return pack_cursor(sort_value.isoformat() if sort_value is not None else None, row_id)
+
+def decode_cursor(cursor: str):
+    sort_value, row_id = unpack_cursor(cursor, 2)
+    try:
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(rows, limit: int, sort_key: str, response: Optional[Response]):
+    """Les requêtes lisent limit + 1 lignes : la ligne en trop signale qu'une page suivante existe"""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    if response is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][sort_key], rows[-1]['id'])
+    return rows
 
 # Routes API
 
@@ -119,18 +312,15 @@ async def get_portfolio_items(
     status: Optional[str] = Query(None, description="Filter by status"),
     language: Optional[str] = Query(None, description="Filter by language"),
     min_confidence: Optional[float] = Query(None, description="Minimum confidence score"),
-    limit: int = Query(50, description="Limit results")
+    limit: int = Query(50, description="Limit results"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    response: Response = None
 ):
-    """Récupérer les items du portfolio avec filtres optionnels"""
+    """Récupérer les items du portfolio avec filtres optionnels (page suivante via X-Next-Cursor)"""
     conn = await get_db_connection()
     try:
-        query = """
-            SELECT id, repo, title, short_pitch, long_desc, tags, stack, impact,
-                   github_url, github_stars, github_forks, github_language,
-                   last_commit_date, ai_confidence_score, status, created_at,
-                   updated_at, human_reviewed, business_metrics, technical_metrics,
-                   achievements, complexity_score, team_size, project_duration_months,
-                   demo_url, live_url
+        query = f"""
+            SELECT {PORTFOLIO_ITEM_COLUMNS}
             FROM portfolio_items
             WHERE 1=1
         """
@@ -152,14 +342,23 @@ async def get_portfolio_items(
             query += f" AND ai_confidence_score >= ${param_count}"
             params.append(min_confidence)
 
-        query += " ORDER BY created_at DESC"
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query += f" AND (created_at, id) < (${param_count + 1}, ${param_count + 2})"
+            params.extend([cursor_created_at, cursor_id])
+            param_count += 2
+
+        # id départage les created_at égaux : ordre total, requis par le curseur
+        query += " ORDER BY created_at DESC, id DESC"
 
         if limit:
             param_count += 1
             query += f" LIMIT ${param_count}"
-            params.append(limit)
+            params.append(limit + 1)
 
         rows = await conn.fetch(query, *params)
+        if limit:
+            rows = paginate(rows, limit, 'created_at', response)
 
         items = []
         for row in rows:
@@ -171,12 +370,12 @@ async def get_portfolio_items(
             # S'assurer que les métriques sont des dictionnaires
             item['business_metrics'] = item['business_metrics'] if item['business_metrics'] else {}
             item['technical_metrics'] = item['technical_metrics'] if item['technical_metrics'] else {}
-            items.append(PortfolioItem(**item))
+            items.append(item)
 
-        return items
+        return model_list(PortfolioItem, items, response)
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/portfolio/{item_id}", response_model=PortfolioItem)
 async def get_portfolio_item(item_id: int):
@@ -184,7 +383,7 @@ async def get_portfolio_item(item_id: int):
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            """SELECT * FROM portfolio_items WHERE id = $1""",
+            f"SELECT {PORTFOLIO_ITEM_COLUMNS} FROM portfolio_items WHERE id = $1",
             item_id
         )
         if not row:
@@ -199,7 +398,7 @@ async def get_portfolio_item(item_id: int):
         return PortfolioItem(**item)
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/stats", response_model=PortfolioStats)
 async def get_portfolio_stats():
@@ -237,22 +436,40 @@ async def get_portfolio_stats():
         )
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/events", response_model=List[PortfolioEvent])
-async def get_portfolio_events(limit: int = Query(20, description="Limit results")):
-    """Récupérer les événements du portfolio"""
+async def get_portfolio_events(
+    limit: int = Query(20, ge=1, description="Limit results"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    response: Response = None
+):
+    """Récupérer les événements du portfolio (page suivante via X-Next-Cursor)"""
     conn = await get_db_connection()
     try:
-        rows = await conn.fetch(
-            """
-            SELECT id, ts, source, repo, action, payload, status
-            FROM portfolio_events
-            ORDER BY ts DESC
-            LIMIT $1
-            """,
-            limit
-        )
+        if cursor:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            rows = await conn.fetch(
+                """
+                SELECT id, ts, source, repo, action, payload, status
+                FROM portfolio_events
+                WHERE (ts, id) < ($1, $2)
+                ORDER BY ts DESC, id DESC
+                LIMIT $3
+                """,
+                cursor_ts, cursor_id, limit + 1
+            )
+        else:
+            rows = await conn.fetch(
+                """
+                SELECT id, ts, source, repo, action, payload, status
+                FROM portfolio_events
+                ORDER BY ts DESC, id DESC
+                LIMIT $1
+                """,
+                limit + 1
+            )
+        rows = paginate(rows, limit, 'ts', response)
 
         events = []
         for row in rows:
@@ -268,7 +485,7 @@ async def get_portfolio_events(limit: int = Query(20, description="Limit results
         return events
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.put("/api/portfolio/{item_id}/status")
 async def update_portfolio_status(item_id: int, status: str):
@@ -297,14 +514,33 @@ async def update_portfolio_status(item_id: int, status: str):
             SELECT 'manual', repo, 'status_updated', $1::jsonb, 'ok'
             FROM portfolio_items WHERE id = $2
             """,
-            json.dumps({"new_status": status, "item_id": item_id}),
+            {"new_status": status, "item_id": item_id},
             item_id
         )
 
+        await pdf_cache.invalidate(item_id)
+        await response_cache.invalidate("portfolio_items")
+
         return {"message": "Status updated successfully"}
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
+
+async def render_pdf(render, *args) -> bytes:
+    """Rendre un PDF dans le pool de processus, en traduisant les erreurs en HTTP"""
+    try:
+        return await pdf_pool.render(render, *args)
+    except PdfQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PdfRenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+def pdf_response(content: bytes, filename: str) -> Response:
+    return Response(
+        content=content,
+        media_type='application/pdf',
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @app.get("/api/export/pdf/{item_id}")
 async def export_portfolio_pdf(item_id: int, template: str = Query("professional", description="PDF template style")):
@@ -312,220 +548,26 @@ async def export_portfolio_pdf(item_id: int, template: str = Query("professional
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            """SELECT * FROM portfolio_items WHERE id = $1""",
+            f"SELECT {PORTFOLIO_ITEM_COLUMNS} FROM portfolio_items WHERE id = $1",
             item_id
         )
         if not row:
             raise HTTPException(status_code=404, detail="Portfolio item not found")
+    finally:
+        await release_db_connection(conn)
 
-        # Créer le PDF avec template sélectionné
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=72, rightMargin=72, topMargin=72, bottomMargin=72)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Templates de styles
-        templates = {
-            "professional": {
-                "title_color": colors.darkblue,
-                "accent_color": colors.blue,
-                "title_size": 24,
-                "header_bg": colors.lightblue
-            },
-            "modern": {
-                "title_color": colors.purple,
-                "accent_color": colors.purple,
-                "title_size": 26,
-                "header_bg": colors.lavender
-            },
-            "minimalist": {
-                "title_color": colors.black,
-                "accent_color": colors.gray,
-                "title_size": 22,
-                "header_bg": colors.lightgrey
-            }
-        }
+    pdf_render = await pdf_pool.renderer()
+    template_key = template if template in pdf_render.PDF_TEMPLATES else "professional"
+    filename = f"portfolio_{template}_{row['repo'].replace('/', '_')}.pdf"
 
-        current_template = templates.get(template, templates["professional"])
-
-        # En-tête avec logo et informations du développeur
-        header_data = [
-            ["Raouf Addeche", "Développeur Full Stack"],
-            ["Portfolio Project", datetime.now().strftime("%B %Y")]
-        ]
-        header_table = Table(header_data, colWidths=[3*inch, 3*inch])
-        header_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), current_template["header_bg"]),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(header_table)
-        story.append(Spacer(1, 20))
-
-        # Titre
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=current_template["title_size"],
-            spaceAfter=30,
-            textColor=current_template["title_color"],
-            alignment=1  # Center alignment
-        )
-        story.append(Paragraph(row['title'], title_style))
-        story.append(Spacer(1, 12))
-
-        # Séparateur visuel
-        from reportlab.platypus import HRFlowable
-        story.append(HRFlowable(width="100%", thickness=2, color=current_template["accent_color"]))
-        story.append(Spacer(1, 12))
-
-        # Pitch court
-        story.append(Paragraph("<b>Résumé :</b>", styles['Heading2']))
-        story.append(Paragraph(row['short_pitch'], styles['Normal']))
-        story.append(Spacer(1, 12))
-
-        # Description longue
-        story.append(Paragraph("<b>Description détaillée :</b>", styles['Heading2']))
-        story.append(Paragraph(row['long_desc'], styles['Normal']))
-        story.append(Spacer(1, 12))
-
-        # Métriques business
-        if row['business_metrics']:
-            story.append(Paragraph("<b>Métriques Business :</b>", styles['Heading2']))
-            for key, value in row['business_metrics'].items():
-                if value:
-                    story.append(Paragraph(f"• <b>{key.replace('_', ' ').title()}:</b> {value}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-        # Métriques techniques
-        if row['technical_metrics']:
-            story.append(Paragraph("<b>Métriques Techniques :</b>", styles['Heading2']))
-            for key, value in row['technical_metrics'].items():
-                if value:
-                    story.append(Paragraph(f"• <b>{key.replace('_', ' ').title()}:</b> {value}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-        # Métriques business (en tableaux visuels)
-        if row['business_metrics']:
-            story.append(Paragraph("<b>Impact Business :</b>", styles['Heading2']))
-            business_data = []
-            for key, value in row['business_metrics'].items():
-                if value:
-                    formatted_key = key.replace('_', ' ').title()
-                    business_data.append([formatted_key, str(value)])
-
-            if business_data:
-                business_table = Table(business_data, colWidths=[2.5*inch, 3.5*inch])
-                business_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.blue),
-                    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                    ('BACKGROUND', (1, 0), (1, -1), colors.lightblue),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(business_table)
-                story.append(Spacer(1, 12))
-
-        # Métriques techniques
-        if row['technical_metrics']:
-            story.append(Paragraph("<b>Performance Technique :</b>", styles['Heading2']))
-            tech_metrics_data = []
-            for key, value in row['technical_metrics'].items():
-                if value:
-                    formatted_key = key.replace('_', ' ').title()
-                    tech_metrics_data.append([formatted_key, str(value)])
-
-            if tech_metrics_data:
-                tech_metrics_table = Table(tech_metrics_data, colWidths=[2.5*inch, 3.5*inch])
-                tech_metrics_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.green),
-                    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                    ('BACKGROUND', (1, 0), (1, -1), colors.lightgreen),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(tech_metrics_table)
-                story.append(Spacer(1, 12))
-
-        # Réalisations
-        if row['achievements']:
-            story.append(Paragraph("<b>Réalisations :</b>", styles['Heading2']))
-            for achievement in row['achievements']:
-                story.append(Paragraph(f"• {achievement}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-        # Informations techniques
-        tech_data = [
-            ['GitHub URL', row['github_url']],
-            ['Langage principal', row['github_language'] or 'N/A'],
-            ['Stars', str(row['github_stars'])],
-            ['Forks', str(row['github_forks'])],
-            ['Technologies', ', '.join(row['stack']) if row['stack'] else 'N/A'],
-            ['Tags', ', '.join(row['tags']) if row['tags'] else 'N/A'],
-            ['Complexité', f"{row['complexity_score']}/10" if row['complexity_score'] else 'N/A'],
-            ['Équipe', f"{row['team_size']} personne(s)" if row['team_size'] else 'N/A'],
-            ['Durée', f"{row['project_duration_months']} mois" if row['project_duration_months'] else 'N/A']
-        ]
-
-        tech_table = Table(tech_data, colWidths=[2*inch, 4*inch])
-        tech_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        story.append(Paragraph("<b>Informations techniques :</b>", styles['Heading2']))
-        story.append(tech_table)
-
-        doc.build(story)
-        buffer.seek(0)
-
-        # Pied de page avec QR code conceptuel (texte pour l'instant)
-        footer_data = [
-            ["Généré automatiquement", f"Portfolio Dashboard - {datetime.now().strftime('%d/%m/%Y')}"],
-            ["GitHub", row['github_url']],
-            ["Contact", "raouf.addeche@example.com"]
-        ]
-        footer_table = Table(footer_data, colWidths=[2*inch, 4*inch])
-        footer_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(Spacer(1, 20))
-        story.append(footer_table)
-
-        doc.build(story)
-        buffer.seek(0)
-
-        # Retourner le PDF
-        return FileResponse(
-            io.BytesIO(buffer.getvalue()),
-            media_type='application/pdf',
-            filename=f"portfolio_{template}_{row['repo'].replace('/', '_')}.pdf"
-        )
+    # Le PDF affiche la date du jour : elle fait partie de la clé
+    cache_key = pdf_cache_key(item_id, template_key, row['updated_at'], date.today().isoformat())
+    content = await pdf_cache.get(cache_key)
+    if content is None:
+        content = await render_pdf(pdf_render.render_portfolio_pdf, dict(row), template_key)
+        await pdf_cache.put(cache_key, content)
 
-    finally:
-        await conn.close()
+    return pdf_response(content, filename)
 
 @app.get("/api/export/portfolio-summary")
 async def export_portfolio_summary_pdf(template: str = Query("professional", description="PDF template style")):
@@ -534,8 +576,8 @@ async def export_portfolio_summary_pdf(template: str = Query("professional", des
     try:
         # Récupérer tous les projets approuvés/publiés
         rows = await conn.fetch(
-            """
-            SELECT * FROM portfolio_items
+            f"""
+            SELECT {PORTFOLIO_ITEM_COLUMNS} FROM portfolio_items
             WHERE status IN ('approved', 'published')
             ORDER BY ai_confidence_score DESC, github_stars DESC
             LIMIT 5
@@ -544,128 +586,99 @@ async def export_portfolio_summary_pdf(template: str = Query("professional", des
 
         if not rows:
             raise HTTPException(status_code=404, detail="No approved projects found")
-
-        # Créer le PDF de résumé
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=72, rightMargin=72, topMargin=72, bottomMargin=72)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # En-tête du portfolio
-        story.append(Paragraph("Portfolio Professionnel", ParagraphStyle(
-            'PortfolioTitle',
-            parent=styles['Heading1'],
-            fontSize=28,
-            textColor=colors.darkblue,
-            alignment=1,
-            spaceAfter=20
-        )))
-
-        story.append(Paragraph("Raouf Addeche - Développeur Full Stack", ParagraphStyle(
-            'Subtitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.blue,
-            alignment=1,
-            spaceAfter=30
-        )))
-
-        # Résumé exécutif
-        story.append(Paragraph("<b>Résumé Exécutif</b>", styles['Heading2']))
-        story.append(Paragraph(
-            "Développeur passionné spécialisé en intelligence artificielle, automatisation et développement full-stack. "
-            "Expertise en Python, React, et architectures cloud modernes. Créateur de solutions innovantes combinant "
-            "IA, DevOps et interfaces utilisateur intuitives.",
-            styles['Normal']
-        ))
-        story.append(Spacer(1, 20))
-
-        # Projets phares
-        story.append(Paragraph("<b>Projets Phares</b>", styles['Heading2']))
-
-        for i, row in enumerate(rows):
-            # Titre du projet
-            project_title = ParagraphStyle(
-                f'ProjectTitle{i}',
-                parent=styles['Heading3'],
-                fontSize=14,
-                textColor=colors.darkblue,
-                spaceAfter=10
-            )
-            story.append(Paragraph(f"{i+1}. {row['title']}", project_title))
-
-            # Description courte
-            story.append(Paragraph(row['short_pitch'], styles['Normal']))
-
-            # Métriques en tableau compact
-            if row['business_metrics'] or row['technical_metrics']:
-                metrics_data = []
-                if row['business_metrics']:
-                    for key, value in row['business_metrics'].items():
-                        if value:
-                            metrics_data.append([key.replace('_', ' ').title(), str(value)])
-
-                if metrics_data:
-                    metrics_table = Table(metrics_data[:3], colWidths=[2*inch, 2*inch])  # Limite à 3 métriques
-                    metrics_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
-                        ('FONTSIZE', (0, 0), (-1, -1), 8),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-                    ]))
-                    story.append(metrics_table)
-
-            story.append(Spacer(1, 15))
-
-        # Technologies maîtrisées
-        all_techs = set()
-        for row in rows:
-            if row['stack']:
-                all_techs.update(row['stack'])
-
-        story.append(Paragraph("<b>Technologies Maîtrisées</b>", styles['Heading2']))
-        tech_text = " • ".join(sorted(list(all_techs))[:15])  # Top 15 technologies
-        story.append(Paragraph(tech_text, styles['Normal']))
-
-        doc.build(story)
-        buffer.seek(0)
-
-        return FileResponse(
-            io.BytesIO(buffer.getvalue()),
-            media_type='application/pdf',
-            filename=f"portfolio_summary_{template}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        )
-
     finally:
-        await conn.close()
+        await release_db_connection(conn)
+
+    pdf_render = await pdf_pool.renderer()
+    content = await render_pdf(pdf_render.render_portfolio_summary_pdf, [dict(row) for row in rows], template)
+
+    return pdf_response(
+        content,
+        f"portfolio_summary_{template}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    )
+
+EXPORT_JSON_QUERY = """
+    SELECT repo, title, short_pitch, long_desc, tags, stack, impact,
+           github_url, github_stars, github_forks, github_language,
+           ai_confidence_score, status, created_at, business_metrics,
+           technical_metrics, achievements, complexity_score, team_size,
+           project_duration_months, demo_url, live_url
+    FROM portfolio_items
+    WHERE status IN ('approved', 'published')
+    ORDER BY github_stars DESC, created_at DESC
+"""
+
+# Nombre de lignes lues par aller-retour du curseur en mode streaming
+EXPORT_STREAM_CHUNK = int(os.getenv("EXPORT_STREAM_CHUNK", "500"))
+
+def export_item(row) -> dict:
+    item = dict(row)
+    item['tags'] = list(item['tags']) if item['tags'] else []
+    item['stack'] = list(item['stack']) if item['stack'] else []
+    item['achievements'] = item['achievements'] if item['achievements'] else []
+    item['business_metrics'] = item['business_metrics'] if item['business_metrics'] else {}
+    item['technical_metrics'] = item['technical_metrics'] if item['technical_metrics'] else {}
+    item['created_at'] = item['created_at'].isoformat()
+    return item
+
+def json_default(value):
+    """Types PostgreSQL non gérés par json.dumps (NUMERIC, DATE, TIMESTAMP)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def stream_portfolio_export(conn, fmt: str):
+    """Lire portfolio_items par un curseur serveur et encoder au fil de l'eau, puis rendre la connexion"""
+    try:
+        async with conn.transaction(readonly=True):
+            # Premier chunk dès l'ouverture de la transaction : la route l'attend avant d'envoyer les en-têtes
+            if fmt == "json":
+                yield f'{{"generated_at": {json.dumps(datetime.now().isoformat())}, "portfolio": ['
+            else:
+                yield ""
+            total = 0
+            async for row in conn.cursor(EXPORT_JSON_QUERY, prefetch=EXPORT_STREAM_CHUNK):
+                encoded = json.dumps(export_item(row), default=json_default, ensure_ascii=False)
+                if fmt == "json":
+                    yield ("," if total else "") + encoded
+                else:
+                    yield encoded + "\n"
+                total += 1
+            if fmt == "json":
+                yield f'], "total_projects": {total}}}'
+    finally:
+        await release_db_connection(conn)
+
+async def prepend_chunk(first: str, stream):
+    yield first
+    async for chunk in stream:
+        yield chunk
 
 @app.get("/api/export/json")
-async def export_portfolio_json():
+async def export_portfolio_json(
+    stream: bool = Query(False, description="Stream the export with constant memory"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="Streaming format: json or ndjson")
+):
     """Exporter tout le portfolio en JSON"""
-    conn = await get_db_connection()
-    try:
-        rows = await conn.fetch(
-            """
-            SELECT repo, title, short_pitch, long_desc, tags, stack, impact,
-                   github_url, github_stars, github_forks, github_language,
-                   ai_confidence_score, status, created_at, business_metrics,
-                   technical_metrics, achievements, complexity_score, team_size,
-                   project_duration_months, demo_url, live_url
-            FROM portfolio_items
-            WHERE status IN ('approved', 'published')
-            ORDER BY github_stars DESC, created_at DESC
-            """
+    if stream:
+        media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+        # Connexion empruntée avant les en-têtes : un pool saturé donne encore un 503
+        conn = await get_db_connection()
+        export = stream_portfolio_export(conn, format)
+        # Générateur démarré ici : son finally rend la connexion même si le client part avant le premier chunk
+        first_chunk = await export.__anext__()
+        return StreamingResponse(
+            prepend_chunk(first_chunk, export),
+            media_type=media_type,
+            background=BackgroundTask(export.aclose)
         )
 
-        portfolio = []
-        for row in rows:
-            item = dict(row)
-            item['tags'] = list(item['tags']) if item['tags'] else []
-            item['stack'] = list(item['stack']) if item['stack'] else []
-            item['achievements'] = item['achievements'] if item['achievements'] else []
-            item['business_metrics'] = item['business_metrics'] if item['business_metrics'] else {}
-            item['technical_metrics'] = item['technical_metrics'] if item['technical_metrics'] else {}
-            item['created_at'] = item['created_at'].isoformat()
-            portfolio.append(item)
+    conn = await get_db_connection()
+    try:
+        rows = await conn.fetch(EXPORT_JSON_QUERY)
+        portfolio = [export_item(row) for row in rows]
 
         return {
             "portfolio": portfolio,
@@ -674,7 +687,38 @@ async def export_portfolio_json():
         }
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
+
+async def log_share(conn, repo: str, item_id: int, platform: str):
+    """Journaliser un partage et incrémenter son compteur (repo, platform) dans la même transaction"""
+    async with conn.transaction():
+        await conn.execute(
+            """
+            INSERT INTO portfolio_events (source, repo, action, payload, status, platform, event_kind)
+            VALUES ($1, $2, $3, $4, $5, $6, 'share')
+            """,
+            "social_share",
+            repo,
+            f"{platform}_share",
+            {
+                "item_id": item_id,
+                "platform": platform,
+                "shared_at": datetime.now().isoformat()
+            },
+            "ok",
+            platform
+        )
+        await conn.execute(
+            """
+            INSERT INTO portfolio_share_counters (repo, platform, shares, last_share_at)
+            VALUES ($1, $2, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (repo, platform) DO UPDATE
+                SET shares = portfolio_share_counters.shares + 1,
+                    last_share_at = EXCLUDED.last_share_at
+            """,
+            repo,
+            platform
+        )
 
 @app.get("/api/share/linkedin/{item_id}")
 async def share_on_linkedin(item_id: int):
@@ -682,7 +726,7 @@ async def share_on_linkedin(item_id: int):
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            """SELECT * FROM portfolio_items WHERE id = $1""",
+            f"SELECT {PORTFOLIO_ITEM_COLUMNS} FROM portfolio_items WHERE id = $1",
             item_id
         )
         if not row:
@@ -709,26 +753,12 @@ Voir le code source: {url}"""
         linkedin_share_url = f"https://www.linkedin.com/sharing/share-offsite/?url={urllib.parse.quote(url)}&title={urllib.parse.quote(title)}&summary={encoded_text}"
 
         # Logger l'événement de partage
-        await conn.execute(
-            """
-            INSERT INTO portfolio_events (source, repo, action, payload, status)
-            VALUES ($1, $2, $3, $4, $5)
-            """,
-            "social_share",
-            row['repo'],
-            "linkedin_share",
-            json.dumps({
-                "item_id": item_id,
-                "platform": "linkedin",
-                "shared_at": datetime.now().isoformat()
-            }),
-            "ok"
-        )
+        await log_share(conn, row['repo'], item_id, "linkedin")
 
         return RedirectResponse(url=linkedin_share_url)
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/share/stackoverflow/{item_id}")
 async def share_on_stackoverflow(item_id: int):
@@ -736,7 +766,7 @@ async def share_on_stackoverflow(item_id: int):
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            """SELECT * FROM portfolio_items WHERE id = $1""",
+            f"SELECT {PORTFOLIO_ITEM_COLUMNS} FROM portfolio_items WHERE id = $1",
             item_id
         )
         if not row:
@@ -767,26 +797,12 @@ I'm looking for feedback on best practices and potential improvements for this t
         stackoverflow_url = f"https://stackoverflow.com/questions/ask?title={encoded_title}&body={encoded_body}&tags={encoded_tags}"
 
         # Logger l'événement
-        await conn.execute(
-            """
-            INSERT INTO portfolio_events (source, repo, action, payload, status)
-            VALUES ($1, $2, $3, $4, $5)
-            """,
-            "social_share",
-            row['repo'],
-            "stackoverflow_share",
-            json.dumps({
-                "item_id": item_id,
-                "platform": "stackoverflow",
-                "shared_at": datetime.now().isoformat()
-            }),
-            "ok"
-        )
+        await log_share(conn, row['repo'], item_id, "stackoverflow")
 
         return RedirectResponse(url=stackoverflow_url)
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/share/twitter/{item_id}")
 async def share_on_twitter(item_id: int):
@@ -794,7 +810,7 @@ async def share_on_twitter(item_id: int):
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            """SELECT * FROM portfolio_items WHERE id = $1""",
+            f"SELECT {PORTFOLIO_ITEM_COLUMNS} FROM portfolio_items WHERE id = $1",
             item_id
         )
         if not row:
@@ -820,42 +836,27 @@ async def share_on_twitter(item_id: int):
         twitter_url = f"https://twitter.com/intent/tweet?text={encoded_tweet}"
 
         # Logger l'événement
-        await conn.execute(
-            """
-            INSERT INTO portfolio_events (source, repo, action, payload, status)
-            VALUES ($1, $2, $3, $4, $5)
-            """,
-            "social_share",
-            row['repo'],
-            "twitter_share",
-            json.dumps({
-                "item_id": item_id,
-                "platform": "twitter",
-                "shared_at": datetime.now().isoformat()
-            }),
-            "ok"
-        )
+        await log_share(conn, row['repo'], item_id, "twitter")
 
         return RedirectResponse(url=twitter_url)
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/social-analytics")
 async def get_social_analytics():
     """Statistiques de partage social"""
     conn = await get_db_connection()
     try:
-        # Récupérer les stats de partage
+        # Récupérer les stats de partage (compteurs tenus par log_share)
         stats = await conn.fetch(
             """
             SELECT
-                payload->>'platform' as platform,
-                COUNT(*) as shares,
-                MAX(ts) as last_share
-            FROM portfolio_events
-            WHERE action LIKE '%_share'
-            GROUP BY payload->>'platform'
+                platform,
+                SUM(shares) as shares,
+                MAX(last_share_at) as last_share
+            FROM portfolio_share_counters
+            GROUP BY platform
             ORDER BY shares DESC
             """
         )
@@ -865,12 +866,11 @@ async def get_social_analytics():
             """
             SELECT
                 repo,
-                COUNT(*) as total_shares,
-                COUNT(*) FILTER (WHERE payload->>'platform' = 'linkedin') as linkedin_shares,
-                COUNT(*) FILTER (WHERE payload->>'platform' = 'twitter') as twitter_shares,
-                COUNT(*) FILTER (WHERE payload->>'platform' = 'stackoverflow') as stackoverflow_shares
-            FROM portfolio_events
-            WHERE action LIKE '%_share'
+                SUM(shares) as total_shares,
+                COALESCE(SUM(shares) FILTER (WHERE platform = 'linkedin'), 0) as linkedin_shares,
+                COALESCE(SUM(shares) FILTER (WHERE platform = 'twitter'), 0) as twitter_shares,
+                COALESCE(SUM(shares) FILTER (WHERE platform = 'stackoverflow'), 0) as stackoverflow_shares
+            FROM portfolio_share_counters
             GROUP BY repo
             ORDER BY total_shares DESC
             """
@@ -883,7 +883,7 @@ async def get_social_analytics():
         }
 
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # ==================== PHASE 1: MVP ENDPOINTS ====================
 
@@ -953,7 +953,7 @@ async def get_profile():
             raise HTTPException(status_code=404, detail="Profile not found")
         return Profile(**dict(row))
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.put("/api/profile")
 async def update_profile(profile_data: dict):
@@ -980,9 +980,10 @@ async def update_profile(profile_data: dict):
         if not row:
             raise HTTPException(status_code=404, detail="Profile not found")
 
+        await response_cache.invalidate("profile")
         return Profile(**dict(row))
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Timeline endpoints
 @app.get("/api/timeline", response_model=List[TimelineEvent])
@@ -1016,11 +1017,11 @@ async def get_timeline(
             # Parse JSONB metrics if it's a string
             if isinstance(event.get('metrics'), str):
                 event['metrics'] = json.loads(event['metrics']) if event['metrics'] else {}
-            events.append(TimelineEvent(**event))
+            events.append(event)
 
-        return events
+        return model_list(TimelineEvent, events)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.post("/api/timeline")
 async def create_timeline_event(event: dict):
@@ -1039,18 +1040,20 @@ async def create_timeline_event(event: dict):
             event.get('description'),
             event.get('category'),
             event.get('icon'),
-            json.dumps(event.get('metrics')) if event.get('metrics') else None,
+            event.get('metrics'),
             event.get('tags', []),
             event.get('link_url'),
             event.get('display_order', 0),
             event.get('is_highlight', False)
         )
 
+        await response_cache.invalidate("timeline_events")
+
         result = dict(row)
         result['tags'] = list(result['tags']) if result['tags'] else []
         return TimelineEvent(**result)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Skills endpoints
 @app.get("/api/skills", response_model=List[Skill])
@@ -1078,7 +1081,7 @@ async def get_skills(
         rows = await conn.fetch(query, *params)
         return [Skill(**dict(row)) for row in rows]
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/skills/grouped")
 async def get_skills_grouped():
@@ -1120,7 +1123,7 @@ async def get_skills_grouped():
 
         return result
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Social links endpoints
 @app.get("/api/social-links", response_model=List[SocialLink])
@@ -1136,7 +1139,7 @@ async def get_social_links(active_only: bool = Query(True, description="Show onl
         rows = await conn.fetch(query)
         return [SocialLink(**dict(row)) for row in rows]
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # ==================== PHASE 2: CREDIBILITY & SHOWCASE ENDPOINTS ====================
 
@@ -1169,6 +1172,8 @@ class Project(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+PROJECT_COLUMNS = ", ".join(Project.model_fields)
+
 class BlogPost(BaseModel):
     id: int
     title: str
@@ -1190,6 +1195,8 @@ class BlogPost(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+BLOG_POST_COLUMNS = ", ".join(BlogPost.model_fields)
+
 class Testimonial(BaseModel):
     id: int
     author_name: str
@@ -1243,7 +1250,7 @@ async def get_projects(
     """Récupérer les projets"""
     conn = await get_db_connection()
     try:
-        query = "SELECT * FROM projects WHERE 1=1"
+        query = f"SELECT {PROJECT_COLUMNS} FROM projects WHERE 1=1"
         params = []
         param_count = 0
 
@@ -1270,10 +1277,10 @@ async def get_projects(
             # Parse JSONB
             if isinstance(result.get('metrics'), str):
                 result['metrics'] = json.loads(result['metrics']) if result['metrics'] else {}
-            results.append(Project(**result))
-        return results
+            results.append(result)
+        return model_list(Project, results)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/projects/{slug}", response_model=Project)
 async def get_project(slug: str):
@@ -1281,7 +1288,7 @@ async def get_project(slug: str):
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            "SELECT * FROM projects WHERE slug = $1 AND is_published = TRUE",
+            f"SELECT {PROJECT_COLUMNS} FROM projects WHERE slug = $1 AND is_published = TRUE",
             slug
         )
         if not row:
@@ -1294,7 +1301,7 @@ async def get_project(slug: str):
             result['metrics'] = json.loads(result['metrics']) if result['metrics'] else {}
         return Project(**result)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Blog endpoints
 @app.get("/api/blog", response_model=List[BlogPost])
@@ -1302,41 +1309,78 @@ async def get_blog_posts(
     category: Optional[str] = Query(None, description="Filter by category"),
     featured_only: bool = Query(False, description="Show only featured posts"),
     published_only: bool = Query(True, description="Show only published posts"),
-    limit: int = Query(10, ge=1, le=50, description="Number of posts to return")
+    limit: int = Query(10, ge=1, le=50, description="Number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    response: Response = None
 ):
-    """Récupérer les articles de blog"""
+    """Récupérer les articles de blog (page suivante via X-Next-Cursor)"""
     conn = await get_db_connection()
     try:
-        query = "SELECT * FROM blog_posts WHERE 1=1"
+        filters = ""
         params = []
         param_count = 0
 
         if published_only:
-            query += " AND is_published = TRUE"
+            filters += " AND is_published = TRUE"
 
         if featured_only:
-            query += " AND is_featured = TRUE"
+            filters += " AND is_featured = TRUE"
 
         if category:
             param_count += 1
-            query += f" AND category = ${param_count}"
+            filters += f" AND category = ${param_count}"
             params.append(category)
 
-        query += " ORDER BY published_at DESC NULLS LAST"
+        limit_param = f"${param_count + 1}"
+        params.append(limit + 1)
         param_count += 1
-        query += f" LIMIT ${param_count}"
-        params.append(limit)
+
+        if not cursor:
+            query = f"""
+                SELECT {BLOG_POST_COLUMNS} FROM blog_posts WHERE 1=1{filters}
+                ORDER BY published_at DESC NULLS LAST, id DESC
+                LIMIT {limit_param}
+            """
+        else:
+            cursor_published_at, cursor_id = decode_cursor(cursor)
+            if cursor_published_at is not None:
+                # Suite des articles datés puis début des non datés (NULLS LAST) :
+                # deux parcours d'index bornés plutôt qu'un OR qui empêche le keyset
+                query = f"""
+                    (SELECT {BLOG_POST_COLUMNS} FROM blog_posts
+                     WHERE (published_at, id) < (${param_count + 1}, ${param_count + 2}){filters}
+                     ORDER BY published_at DESC, id DESC
+                     LIMIT {limit_param})
+                    UNION ALL
+                    (SELECT {BLOG_POST_COLUMNS} FROM blog_posts
+                     WHERE published_at IS NULL{filters}
+                     ORDER BY id DESC
+                     LIMIT {limit_param})
+                    ORDER BY published_at DESC NULLS LAST, id DESC
+                    LIMIT {limit_param}
+                """
+                params.extend([cursor_published_at, cursor_id])
+            else:
+                query = f"""
+                    SELECT {BLOG_POST_COLUMNS} FROM blog_posts
+                    WHERE published_at IS NULL AND id < ${param_count + 1}{filters}
+                    ORDER BY id DESC
+                    LIMIT {limit_param}
+                """
+                params.append(cursor_id)
 
         rows = await conn.fetch(query, *params)
+        rows = paginate(rows, limit, 'published_at', response)
         results = []
         for row in rows:
             result = dict(row)
             result['keywords'] = list(result['keywords']) if result['keywords'] else []
             result['tags'] = list(result['tags']) if result['tags'] else []
-            results.append(BlogPost(**result))
-        return results
+            result['view_count'] = blog_view_counter.total(result['id'], result['view_count'])
+            results.append(result)
+        return model_list(BlogPost, results, response)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/blog/{slug}", response_model=BlogPost)
 async def get_blog_post(slug: str):
@@ -1344,7 +1388,7 @@ async def get_blog_post(slug: str):
     conn = await get_db_connection()
     try:
         row = await conn.fetchrow(
-            "SELECT * FROM blog_posts WHERE slug = $1 AND is_published = TRUE",
+            f"SELECT {BLOG_POST_COLUMNS} FROM blog_posts WHERE slug = $1 AND is_published = TRUE",
             slug
         )
         if not row:
@@ -1354,15 +1398,13 @@ async def get_blog_post(slug: str):
         result['keywords'] = list(result['keywords']) if result['keywords'] else []
         result['tags'] = list(result['tags']) if result['tags'] else []
 
-        # Increment view count
-        await conn.execute(
-            "UPDATE blog_posts SET view_count = view_count + 1 WHERE id = $1",
-            result['id']
-        )
+        # Increment view count (écrit plus tard par blog_view_counter)
+        blog_view_counter.increment(result['id'])
+        result['view_count'] = blog_view_counter.total(result['id'], result['view_count'])
 
         return BlogPost(**result)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Testimonials endpoints
 @app.get("/api/testimonials", response_model=List[Testimonial])
@@ -1386,7 +1428,7 @@ async def get_testimonials(
         rows = await conn.fetch(query)
         return [Testimonial(**dict(row)) for row in rows]
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # GitHub Stats endpoint
 @app.get("/api/github-stats", response_model=GitHubStats)
@@ -1417,7 +1459,7 @@ async def get_github_stats(username: Optional[str] = None):
 
         return GitHubStats(**result)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Contact form endpoint
 @app.post("/api/contact")
@@ -1449,7 +1491,7 @@ async def submit_contact_form(submission: ContactSubmission):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to submit contact form: {str(e)}")
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # ==================== PHASE 3: DUAL MODE + ANALYTICS ENDPOINTS ====================
 
@@ -1474,17 +1516,21 @@ class ContentOverride(BaseModel):
     override_field: str
     override_value: str
 
+# Bornes des colonnes INTEGER d'analytics_events
+PG_INT_MIN, PG_INT_MAX = -2**31, 2**31 - 1
+
 class AnalyticsEvent(BaseModel):
+    # Limites = tailles des colonnes (phase 3) : un événement hors limites ferait rejeter tout son lot COPY
     session_id: str
-    event_type: str
-    event_category: Optional[str]
-    event_label: Optional[str]
-    event_value: Optional[int]
-    portfolio_mode: Optional[str]
-    page_url: Optional[str]
-    referrer_url: Optional[str]
-    target_type: Optional[str]
-    target_id: Optional[int]
+    event_type: str = Field(..., max_length=50)
+    event_category: Optional[str] = Field(..., max_length=50)
+    event_label: Optional[str] = Field(..., max_length=200)
+    event_value: Optional[int] = Field(..., ge=PG_INT_MIN, le=PG_INT_MAX)
+    portfolio_mode: Optional[str] = Field(..., max_length=50)
+    page_url: Optional[str] = Field(..., max_length=500)
+    referrer_url: Optional[str] = Field(..., max_length=500)
+    target_type: Optional[str] = Field(..., max_length=50)
+    target_id: Optional[int] = Field(..., ge=PG_INT_MIN, le=PG_INT_MAX)
     metadata: Optional[dict]
 
 class VisitorSession(BaseModel):
@@ -1521,9 +1567,26 @@ async def get_portfolio_modes(active_only: bool = Query(True, description="Show
             results.append(PortfolioMode(**result))
         return results
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Get content with mode overrides applied
+@app.get("/api/content")
+async def get_contents_with_mode(
+    mode: str = Query('cdi', description="Portfolio mode (cdi or freelance)"),
+    types: str = Query(..., description="Comma-separated content types, e.g. hero_pitch,title,availability"),
+    content_id: Optional[int] = Query(None, description="Specific content ID")
+):
+    """Get overrides for several content types in one call (served from memory)"""
+    await content_index.ensure_loaded()
+    content_types = [content_type.strip() for content_type in types.split(',') if content_type.strip()]
+    return {
+        "mode": mode,
+        "content": {
+            content_type: content_index.get(mode, content_type, content_id)
+            for content_type in content_types
+        }
+    }
+
 @app.get("/api/content/{content_type}")
 async def get_content_with_mode(
     content_type: str,
@@ -1531,32 +1594,9 @@ async def get_content_with_mode(
     content_id: Optional[int] = Query(None, description="Specific content ID")
 ):
     """Get content with mode-specific overrides applied"""
-    conn = await get_db_connection()
-    try:
-        # Get overrides for this mode and content type
-        override_query = """
-            SELECT override_field, override_value
-            FROM mode_content_overrides
-            WHERE mode_key = $1 AND content_type = $2 AND is_active = TRUE
-        """
-        params = [mode, content_type]
-
-        if content_id is not None:
-            override_query += " AND content_id = $3"
-            params.append(content_id)
-        else:
-            override_query += " AND content_id IS NULL"
-
-        override_query += " ORDER BY priority DESC"
-
-        overrides = await conn.fetch(override_query, *params)
-
-        # Convert to dict
-        override_dict = {row['override_field']: row['override_value'] for row in overrides}
-
-        return {"mode": mode, "content_type": content_type, "overrides": override_dict}
-    finally:
-        await conn.close()
+    await content_index.ensure_loaded()
+    override_dict = content_index.get(mode, content_type, content_id)
+    return {"mode": mode, "content_type": content_type, "overrides": override_dict}
 
 # Get projects with mode filtering
 @app.get("/api/mode-projects", response_model=List[Project])
@@ -1567,66 +1607,65 @@ async def get_mode_projects(
     """Get projects filtered and prioritized by mode"""
     conn = await get_db_connection()
     try:
-        query = """
-            SELECT *,
-                   (mode_priority->>$1)::INTEGER as priority
-            FROM projects
-            WHERE is_published = TRUE
-              AND $1 = ANY(target_modes)
-        """
-        params = [mode]
-
-        if featured_only:
-            query += " AND is_featured = TRUE"
-
-        query += " ORDER BY priority DESC NULLS LAST, project_date DESC"
-
-        rows = await conn.fetch(query, *params)
+        # Ordre servi depuis la mémoire (index couvrant de project_modes au premier appel)
+        ids = await mode_project_order.ids(conn, mode, featured_only)
+        if not ids:
+            return model_list(Project, [])
+        rows = await conn.fetch(f"SELECT {PROJECT_COLUMNS} FROM projects WHERE id = ANY($1::INTEGER[])", ids)
+        rows_by_id = {row['id']: row for row in rows}
         results = []
-        for row in rows:
+        for project_id in ids:
+            row = rows_by_id.get(project_id)
+            if row is None:
+                continue  # supprimé depuis la mise en cache de l'ordre
             result = dict(row)
             result['tags'] = list(result['tags']) if result['tags'] else []
             result['technologies'] = list(result['technologies']) if result['technologies'] else []
             if isinstance(result.get('metrics'), str):
                 result['metrics'] = json.loads(result['metrics']) if result['metrics'] else {}
-            if isinstance(result.get('mode_priority'), str):
-                result['mode_priority'] = json.loads(result['mode_priority']) if result['mode_priority'] else {}
-            result.pop('priority', None)  # Remove temp priority field
-            results.append(Project(**result))
-        return results
+            results.append(result)
+        return model_list(Project, results)
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 # Analytics endpoints
+MAX_ANALYTICS_BATCH = int(os.getenv("ANALYTICS_MAX_BATCH", "500"))
+
+def analytics_record(event: AnalyticsEvent) -> tuple:
+    """Convertir un événement en ligne COPY (ordre de AnalyticsEventBuffer.COLUMNS)"""
+    try:
+        session_id = uuid.UUID(event.session_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid session_id: {event.session_id}")
+
+    return (
+        session_id,
+        event.event_type,
+        event.event_category,
+        event.event_label,
+        event.event_value,
+        event.portfolio_mode,
+        event.page_url,
+        event.referrer_url,
+        event.target_type,
+        event.target_id,
+        event.metadata
+    )
+
 @app.post("/api/analytics/event")
 async def track_analytics_event(event: AnalyticsEvent):
     """Track an analytics event"""
-    conn = await get_db_connection()
-    try:
-        await conn.execute(
-            """
-            INSERT INTO analytics_events (
-                session_id, event_type, event_category, event_label, event_value,
-                portfolio_mode, page_url, referrer_url, target_type, target_id, metadata
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-            """,
-            event.session_id,
-            event.event_type,
-            event.event_category,
-            event.event_label,
-            event.event_value,
-            event.portfolio_mode,
-            event.page_url,
-            event.referrer_url,
-            event.target_type,
-            event.target_id,
-            json.dumps(event.metadata) if event.metadata else None
-        )
-        return {"success": True, "message": "Event tracked"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to track event: {str(e)}")
-    finally:
-        await conn.close()
+    analytics_buffer.add([analytics_record(event)])
+    return {"success": True, "message": "Event tracked"}
+
+@app.post("/api/analytics/events")
+async def track_analytics_events(events: List[AnalyticsEvent]):
+    """Track a batch of analytics events"""
+    if len(events) > MAX_ANALYTICS_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_ANALYTICS_BATCH} events)")
+
+    analytics_buffer.add([analytics_record(event) for event in events])
+    return {"success": True, "message": "Events tracked", "count": len(events)}
 
 @app.post("/api/analytics/session")
 async def create_or_update_session(session: VisitorSession):
@@ -1660,78 +1699,72 @@ async def create_or_update_session(session: VisitorSession):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.patch("/api/analytics/session/{session_id}")
 async def update_session_activity(session_id: str, updates: dict):
     """Update session activity (page views, projects viewed, etc.)"""
-    conn = await get_db_connection()
     try:
-        # Build dynamic update query
-        set_clauses = []
-        params = []
-        param_count = 1
+        session_uuid = uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid session_id: {session_id}")
 
+    # Normaliser les mises à jour (compteurs, flags, modes visités)
+    delta = {}
+    try:
         for key, value in updates.items():
-            if key in ['page_views', 'projects_viewed', 'blog_posts_viewed', 'mode_switches']:
-                set_clauses.append(f"{key} = {key} + ${param_count}")
-                params.append(value)
-                param_count += 1
-            elif key in ['contact_submitted', 'cv_downloaded']:
-                set_clauses.append(f"{key} = ${param_count}")
-                params.append(value)
-                param_count += 1
+            if key in SessionActivityAccumulator.COUNTERS:
+                delta[key] = int(value)
+            elif key in SessionActivityAccumulator.FLAGS:
+                delta[key] = bool(value)
             elif key == 'modes_viewed':
-                # Append to array
-                set_clauses.append(f"modes_viewed = array_append(modes_viewed, ${param_count})")
-                params.append(value)
-                param_count += 1
-
-        if not set_clauses:
-            return {"success": False, "message": "No valid updates provided"}
-
-        set_clauses.append(f"last_seen_at = CURRENT_TIMESTAMP")
-        params.append(session_id)
+                delta[key] = [str(mode) for mode in value] if isinstance(value, list) else [str(value)]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="Invalid session update values")
 
-        query = f"""
-            UPDATE visitor_sessions
-            SET {', '.join(set_clauses)}
-            WHERE id = ${param_count}
-        """
+    if not delta:
+        return {"success": False, "message": "No valid updates provided"}
 
-        await conn.execute(query, *params)
-        return {"success": True, "message": "Session updated"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to update session: {str(e)}")
-    finally:
-        await conn.close()
+    session_accumulator.add(session_uuid, delta)
+    return {"success": True, "message": "Session updated"}
 
 # Analytics dashboard endpoints
 @app.get("/api/analytics/summary")
 async def get_analytics_summary(mode: Optional[str] = None, days: int = Query(7, ge=1, le=90)):
-    """Get analytics summary for the last N days"""
+    """Get analytics summary for the last N days (read from the incremental rollups)"""
     conn = await get_db_connection()
     try:
-        query = """
-            SELECT
-                COUNT(DISTINCT session_id) as total_sessions,
-                COUNT(*) as total_events,
-                COUNT(DISTINCT CASE WHEN event_type = 'contact' THEN session_id END) as contacts,
-                COUNT(DISTINCT CASE WHEN event_type = 'cv_download' THEN session_id END) as cv_downloads,
-                AVG(CASE WHEN event_type = 'page_view' THEN 1 ELSE 0 END) as avg_page_views
-            FROM analytics_events
-            WHERE created_at >= CURRENT_DATE - INTERVAL '%s days'
-        """ % days
-
+        params = [days]
+        mode_filter = ""
         if mode:
-            query += " AND portfolio_mode = $1"
-            result = await conn.fetchrow(query, mode)
-        else:
-            result = await conn.fetchrow(query)
+            params.append(mode)
+            mode_filter = " AND portfolio_mode = $2"
 
+        query = f"""
+            WITH daily AS (
+                SELECT event_type, event_count FROM analytics_rollup_daily
+                WHERE day >= CURRENT_DATE - $1::INTEGER{mode_filter}
+            ),
+            sessions AS (
+                SELECT event_type, session_id FROM analytics_rollup_sessions
+                WHERE day >= CURRENT_DATE - $1::INTEGER{mode_filter}
+            )
+            SELECT
+                (SELECT COUNT(DISTINCT session_id) FROM sessions) as total_sessions,
+                (SELECT COALESCE(SUM(event_count), 0) FROM daily) as total_events,
+                (SELECT COUNT(DISTINCT session_id) FROM sessions WHERE event_type = 'contact') as contacts,
+                (SELECT COUNT(DISTINCT session_id) FROM sessions WHERE event_type = 'cv_download') as cv_downloads,
+                (
+                    SELECT SUM(event_count) FILTER (WHERE event_type = 'page_view')::NUMERIC
+                        / NULLIF(SUM(event_count), 0)
+                    FROM daily
+                ) as avg_page_views
+        """
+
+        result = await conn.fetchrow(query, *params)
         return dict(result) if result else {}
     finally:
-        await conn.close()
+        await release_db_connection(conn)
 
 @app.get("/api/analytics/mode-comparison")
 async def get_mode_comparison():
@@ -1741,7 +1774,264 @@ async def get_mode_comparison():
         rows = await conn.fetch("SELECT * FROM mode_performance_comparison")
         return [dict(row) for row in rows]
     finally:
-        await conn.close()
+        await release_db_connection(conn)
+
+# ==================== SEARCH ====================
+
+class SearchResult(BaseModel):
+    kind: str  # 'project', 'blog_post', 'portfolio_item'
+    id: int
+    ref: str  # slug (project, blog_post) ou repo (portfolio_item)
+    title: str
+    rank: float
+    highlight: str
+
+@app.get("/api/search", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms (websearch syntax)"),
+    limit: int = Query(20, ge=1, le=50, description="Number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    response: Response = None
+):
+    """Recherche plein texte classée dans les projets, articles et items du portfolio"""
+    cursor_rank = cursor_kind = cursor_id = None
+    if cursor:
+        cursor_rank, cursor_kind, cursor_id = unpack_cursor(cursor, 3)
+        if not isinstance(cursor_rank, (int, float)) or not isinstance(cursor_kind, str) or not isinstance(cursor_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    conn = await get_db_connection()
+    try:
+        after = (cursor_rank, cursor_kind, cursor_id) if cursor else None
+        rows, next_after = await search_rank_cache.page(conn, q, limit, after)
+    finally:
+        await release_db_connection(conn)
+
+    if next_after is not None and response is not None:
+        response.headers[NEXT_CURSOR_HEADER] = pack_cursor(*next_after)
+    return [SearchResult(**row) for row in rows]
+
+# ==================== BUNDLES ====================
+
+# Types de contenu dont la page d'accueil applique les overrides
+HOME_CONTENT_TYPES = ("hero_pitch", "title", "availability")
+BUNDLE_CACHE_MAX_AGE = int(os.getenv("BUNDLE_CACHE_MAX_AGE", "30"))
+
+async def optional_profile():
+    try:
+        return await get_profile()
+    except HTTPException as e:
+        if e.status_code == 404:
+            return None
+        raise
+
+@app.get("/api/bundle/home")
+async def get_home_bundle(response: Response, mode: str = Query('cdi', description="Portfolio mode")):
+    """Toutes les données de la page d'accueil en un seul appel (requêtes en parallèle sur le pool)"""
+    (
+        profile, timeline, projects, blog, testimonials, skills, modes, *contents
+    ) = await asyncio.gather(
+        optional_profile(),
+        get_timeline(category=None, highlights_only=False),
+        get_mode_projects(mode=mode, featured_only=True),
+        get_blog_posts(category=None, featured_only=True, published_only=True, limit=3, cursor=None),
+        get_testimonials(featured_only=True, published_only=True),
+        get_skills(category=None, primary_only=True),
+        get_portfolio_modes(active_only=True),
+        *(get_content_with_mode(content_type, mode=mode, content_id=None) for content_type in HOME_CONTENT_TYPES)
+    )
+
+    bundle = {
+        "mode": mode,
+        "profile": profile,
+        "timeline": timeline,
+        "projects": projects,
+        "blog": blog,
+        "testimonials": testimonials,
+        "skills": skills,
+        "modes": modes,
+        "content": {content["content_type"]: content["overrides"] for content in contents}
+    }
+
+    cache_control = f"public, max-age={BUNDLE_CACHE_MAX_AGE}"
+    if any(isinstance(value, PreSerializedJSON) for value in bundle.values()):
+        # FAST_SERIALIZATION : les listes déjà encodées sont insérées sans repasser par jsonable_encoder
+        return PreSerializedJSON(splice_object(bundle), headers={"Cache-Control": cache_control})
+    response.headers["Cache-Control"] = cache_control
+    return bundle
+
+# ==================== GITHUB SYNC ====================
+
+class SyncWatermark(BaseModel):
+    resource: str  # 'repos:<user>:<page>' ou 'repo:<owner>/<name>'
+    etag: Optional[str] = None
+    pushed_at: Optional[datetime] = None
+
+class SyncCommit(BaseModel):
+    watermarks: List[SyncWatermark]
+
+@app.post("/api/github/sync")
+async def sync_github(commit: bool = Query(False, description="Save the watermarks now instead of via /commit")):
+    """Dépôts poussés depuis la dernière synchronisation (un 304 par page ou README inchangé)
+
+    Les filigranes renvoyés sont à repasser à /api/github/sync/commit une fois les dépôts
+    traités : un workflow interrompu retrouve les mêmes dépôts à la synchronisation suivante.
+    """
+    if github_sync.running:
+        raise HTTPException(status_code=409, detail="GitHub sync already running")
+    try:
+        result = await github_sync.run()
+    except GitHubRateLimitError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except GitHubSyncError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except db.PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if commit:
+        try:
+            await github_sync.commit(result.watermarks)
+        except db.PoolTimeoutError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "changed": len(result.repos),
+        "unchanged": result.unchanged,
+        "requests": result.requests,
+        "not_modified": result.not_modified,
+        "committed": commit,
+        "watermarks": [
+            {"resource": resource, "etag": etag, "pushed_at": pushed_at}
+            for resource, (etag, pushed_at) in result.watermarks.items()
+        ],
+        "repos": [asdict(repo) for repo in result.repos],
+    }
+
+@app.post("/api/github/sync/commit")
+async def commit_github_sync(payload: SyncCommit):
+    """Enregistrer les filigranes d'une synchronisation dont les dépôts ont été traités"""
+    invalid = [w.resource for w in payload.watermarks if not w.resource.startswith(("repos:", "repo:"))]
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Unknown sync resources: {', '.join(invalid[:5])}")
+    try:
+        await github_sync.commit({w.resource: (w.etag, w.pushed_at) for w in payload.watermarks})
+    except db.PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"committed": len(payload.watermarks)}
+
+# Taille max d'un lot de projets synchronisés (un COPY + un upsert)
+MAX_PROJECT_BATCH = int(os.getenv("PROJECT_SYNC_MAX_BATCH", "1000"))
+
+class SyncedProject(BaseModel):
+    """Projet produit par le workflow de synchronisation GitHub (résumé LLM compris)"""
+    title: str
+    slug: str
+    short_description: str
+    long_description: Optional[str] = None
+    github_url: Optional[str] = None
+    github_repo_name: Optional[str] = None
+    github_stars: int = 0
+    github_forks: int = 0
+    github_language: Optional[str] = None
+    category: str
+    technologies: List[str] = []
+    business_impact: Optional[str] = None
+    # Valeurs initiales uniquement : un projet existant garde sa publication et ses modes
+    is_published: bool = False
+    is_featured: bool = False
+    target_modes: List[str] = ['cdi', 'freelance']
+
+@app.post("/api/projects/bulk")
+async def bulk_upsert_projects(projects: List[SyncedProject]):
+    """Insérer ou mettre à jour (par slug) un lot de projets ; seules les lignes modifiées sont réécrites"""
+    if len(projects) > MAX_PROJECT_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_PROJECT_BATCH} projects)")
+
+    records = [tuple(getattr(project, column) for column in SYNC_COLUMNS) for project in projects]
+    conn = await get_db_connection()
+    try:
+        result = await upsert_projects(conn, records)
+    except asyncpg.DataError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid project record: {e}")
+    except asyncpg.IntegrityConstraintViolationError as e:
+        raise HTTPException(status_code=422, detail=f"Project rejected by a constraint: {e}")
+    finally:
+        await release_db_connection(conn)
+
+    if result["inserted"] or result["updated"]:
+        await response_cache.invalidate("projects")
+    return result
+
+# ==================== RÉSUMÉS LLM ====================
+
+class SummaryInput(BaseModel):
+    """Ce qui est envoyé au modèle (mêmes champs que les dépôts de /api/github/sync)"""
+    repo_full_name: str
+    repo_description: Optional[str] = None
+    repo_language: Optional[str] = None
+    repo_topics: List[str] = []
+    readme_text: Optional[str] = None
+    model: str = SUMMARY_MODEL
+    prompt_version: str = SUMMARY_PROMPT_VERSION
+
+    def cache_key(self) -> str:
+        return summary_key(self.readme_text, self.model_dump(), self.prompt_version, self.model)
+
+class SummaryEntry(SummaryInput):
+    summary: dict
+    inference_ms: Optional[int] = None  # durée de l'appel au modèle, évitée à chaque hit
+
+@app.post("/api/summaries/lookup")
+async def lookup_summary(item: SummaryInput):
+    """Résumé déjà généré pour ce contenu : sur un hit, l'appel au modèle est sauté"""
+    key = item.cache_key()
+    conn = await get_db_connection()
+    try:
+        cached = await summary_cache.get(conn, key)
+    finally:
+        await release_db_connection(conn)
+    if cached is None:
+        return {"key": key, "hit": False, "summary": None}
+    summary, inference_ms = cached
+    return {"key": key, "hit": True, "summary": summary, "saved_ms": inference_ms}
+
+@app.post("/api/summaries")
+async def store_summary(entry: SummaryEntry):
+    """Enregistrer le résumé produit par le modèle pour ce contenu"""
+    key = entry.cache_key()
+    conn = await get_db_connection()
+    try:
+        await summary_cache.set(conn, key, entry.repo_full_name, entry.model, entry.prompt_version, entry.summary,
+                                entry.inference_ms)
+    finally:
+        await release_db_connection(conn)
+    return {"key": key}
+
+@app.get("/api/summaries/stats")
+async def get_summary_cache_stats():
+    """Entrées, hits et temps d'inférence évité (table), taux de hit du processus"""
+    conn = await get_db_connection()
+    try:
+        return await summary_cache.stats(conn)
+    finally:
+        await release_db_connection(conn)
+
+@app.delete("/api/summaries/{repo_full_name:path}")
+async def bust_summaries(repo_full_name: str):
+    """Forcer un nouveau résumé du dépôt (owner/name) à la prochaine synchronisation"""
+    conn = await get_db_connection()
+    try:
+        deleted = await summary_cache.bust(conn, [repo_full_name])
+    finally:
+        await release_db_connection(conn)
+    return {"repo_full_name": repo_full_name, "deleted": deleted}
+
+# ==================== MÉTRIQUES ====================
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métriques du processus au format texte Prometheus"""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
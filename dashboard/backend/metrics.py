@@ -0,0 +1,243 @@
+"""Métriques au format texte Prometheus : compteurs et histogrammes tenus en mémoire du processus."""
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Instrumentation des requêtes HTTP, du pool et des requêtes SQL (désactivable)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Bornes des histogrammes (secondes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ACQUIRE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+PDF_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Préfixe des requêtes SQL nommées : "-- name: portfolio_list" en première ligne
+QUERY_NAME_PREFIX = "-- name:"
+# Au-delà, le cache des noms est vidé (requêtes construites dynamiquement)
+QUERY_NAME_CACHE_SIZE = 10000
+
+Labels = Tuple
+Samples = Union[float, Iterable[Tuple[Labels, float]]]
+
+# Scope ASGI de la requête en cours : donne la route aux requêtes SQL non nommées
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+_registry: List["Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Lignes d'échantillons au format texte Prometheus (sans HELP ni TYPE)"""
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Gauge(Metric):
+    """Valeur sans labels modifiée directement (`gauge.value += 1`)"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self.value = 0
+
+    def samples(self):
+        yield f"{self.name} {_format_value(self.value)}"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Une série par combinaison de labels : compte par borne (non cumulé) puis somme"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(float(bound) for bound in buckets)
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, labels: Labels, value: float):
+        # Chemin chaud : une recherche dichotomique en C et deux incréments, cumul fait à l'export
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.bounds) + 1) + [0.0]
+        series[bisect_left(self.bounds, value)] += 1
+        series[-1] += value
+
+    def counts(self) -> Iterable[Tuple[Labels, int]]:
+        for labels, series in list(self._series.items()):
+            yield labels, sum(series[:-1])
+
+    def samples(self):
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(series[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class CallbackMetric(Metric):
+    """Valeurs lues au moment du scrape (tailles de files, compteurs tenus ailleurs) : rien sur le chemin chaud"""
+
+    def __init__(self, name: str, documentation: str, kind: str, collect: Callable[[], Samples],
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self):
+        values = self.collect()
+        if isinstance(values, (int, float)):
+            values = [((), values)]
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+def render() -> str:
+    return "".join(metric.render() for metric in _registry)
+
+
+# ==================== Métriques du backend ====================
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status",
+    ("method", "route", "status")
+)
+CallbackMetric(
+    "http_requests_total", "HTTP requests by route template and status", "counter",
+    REQUEST_DURATION.counts, ("method", "route", "status")
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed")
+
+POOL_ACQUIRE_DURATION = Histogram(
+    "db_pool_acquire_seconds", "Time spent waiting for a pooled database connection", buckets=ACQUIRE_BUCKETS
+)
+POOL_ACQUIRE_TIMEOUTS = Counter("db_pool_acquire_timeouts_total", "Connection acquisitions that timed out")
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Database query duration by query name (route template when unnamed)",
+    ("query",)
+)
+
+PDF_RENDER_DURATION = Histogram(
+    "pdf_render_seconds", "PDF render time including queueing in the render pool", ("renderer",),
+    buckets=PDF_BUCKETS
+)
+
+
+# ==================== Requêtes SQL ====================
+
+_query_names: Dict[str, Optional[str]] = {}
+
+
+def query_name(query: str) -> str:
+    """Nom déclaré dans la requête, sinon route de la requête HTTP en cours"""
+    name = _query_names.get(query, False)
+    if name is False:
+        if len(_query_names) >= QUERY_NAME_CACHE_SIZE:
+            _query_names.clear()
+        stripped = query.lstrip()
+        name = None
+        if stripped.startswith(QUERY_NAME_PREFIX):
+            name = stripped[len(QUERY_NAME_PREFIX):].split("\n", 1)[0].strip() or None
+        _query_names[query] = name
+    if name is not None:
+        return name
+    scope = current_scope.get()
+    route = scope.get("route") if scope is not None else None
+    return route.path if route is not None else "unnamed"
+
+
+# ==================== Middleware ====================
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence et statut par route, requêtes en cours"""
+
+    def __init__(self, app, routes: Sequence):
+        self.app = app
+        self.routes = routes
+        self._static_paths: Optional[frozenset] = None
+
+    def fallback_template(self, path: str) -> str:
+        """Réponse servie avant le routage (cache, 304) : seules les routes sans paramètre sont possibles"""
+        if self._static_paths is None:
+            self._static_paths = frozenset(
+                route.path for route in self.routes if getattr(route, "param_convertors", None) == {}
+            )
+        # Chemins inconnus regroupés pour borner le nombre de séries
+        return path if path in self._static_paths else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        # Fonction simple qui renvoie l'awaitable de `send` : pas de coroutine supplémentaire par message
+        def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            return send(message)
+
+        token = current_scope.set(scope)
+        IN_FLIGHT.value += 1
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = perf_counter() - started
+            IN_FLIGHT.value -= 1
+            current_scope.reset(token)
+            # Route posée dans le scope par le routeur FastAPI
+            route = scope.get("route")
+            template = route.path if route is not None else self.fallback_template(scope["path"])
+            REQUEST_DURATION.observe((scope["method"], template, status), duration)
@@ -0,0 +1,73 @@
+"""Écoute des NOTIFY PostgreSQL sur une connexion dédiée (hors pool)."""
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Délai avant de retenter une connexion LISTEN perdue (secondes)
+RECONNECT_DELAY = 2.0
+
+# handler(payload) ; payload vaut None après chaque (re)connexion (des NOTIFY ont pu être manqués)
+Handler = Callable[[Optional[str]], None]
+
+
+class NotificationListener:
+    """Maintient une connexion LISTEN et distribue les notifications par canal"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._conn: Optional[asyncpg.Connection] = None
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def start(self):
+        if self._task is None and self._handlers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _dispatch(self, _conn, _pid, channel: str, payload: str):
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Notification handler failed for channel %s", channel)
+
+    def _resync(self):
+        for channel in self._handlers:
+            self._dispatch(None, None, channel, None)
+
+    async def _run(self):
+        while True:
+            try:
+                closed = asyncio.Event()
+                self._conn = await asyncpg.connect(**db.DB_CONFIG)
+                self._conn.add_termination_listener(lambda _conn: closed.set())
+                for channel in self._handlers:
+                    await self._conn.add_listener(channel, self._dispatch)
+                # Y compris au premier LISTEN : un NOTIFY émis depuis le chargement initial a pu être manqué
+                self._resync()
+                await closed.wait()
+                logger.warning("LISTEN connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN connection failed")
+            finally:
+                if self._conn is not None and not self._conn.is_closed():
+                    await self._conn.close()
+                self._conn = None
+            await asyncio.sleep(RECONNECT_DELAY)
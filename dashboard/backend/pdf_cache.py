@@ -0,0 +1,125 @@
+"""Cache des PDF générés : LRU en mémoire borné en taille + niveau disque."""
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration du cache PDF
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "/tmp/portfolio_pdf_cache")  # vide = pas de niveau disque
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def pdf_cache_key(item_id: int, template: str, updated_at, *extra) -> str:
+    """Clé adressée par le contenu : change dès que l'item (ou le rendu) change"""
+    parts = [str(item_id), template, updated_at.isoformat() if updated_at else ""]
+    parts.extend(str(part) for part in extra)
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    # Préfixe item_id pour pouvoir invalider toutes les variantes d'un item
+    return f"{item_id}_{digest}"
+
+
+class PdfCache:
+    """LRU en mémoire (borné en octets) devant un répertoire de fichiers PDF"""
+
+    def __init__(
+        self,
+        max_bytes: int = PDF_CACHE_MAX_BYTES,
+        cache_dir: Optional[str] = PDF_CACHE_DIR,
+        disk_max_bytes: int = PDF_CACHE_DISK_MAX_BYTES
+    ):
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+        if self.cache_dir is not None:
+            try:
+                data = await asyncio.to_thread(self._path(key).read_bytes)
+            except FileNotFoundError:
+                data = None
+            except OSError:
+                logger.warning("Unreadable PDF cache entry %s", key, exc_info=True)
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                self.disk_hits += 1
+                return data
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if self.cache_dir is not None:
+            try:
+                await asyncio.to_thread(self._write, key, data)
+            except OSError:
+                logger.warning("Could not write PDF cache entry %s", key, exc_info=True)
+
+    def _write(self, key: str, data: bytes):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self._path(key))
+        self._prune_disk()
+
+    def _prune_disk(self):
+        files = []
+        for path in self.cache_dir.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    async def invalidate(self, item_id: int):
+        """Supprimer toutes les variantes (templates, versions) d'un item"""
+        prefix = f"{item_id}_"
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._size -= len(self._entries.pop(key))
+        if self.cache_dir is not None:
+            await asyncio.to_thread(self._unlink_prefix, prefix)
+
+    def _unlink_prefix(self, prefix: str):
+        if not self.cache_dir.is_dir():
+            return
+        for path in self.cache_dir.glob(f"{prefix}*.pdf"):
+            path.unlink(missing_ok=True)
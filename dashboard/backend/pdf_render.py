@@ -0,0 +1,296 @@
+"""Rendu ReportLab des exports PDF.
+
+Les fonctions de ce module ne reçoivent que des données simples (dict, list)
+pour pouvoir être exécutées dans un processus du pool PDF.
+"""
+import io
+from datetime import datetime
+from typing import List
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+# Templates de styles PDF
+PDF_TEMPLATES = {
+    "professional": {
+        "title_color": colors.darkblue,
+        "accent_color": colors.blue,
+        "title_size": 24,
+        "header_bg": colors.lightblue
+    },
+    "modern": {
+        "title_color": colors.purple,
+        "accent_color": colors.purple,
+        "title_size": 26,
+        "header_bg": colors.lavender
+    },
+    "minimalist": {
+        "title_color": colors.black,
+        "accent_color": colors.gray,
+        "title_size": 22,
+        "header_bg": colors.lightgrey
+    }
+}
+
+def render_portfolio_pdf(row: dict, template: str) -> bytes:
+    """Générer le PDF d'un item portfolio"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=72, rightMargin=72, topMargin=72, bottomMargin=72)
+    styles = getSampleStyleSheet()
+    story = []
+
+    current_template = PDF_TEMPLATES[template]
+
+    # En-tête avec logo et informations du développeur
+    header_data = [
+        ["Raouf Addeche", "Développeur Full Stack"],
+        ["Portfolio Project", datetime.now().strftime("%B %Y")]
+    ]
+    header_table = Table(header_data, colWidths=[3*inch, 3*inch])
+    header_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), current_template["header_bg"]),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(header_table)
+    story.append(Spacer(1, 20))
+
+    # Titre
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=current_template["title_size"],
+        spaceAfter=30,
+        textColor=current_template["title_color"],
+        alignment=1  # Center alignment
+    )
+    story.append(Paragraph(row['title'], title_style))
+    story.append(Spacer(1, 12))
+
+    # Séparateur visuel
+    story.append(HRFlowable(width="100%", thickness=2, color=current_template["accent_color"]))
+    story.append(Spacer(1, 12))
+
+    # Pitch court
+    story.append(Paragraph("<b>Résumé :</b>", styles['Heading2']))
+    story.append(Paragraph(row['short_pitch'], styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Description longue
+    story.append(Paragraph("<b>Description détaillée :</b>", styles['Heading2']))
+    story.append(Paragraph(row['long_desc'], styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Métriques business
+    if row['business_metrics']:
+        story.append(Paragraph("<b>Métriques Business :</b>", styles['Heading2']))
+        for key, value in row['business_metrics'].items():
+            if value:
+                story.append(Paragraph(f"• <b>{key.replace('_', ' ').title()}:</b> {value}", styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Métriques techniques
+    if row['technical_metrics']:
+        story.append(Paragraph("<b>Métriques Techniques :</b>", styles['Heading2']))
+        for key, value in row['technical_metrics'].items():
+            if value:
+                story.append(Paragraph(f"• <b>{key.replace('_', ' ').title()}:</b> {value}", styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Métriques business (en tableaux visuels)
+    if row['business_metrics']:
+        story.append(Paragraph("<b>Impact Business :</b>", styles['Heading2']))
+        business_data = []
+        for key, value in row['business_metrics'].items():
+            if value:
+                formatted_key = key.replace('_', ' ').title()
+                business_data.append([formatted_key, str(value)])
+
+        if business_data:
+            business_table = Table(business_data, colWidths=[2.5*inch, 3.5*inch])
+            business_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.blue),
+                ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('BACKGROUND', (1, 0), (1, -1), colors.lightblue),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(business_table)
+            story.append(Spacer(1, 12))
+
+    # Métriques techniques
+    if row['technical_metrics']:
+        story.append(Paragraph("<b>Performance Technique :</b>", styles['Heading2']))
+        tech_metrics_data = []
+        for key, value in row['technical_metrics'].items():
+            if value:
+                formatted_key = key.replace('_', ' ').title()
+                tech_metrics_data.append([formatted_key, str(value)])
+
+        if tech_metrics_data:
+            tech_metrics_table = Table(tech_metrics_data, colWidths=[2.5*inch, 3.5*inch])
+            tech_metrics_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.green),
+                ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('BACKGROUND', (1, 0), (1, -1), colors.lightgreen),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+            story.append(tech_metrics_table)
+            story.append(Spacer(1, 12))
+
+    # Réalisations
+    if row['achievements']:
+        story.append(Paragraph("<b>Réalisations :</b>", styles['Heading2']))
+        for achievement in row['achievements']:
+            story.append(Paragraph(f"• {achievement}", styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Informations techniques
+    tech_data = [
+        ['GitHub URL', row['github_url']],
+        ['Langage principal', row['github_language'] or 'N/A'],
+        ['Stars', str(row['github_stars'])],
+        ['Forks', str(row['github_forks'])],
+        ['Technologies', ', '.join(row['stack']) if row['stack'] else 'N/A'],
+        ['Tags', ', '.join(row['tags']) if row['tags'] else 'N/A'],
+        ['Complexité', f"{row['complexity_score']}/10" if row['complexity_score'] else 'N/A'],
+        ['Équipe', f"{row['team_size']} personne(s)" if row['team_size'] else 'N/A'],
+        ['Durée', f"{row['project_duration_months']} mois" if row['project_duration_months'] else 'N/A']
+    ]
+
+    tech_table = Table(tech_data, colWidths=[2*inch, 4*inch])
+    tech_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    story.append(Paragraph("<b>Informations techniques :</b>", styles['Heading2']))
+    story.append(tech_table)
+
+    # Pied de page avec QR code conceptuel (texte pour l'instant)
+    footer_data = [
+        ["Généré automatiquement", f"Portfolio Dashboard - {datetime.now().strftime('%d/%m/%Y')}"],
+        ["GitHub", row['github_url']],
+        ["Contact", "raouf.addeche@example.com"]
+    ]
+    footer_table = Table(footer_data, colWidths=[2*inch, 4*inch])
+    footer_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(Spacer(1, 20))
+    story.append(footer_table)
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_portfolio_summary_pdf(rows: List[dict], template: str) -> bytes:
+    """Générer le PDF de résumé du portfolio (meilleurs projets)"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=72, rightMargin=72, topMargin=72, bottomMargin=72)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # En-tête du portfolio
+    story.append(Paragraph("Portfolio Professionnel", ParagraphStyle(
+        'PortfolioTitle',
+        parent=styles['Heading1'],
+        fontSize=28,
+        textColor=colors.darkblue,
+        alignment=1,
+        spaceAfter=20
+    )))
+
+    story.append(Paragraph("Raouf Addeche - Développeur Full Stack", ParagraphStyle(
+        'Subtitle',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.blue,
+        alignment=1,
+        spaceAfter=30
+    )))
+
+    # Résumé exécutif
+    story.append(Paragraph("<b>Résumé Exécutif</b>", styles['Heading2']))
+    story.append(Paragraph(
+        "Développeur passionné spécialisé en intelligence artificielle, automatisation et développement full-stack. "
+        "Expertise en Python, React, et architectures cloud modernes. Créateur de solutions innovantes combinant "
+        "IA, DevOps et interfaces utilisateur intuitives.",
+        styles['Normal']
+    ))
+    story.append(Spacer(1, 20))
+
+    # Projets phares
+    story.append(Paragraph("<b>Projets Phares</b>", styles['Heading2']))
+
+    for i, row in enumerate(rows):
+        # Titre du projet
+        project_title = ParagraphStyle(
+            f'ProjectTitle{i}',
+            parent=styles['Heading3'],
+            fontSize=14,
+            textColor=colors.darkblue,
+            spaceAfter=10
+        )
+        story.append(Paragraph(f"{i+1}. {row['title']}", project_title))
+
+        # Description courte
+        story.append(Paragraph(row['short_pitch'], styles['Normal']))
+
+        # Métriques en tableau compact
+        if row['business_metrics'] or row['technical_metrics']:
+            metrics_data = []
+            if row['business_metrics']:
+                for key, value in row['business_metrics'].items():
+                    if value:
+                        metrics_data.append([key.replace('_', ' ').title(), str(value)])
+
+            if metrics_data:
+                metrics_table = Table(metrics_data[:3], colWidths=[2*inch, 2*inch])  # Limite à 3 métriques
+                metrics_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
+                    ('FONTSIZE', (0, 0), (-1, -1), 8),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+                ]))
+                story.append(metrics_table)
+
+        story.append(Spacer(1, 15))
+
+    # Technologies maîtrisées
+    all_techs = set()
+    for row in rows:
+        if row['stack']:
+            all_techs.update(row['stack'])
+
+    story.append(Paragraph("<b>Technologies Maîtrisées</b>", styles['Heading2']))
+    tech_text = " • ".join(sorted(list(all_techs))[:15])  # Top 15 technologies
+    story.append(Paragraph(tech_text, styles['Normal']))
+
+    doc.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,144 @@
+"""Pool de processus dédié au rendu PDF (ReportLab est CPU-bound et bloquant)."""
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+from typing import Callable, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Configuration du pool PDF
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))  # 0 = rendu dans un thread
+PDF_QUEUE_SIZE = int(os.getenv("PDF_QUEUE_SIZE", "8"))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+# Importer ReportLab en tâche de fond après le démarrage plutôt qu'au premier export
+PDF_PREWARM = os.getenv("PDF_PREWARM", "true").lower() == "true"
+
+# Module de rendu (ReportLab) : jamais importé au démarrage d'un worker uvicorn
+PDF_RENDER_MODULE = "pdf_render"
+
+
+class PdfQueueFullError(Exception):
+    """Trop de rendus PDF en cours ou en attente"""
+
+
+class PdfRenderTimeoutError(Exception):
+    """Le rendu PDF a dépassé PDF_RENDER_TIMEOUT"""
+
+
+def preload_renderer():
+    """Importer le module de rendu (exécuté aussi dans les processus du pool)"""
+    importlib.import_module(PDF_RENDER_MODULE)
+
+
+class PdfRenderPool:
+    """Exécute les fonctions de rendu dans des processus séparés, avec file bornée"""
+
+    def __init__(
+        self,
+        workers: int = PDF_WORKERS,
+        queue_size: int = PDF_QUEUE_SIZE,
+        timeout: float = PDF_RENDER_TIMEOUT
+    ):
+        self.workers = workers
+        self.max_in_flight = max(workers, 1) + queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self._executor: Optional[Executor] = None
+        self._renderer = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.workers > 0:
+            # spawn : pas de fork d'un processus qui fait tourner une boucle asyncio et des threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
+
+    def shutdown(self):
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def renderer(self):
+        """Module de rendu, importé dans un thread au premier appel pour ne pas bloquer la boucle"""
+        if self._renderer is None:
+            # import_module attend la fin d'un import déjà en cours (pré-chargement) au lieu de renvoyer un module partiel
+            self._renderer = await asyncio.to_thread(importlib.import_module, PDF_RENDER_MODULE)
+        return self._renderer
+
+    def schedule_prewarm(self):
+        """Pré-charger ReportLab (processus courant et workers) en tâche de fond"""
+        if self._prewarm_task is None:
+            self._prewarm_task = asyncio.create_task(self._prewarm())
+
+    async def _prewarm(self):
+        started = perf_counter()
+        try:
+            await self.renderer()
+            if self.workers > 0:
+                if self._executor is None:
+                    self.start()
+                # Démarre les processus (spawn) et y importe ReportLab avant le premier export
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*(
+                    loop.run_in_executor(self._executor, preload_renderer) for _ in range(self.workers)
+                ))
+        except Exception:
+            logger.exception("PDF renderer prewarm failed")
+            return
+        logger.info("PDF renderer prewarmed in %.0f ms", (perf_counter() - started) * 1000)
+
+    def _release(self):
+        self.in_flight -= 1
+
+    async def render(self, render: Callable[..., bytes], *args) -> bytes:
+        """Rendre un PDF ; `render` doit être une fonction de module et `args` picklables"""
+        if self.in_flight >= self.max_in_flight:
+            raise PdfQueueFullError(f"PDF render queue is full ({self.max_in_flight} jobs)")
+        if self._executor is None:
+            self.start()
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        started = perf_counter()
+        job = executor.submit(render, *args)
+
+        # La place n'est libérée qu'à la fin réelle du rendu, même après un timeout
+        self.in_flight += 1
+
+        def release(_job):
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                pass  # boucle déjà fermée (arrêt du serveur)
+
+        job.add_done_callback(release)
+
+        try:
+            content = await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise PdfRenderTimeoutError(f"PDF rendering took more than {self.timeout}s")
+        except BrokenProcessPool:
+            # Un worker est mort (OOM, segfault) : repartir sur un pool neuf
+            if self._executor is executor:
+                logger.exception("PDF process pool is broken, restarting it")
+                self.shutdown()
+                self.start()
+            raise
+        metrics.PDF_RENDER_DURATION.observe((render.__name__,), perf_counter() - started)
+        return content
@@ -0,0 +1,56 @@
+"""Ingestion par lots des projets synchronisés depuis GitHub : COPY vers une table temporaire puis un seul upsert."""
+from typing import Dict, List, Sequence
+
+# Colonnes écrites par la synchronisation, dans l'ordre du COPY
+SYNC_COLUMNS = (
+    "slug", "title", "short_description", "long_description",
+    "github_url", "github_repo_name", "github_stars", "github_forks", "github_language",
+    "category", "technologies", "business_impact",
+    "is_published", "is_featured", "target_modes",
+)
+# Fixées à l'insertion seulement : la revue (publication, mise en avant, modes) n'est jamais écrasée
+INSERT_ONLY_COLUMNS = ("is_published", "is_featured", "target_modes")
+UPDATED_COLUMNS = tuple(column for column in SYNC_COLUMNS if column not in ("slug",) + INSERT_ONLY_COLUMNS)
+
+STAGING_TABLE = "project_sync_staging"
+
+CREATE_STAGING = f"""
+-- name: project_sync_staging
+CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS
+SELECT {", ".join(SYNC_COLUMNS)} FROM projects WITH NO DATA
+"""
+
+# Une seule instruction : les lignes dont le contenu n'a pas changé ne sont ni réécrites ni renvoyées
+# (pas de nouvelle version de ligne, updated_at et triggers intacts) ; xmax = 0 distingue une insertion
+UPSERT = f"""
+-- name: project_sync_upsert
+INSERT INTO projects ({", ".join(SYNC_COLUMNS)})
+SELECT {", ".join(SYNC_COLUMNS)} FROM {STAGING_TABLE}
+ON CONFLICT (slug) DO UPDATE
+    SET {", ".join(f"{column} = EXCLUDED.{column}" for column in UPDATED_COLUMNS)}
+    WHERE ({", ".join(f"projects.{column}" for column in UPDATED_COLUMNS)})
+          IS DISTINCT FROM
+          ({", ".join(f"EXCLUDED.{column}" for column in UPDATED_COLUMNS)})
+RETURNING id, slug, (xmax = 0) AS inserted
+"""
+
+
+async def upsert_projects(conn, records: Sequence[tuple]) -> Dict[str, object]:
+    """Upsert des tuples (ordre SYNC_COLUMNS) ; un slug répété dans le lot : la dernière version l'emporte"""
+    # ON CONFLICT refuse de modifier deux fois la même ligne dans une instruction
+    batch = list({record[0]: record for record in records}.values())
+    async with conn.transaction():
+        await conn.execute(CREATE_STAGING)
+        await conn.copy_records_to_table(STAGING_TABLE, records=batch, columns=SYNC_COLUMNS)
+        rows = await conn.fetch(UPSERT)
+
+    inserted: List[str] = [row['slug'] for row in rows if row['inserted']]
+    updated: List[str] = [row['slug'] for row in rows if not row['inserted']]
+    return {
+        "received": len(records),
+        "inserted": len(inserted),
+        "updated": len(updated),
+        "unchanged": len(batch) - len(rows),
+        "inserted_slugs": inserted,
+        "updated_slugs": updated,
+    }
@@ -0,0 +1,201 @@
+"""Journal des requêtes SQL lentes et trace des requêtes émises par chaque requête HTTP."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seuil du journal des requêtes lentes (ms, négatif = désactivé)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Part des requêtes lentes dont le plan est capturé par EXPLAIN (ANALYZE, BUFFERS), 0 = jamais
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0"))
+# Au plus un EXPLAIN par empreinte sur cet intervalle (secondes)
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+# Trace par requête HTTP (en-tête Server-Timing + journal de toutes ses requêtes SQL si l'une est lente)
+QUERY_TRACE = os.getenv("QUERY_TRACE", "false").lower() == "true"
+
+# Longueur max du SQL recopié dans le journal
+LOGGED_SQL_LENGTH = 2000
+# Requêtes détaillées dans Server-Timing (le total est toujours présent)
+SERVER_TIMING_MAX_QUERIES = 20
+# Au-delà, le cache des empreintes est vidé (requêtes construites dynamiquement)
+FINGERPRINT_CACHE_SIZE = 10000
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?")
+_SPACES = re.compile(r"\s+")
+# Seules les lectures sont rejouées sous EXPLAIN ANALYZE (et toujours dans une transaction annulée)
+_READ_ONLY = re.compile(r"^\s*(?:--[^\n]*\n\s*)*(?:SELECT|WITH)\b", re.I)
+_WRITES = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE)\b", re.I)
+
+
+@dataclass
+class QueryRecord:
+    fingerprint: str
+    name: str
+    params: int
+    rows: Optional[int]
+    duration_ms: float
+
+
+@dataclass
+class RequestTrace:
+    scope: dict
+    records: List[QueryRecord] = field(default_factory=list)
+    slow: bool = False
+
+    def server_timing(self) -> str:
+        total = sum(record.duration_ms for record in self.records)
+        parts = [f'db;dur={total:.2f};desc="{len(self.records)} queries"']
+        for index, record in enumerate(self.records[:SERVER_TIMING_MAX_QUERIES]):
+            parts.append(f'q{index};dur={record.duration_ms:.2f};desc="{record.name}"')
+        return ", ".join(parts)
+
+
+# Trace de la requête HTTP en cours (None hors requête ou si QUERY_TRACE est désactivé)
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+# Vrai dans les tâches EXPLAIN : leurs propres requêtes ne sont pas journalisées
+_explaining: ContextVar[bool] = ContextVar("explaining", default=False)
+
+_fingerprints: Dict[str, Tuple[str, str]] = {}
+
+
+def fingerprint(query: str) -> Tuple[str, str]:
+    """(empreinte, SQL normalisé) : commentaires retirés, littéraux remplacés par ?, espaces réduits"""
+    cached = _fingerprints.get(query)
+    if cached is None:
+        if len(_fingerprints) >= FINGERPRINT_CACHE_SIZE:
+            _fingerprints.clear()
+        normalized = _SPACES.sub(" ", _LITERALS.sub("?", _COMMENTS.sub(" ", query))).strip()
+        cached = _fingerprints[query] = (hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized)
+    return cached
+
+
+def explainable(query: str) -> bool:
+    return bool(_READ_ONLY.match(query)) and not _WRITES.search(query)
+
+
+def _route(trace: Optional[RequestTrace]) -> Optional[str]:
+    scope = trace.scope if trace is not None else metrics.current_scope.get()
+    route = scope.get("route") if scope is not None else None
+    return route.path if route is not None else None
+
+
+class SlowQueryLog:
+    """Décide, pour chaque requête SQL mesurée, de la tracer, de la journaliser et d'en capturer le plan"""
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        explain_sample: float = SLOW_QUERY_EXPLAIN_SAMPLE,
+        explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL
+    ):
+        self.threshold = threshold_ms / 1000 if threshold_ms >= 0 else None
+        self.explain_sample = explain_sample
+        self.explain_interval = explain_interval
+        self._last_explain: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.slow_queries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None or QUERY_TRACE
+
+    def observe(self, query: str, params: int, rows: Optional[int], duration: float) -> bool:
+        """Enregistrer une requête terminée ; True si son plan doit être capturé"""
+        trace = current_trace.get()
+        slow = self.threshold is not None and duration >= self.threshold
+        if (trace is None and not slow) or _explaining.get():
+            return False
+
+        fp, normalized = fingerprint(query)
+        record = QueryRecord(fp, metrics.query_name(query), params, rows, round(duration * 1000, 3))
+        if trace is not None:
+            trace.records.append(record)
+        if not slow:
+            return False
+
+        self.slow_queries += 1
+        if trace is not None:
+            trace.slow = True
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            **asdict(record),
+            "route": _route(trace),
+            "sql": normalized[:LOGGED_SQL_LENGTH],
+        }))
+        return self._should_explain(fp, query)
+
+    def _should_explain(self, fp: str, query: str) -> bool:
+        if self.explain_sample <= 0 or random.random() >= self.explain_sample:
+            return False
+        now = time.monotonic()
+        if now - self._last_explain.get(fp, float("-inf")) < self.explain_interval:
+            return False
+        if not explainable(query):
+            return False
+        self._last_explain[fp] = now
+        return True
+
+    def schedule_explain(self, explain: Callable[[str, tuple], Awaitable[object]], query: str, args: tuple):
+        """Capturer le plan en tâche de fond, sur une autre connexion : la route n'attend pas"""
+        task = asyncio.create_task(self._explain(explain, query, args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, explain, query: str, args: tuple):
+        _explaining.set(True)
+        fp, _ = fingerprint(query)
+        try:
+            plan = await explain(query, args)
+        except Exception:
+            logger.exception("EXPLAIN failed for slow query %s", fp)
+            return
+        logger.warning(json.dumps({"event": "slow_query_plan", "fingerprint": fp, "plan": plan}, default=str))
+
+
+slow_query_log = SlowQueryLog()
+
+
+class QueryTraceMiddleware:
+    """Middleware ASGI : rattache à la requête HTTP toutes les requêtes SQL qu'elle émet"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        trace = RequestTrace(scope)
+
+        def send_with_timing(message):
+            if message["type"] == "http.response.start" and trace.records:
+                headers = list(message.get("headers", [])) + [(b"server-timing", trace.server_timing().encode())]
+                message = {**message, "headers": headers}
+            return send(message)
+
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_trace.reset(token)
+            if trace.slow:
+                # Une requête lente : on journalise tout ce que la route a exécuté, dans l'ordre
+                logger.warning(json.dumps({
+                    "event": "slow_request_queries",
+                    "method": scope["method"],
+                    "route": _route(trace) or scope["path"],
+                    "db_ms": round(sum(record.duration_ms for record in trace.records), 3),
+                    "queries": [asdict(record) for record in trace.records],
+                }))
@@ -0,0 +1,285 @@
+"""Cache des réponses des endpoints de lecture, invalidé par tags."""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Configuration du cache de réponses
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory, postgres ou off
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# (content_type, body, autres en-têtes de la réponse d'origine)
+CachedResponse = Tuple[str, bytes, List[Tuple[str, str]]]
+
+# En-têtes recalculés au rejeu, jamais stockés
+UNCACHED_HEADERS = (b"content-type", b"content-length", b"x-cache")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    tags: Tuple[str, ...]
+    ttl: int
+
+
+class MemoryBackend:
+    """LRU en mémoire du processus, borné en nombre d'entrées et en octets"""
+
+    shared = False
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[str, ...], CachedResponse]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._size = 0
+
+    def _drop(self, key: str):
+        _, tags, (_, body, _) = self._entries.pop(key)
+        self._size -= len(body)
+        for tag in tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, key: str, tags: Tuple[str, ...], ttl: int, value: CachedResponse):
+        if len(value[1]) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, tags, value)
+        self._size += len(value[1])
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]):
+        for tag in tags:
+            for key in list(self._by_tag.get(tag, ())):
+                self._drop(key)
+
+    async def clear(self):
+        self._entries.clear()
+        self._by_tag.clear()
+        self._size = 0
+
+
+class PostgresBackend:
+    """Cache partagé entre workers et conteneurs, dans la table UNLOGGED response_cache"""
+
+    # Purge des entrées expirées / en trop toutes les N écritures
+    PRUNE_EVERY = 100
+
+    shared = True
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._writes = 0
+
+    async def _execute(self, query: str, *args):
+        conn = await db.acquire()
+        try:
+            return await conn.execute(query, *args)
+        finally:
+            await db.release(conn)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        conn = await db.acquire()
+        try:
+            row = await conn.fetchrow(
+                """
+                -- name: response_cache_get
+                SELECT content_type, body, headers FROM response_cache
+                WHERE cache_key = $1 AND expires_at > CURRENT_TIMESTAMP
+                """,
+                key
+            )
+        finally:
+            await db.release(conn)
+        return (row['content_type'], row['body'], [tuple(h) for h in row['headers']]) if row else None
+
+    async def set(self, key: str, tags: Tuple[str, ...], ttl: int, value: CachedResponse):
+        await self._execute(
+            """
+            -- name: response_cache_set
+            INSERT INTO response_cache (cache_key, tags, content_type, body, headers, expires_at)
+            VALUES ($1, $2, $3, $4, $5, CURRENT_TIMESTAMP + make_interval(secs => $6))
+            ON CONFLICT (cache_key) DO UPDATE
+                SET tags = EXCLUDED.tags, content_type = EXCLUDED.content_type,
+                    body = EXCLUDED.body, headers = EXCLUDED.headers,
+                    expires_at = EXCLUDED.expires_at, created_at = CURRENT_TIMESTAMP
+            """,
+            key, list(tags), value[0], value[1], [list(h) for h in value[2]], float(ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            await self._execute(
+                """
+                -- name: response_cache_prune
+                DELETE FROM response_cache
+                WHERE expires_at <= CURRENT_TIMESTAMP
+                   OR cache_key IN (
+                       SELECT cache_key FROM response_cache
+                       ORDER BY created_at DESC OFFSET $1
+                   )
+                """,
+                self.max_entries
+            )
+
+    async def invalidate(self, tags: Iterable[str]):
+        await self._execute(
+            "-- name: response_cache_invalidate\nDELETE FROM response_cache WHERE tags && $1::TEXT[]", list(tags)
+        )
+
+    async def clear(self):
+        await self._execute("-- name: response_cache_clear\nTRUNCATE response_cache")
+
+
+class ResponseCache:
+    """Façade : backend choisi par RESPONSE_CACHE_BACKEND + compteurs de génération par tag"""
+
+    def __init__(self, backend_name: str = RESPONSE_CACHE_BACKEND):
+        self.enabled = backend_name != "off"
+        self.backend = PostgresBackend() if backend_name == "postgres" else MemoryBackend()
+        # Une réponse calculée pendant une invalidation de ses tags ne doit pas être stockée
+        self._generations: Dict[str, int] = {}
+        self._clear_generation = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def snapshot(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return (self._clear_generation,) + tuple(self._generations.get(tag, 0) for tag in tags)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("Response cache lookup failed")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, policy: CachePolicy, value: CachedResponse, snapshot: Tuple[int, ...]):
+        if snapshot != self.snapshot(policy.tags):
+            return
+        try:
+            await self.backend.set(key, policy.tags, policy.ttl, value)
+        except Exception:
+            logger.exception("Response cache store failed")
+
+    async def invalidate(self, *tags: str):
+        """Invalidation explicite, à appeler depuis les routes d'écriture"""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        try:
+            await self.backend.invalidate(tags)
+        except Exception:
+            logger.exception("Response cache invalidation failed for %s", tags)
+
+    async def clear(self):
+        """Vidage explicite (administration) : TRUNCATE du cache partagé avec le backend postgres"""
+        self._clear_generation += 1
+        try:
+            await self.backend.clear()
+        except Exception:
+            logger.exception("Response cache clear failed")
+
+    async def resync(self):
+        """Après une (re)connexion LISTEN : oublier l'état de ce processus seulement
+
+        Les autres workers ont reçu les NOTIFY manqués ici et invalidé les entrées partagées ;
+        celles qui restent expirent par leur TTL.
+        """
+        self._clear_generation += 1
+        if not self.backend.shared:
+            await self.backend.clear()
+
+    def on_table_changed(self, payload: Optional[str]):
+        """Handler NOTIFY table_version_changed : le nom de table sert de tag"""
+        if payload is None:
+            task = asyncio.create_task(self.resync())
+        else:
+            task = asyncio.create_task(self.invalidate(payload.rpartition(':')[0]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI : sert les GET des routes configurées depuis le cache"""
+
+    def __init__(self, app, cache: ResponseCache, routes: Mapping[str, CachePolicy]):
+        self.app = app
+        self.cache = cache
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        policy = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if policy is None or scope["method"] != "GET" or not self.cache.enabled:
+            return await self.app(scope, receive, send)
+
+        key = scope["path"] + "?" + scope["query_string"].decode('latin-1')
+        cached = await self.cache.get(key)
+        if cached is not None:
+            content_type, body, extra_headers = cached
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    *((name.encode('latin-1'), value.encode('latin-1')) for name, value in extra_headers),
+                    (b"x-cache", b"HIT")
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        snapshot = self.cache.snapshot(policy.tags)
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-cache", b"MISS")]}
+                await send(message)
+                return
+            await send(message)
+            if message["type"] == "http.response.body" and start is not None and start["status"] == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Stocké après l'envoi : le client n'attend pas l'écriture dans le cache
+                    headers = start.get("headers", [])
+                    content_type = dict(headers).get(b"content-type", b"application/json")
+                    extra_headers = [
+                        (name.decode('latin-1'), value.decode('latin-1'))
+                        for name, value in headers if name.lower() not in UNCACHED_HEADERS
+                    ]
+                    await self.cache.set(key, policy, (content_type.decode(), b"".join(chunks), extra_headers), snapshot)
+
+        await self.app(scope, receive, capture)
@@ -0,0 +1,88 @@
+"""Maintenance analytics en tâche de fond : agrégats incrémentaux et partitions (sql/phase4_schema.sql)."""
+import asyncio
+import logging
+import os
+from contextlib import suppress
+
+import db
+from buffers import PeriodicFlusher
+
+logger = logging.getLogger(__name__)
+
+# Configuration de l'agrégateur
+ANALYTICS_ROLLUP_INTERVAL = float(os.getenv("ANALYTICS_ROLLUP_INTERVAL", "30"))
+ANALYTICS_ROLLUP_BATCH = int(os.getenv("ANALYTICS_ROLLUP_BATCH", "50000"))
+
+# Configuration de la maintenance des partitions mensuelles de analytics_events
+ANALYTICS_PARTITION_INTERVAL = float(os.getenv("ANALYTICS_PARTITION_INTERVAL", "21600"))
+ANALYTICS_PARTITION_MONTHS_AHEAD = int(os.getenv("ANALYTICS_PARTITION_MONTHS_AHEAD", "3"))
+ANALYTICS_RETENTION_MONTHS = int(os.getenv("ANALYTICS_RETENTION_MONTHS", "13"))
+ANALYTICS_RETENTION_DROP = os.getenv("ANALYTICS_RETENTION_DROP", "true").lower() == "true"  # false = détacher seulement
+
+
+class AnalyticsRollupRefresher(PeriodicFlusher):
+    """Appelle refresh_analytics_rollups() jusqu'à épuisement des nouveaux événements"""
+
+    def __init__(self, interval: float = ANALYTICS_ROLLUP_INTERVAL, batch: int = ANALYTICS_ROLLUP_BATCH):
+        super().__init__(interval)
+        self.batch = batch
+        self.processed = 0
+
+    async def flush(self):
+        conn = await db.acquire()
+        try:
+            # Rattrapage par lots : chaque lot est une transaction courte
+            while True:
+                count = await conn.fetchval(
+                    "-- name: analytics_rollups_refresh\nSELECT refresh_analytics_rollups($1)", self.batch
+                )
+                self.processed += count
+                if count < self.batch:
+                    break
+        finally:
+            await db.release(conn)
+
+
+class AnalyticsPartitionMaintainer(PeriodicFlusher):
+    """Crée les partitions à venir et applique la rétention via maintain_analytics_partitions()"""
+
+    def __init__(
+        self,
+        interval: float = ANALYTICS_PARTITION_INTERVAL,
+        months_ahead: int = ANALYTICS_PARTITION_MONTHS_AHEAD,
+        retention_months: int = ANALYTICS_RETENTION_MONTHS,
+        drop: bool = ANALYTICS_RETENTION_DROP
+    ):
+        super().__init__(interval)
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.drop = drop
+
+    async def start(self):
+        # Premier passage dès le démarrage, sans attendre un intervalle complet
+        await super().start()
+        self.wake()
+
+    async def stop(self):
+        # Pas de DDL pendant l'arrêt du serveur
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def flush(self):
+        conn = await db.acquire()
+        try:
+            rows = await conn.fetch(
+                """
+                -- name: analytics_partitions_maintain
+                SELECT action, partition_name FROM maintain_analytics_partitions($1, $2, $3)
+                """,
+                self.months_ahead, self.retention_months, self.drop
+            )
+        finally:
+            await db.release(conn)
+        for row in rows:
+            level = logging.WARNING if row['action'] == 'failed' else logging.INFO
+            logger.log(level, "analytics_events partition %s: %s", row['action'], row['partition_name'])
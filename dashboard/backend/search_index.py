@@ -0,0 +1,123 @@
+"""Classement plein texte de /api/search gardé en mémoire par requête : les pages suivantes ne reclassent pas tout."""
+import os
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+SEARCH_CONFIG = "french"
+SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MinWords=8, MaxWords=25, StartSel=<mark>, StopSel=</mark>"
+# Correspondances classées conservées par requête ; la pagination s'arrête au-delà
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+
+# (kind, id, ref, title, rank) ; kind : 'project', 'blog_post', 'portfolio_item'
+RankedHit = Tuple[str, int, str, str, float]
+# (rank, kind, id) : ordre du classement et du curseur
+HitKey = Tuple[float, str, int]
+
+
+class SearchRankCache:
+    """Requête -> correspondances classées, gardées jusqu'au prochain changement d'une table indexée"""
+
+    # Classement sur les colonnes tsvector générées (index GIN), une seule fois par requête
+    RANK_QUERY = """
+        -- name: search_rank
+        WITH q AS (
+            SELECT websearch_to_tsquery('{config}', $1) AS query
+        )
+        SELECT 'project' AS kind, p.id, p.slug AS ref, p.title, ts_rank_cd(p.search_vector, q.query) AS rank
+        FROM projects p, q
+        WHERE p.search_vector @@ q.query AND p.is_published = TRUE
+        UNION ALL
+        SELECT 'blog_post', b.id, b.slug, b.title, ts_rank_cd(b.search_vector, q.query)
+        FROM blog_posts b, q
+        WHERE b.search_vector @@ q.query AND b.is_published = TRUE
+        UNION ALL
+        SELECT 'portfolio_item', i.id, i.repo, i.title, ts_rank_cd(i.search_vector, q.query)
+        FROM portfolio_items i, q
+        WHERE i.search_vector @@ q.query AND i.status IN ('approved', 'published')
+        ORDER BY rank DESC, kind DESC, id DESC
+        LIMIT $2
+    """.format(config=SEARCH_CONFIG)
+
+    # Extraits surlignés de la seule page servie (ts_headline relit le texte complet)
+    HEADLINE_QUERY = """
+        -- name: search_headlines
+        WITH q AS (
+            SELECT websearch_to_tsquery('{config}', $1) AS query
+        )
+        SELECT page.position,
+               ts_headline('{config}', CASE page.kind
+                   WHEN 'project' THEN COALESCE(p.short_description, '') || ' ' || COALESCE(p.long_description, '')
+                   WHEN 'blog_post' THEN b.excerpt || ' ' || b.content
+                   ELSE COALESCE(i.short_pitch, '') || ' ' || COALESCE(i.long_desc, '')
+               END, q.query, '{headline}') AS highlight
+        FROM unnest($2::TEXT[], $3::INTEGER[]) WITH ORDINALITY AS page(kind, id, position)
+        CROSS JOIN q
+        LEFT JOIN projects p ON page.kind = 'project' AND p.id = page.id
+        LEFT JOIN blog_posts b ON page.kind = 'blog_post' AND b.id = page.id
+        LEFT JOIN portfolio_items i ON page.kind = 'portfolio_item' AND i.id = page.id
+        WHERE COALESCE(p.id, b.id, i.id) IS NOT NULL
+        ORDER BY page.position
+    """.format(config=SEARCH_CONFIG, headline=SEARCH_HEADLINE_OPTIONS)
+
+    TABLES = ("projects", "blog_posts", "portfolio_items")
+
+    # La requête vient de la query string : nombre d'entrées borné (les plus anciennes sortent)
+    MAX_QUERIES = 256
+
+    def __init__(self, max_results: int = SEARCH_MAX_RESULTS):
+        self.max_results = max_results
+        # Correspondances par ordre décroissant et leurs clés par ordre croissant (bisect du curseur)
+        self._ranked: Dict[str, Tuple[List[RankedHit], List[HitKey]]] = {}
+        # Un classement lu pendant une modification d'une table indexée n'est pas conservé
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def _ranked_hits(self, conn, q: str) -> Tuple[List[RankedHit], List[HitKey]]:
+        entry = self._ranked.get(q)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        generation = self._generation
+        rows = await conn.fetch(self.RANK_QUERY, q, self.max_results)
+        ranked = [(row['kind'], row['id'], row['ref'], row['title'], row['rank']) for row in rows]
+        entry = (ranked, [(rank, kind, hit_id) for kind, hit_id, _, _, rank in reversed(ranked)])
+        if generation == self._generation:
+            if len(self._ranked) >= self.MAX_QUERIES:
+                del self._ranked[next(iter(self._ranked))]
+            self._ranked[q] = entry
+        return entry
+
+    async def page(self, conn, q: str, limit: int,
+                   after: Optional[HitKey] = None) -> Tuple[List[dict], Optional[HitKey]]:
+        """Résultats (avec extraits) classés après le curseur (rank, kind, id), et le curseur suivant s'il en reste"""
+        ranked, keys = await self._ranked_hits(conn, q)
+        # Premier résultat strictement après le curseur dans l'ordre décroissant
+        start = len(ranked) - bisect_left(keys, after) if after is not None else 0
+        page = ranked[start:start + limit]
+        if not page:
+            return [], None
+        rows = await conn.fetch(
+            self.HEADLINE_QUERY, q, [hit[0] for hit in page], [hit[1] for hit in page]
+        )
+        results = []
+        for row in rows:
+            kind, hit_id, ref, title, rank = page[row['position'] - 1]
+            results.append({
+                "kind": kind, "id": hit_id, "ref": ref, "title": title, "rank": rank,
+                "highlight": row['highlight'],
+            })
+        if start + limit >= len(ranked):
+            return results, None
+        kind, hit_id, _, _, rank = page[-1]
+        return results, (rank, kind, hit_id)
+
+    def invalidate(self):
+        self._generation += 1
+        self._ranked = {}
+
+    def on_table_changed(self, payload: Optional[str]):
+        """Handler NOTIFY table_version_changed ; payload None = notifications possiblement perdues"""
+        if payload is None or payload.rpartition(':')[0] in self.TABLES:
+            self.invalidate()
@@ -0,0 +1,113 @@
+"""Cache persistant des résumés LLM des projets, indexé par empreinte du contenu envoyé au modèle."""
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+# Version du prompt de résumé (prompts/summarize_project.md) et modèle par défaut :
+# changer l'un ou l'autre rend toutes les entrées existantes inaccessibles
+SUMMARY_PROMPT_VERSION = os.getenv("SUMMARY_PROMPT_VERSION", "1")
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+
+# Métadonnées du dépôt (champs de github_sync.SyncedRepo) qui changent le résumé. Étoiles, forks et
+# date du dernier push en sont exclus : ils bougent sans que le contenu à résumer change.
+KEY_METADATA = ("repo_full_name", "repo_description", "repo_language", "repo_topics")
+
+_LINE_ENDINGS = re.compile(r"\r\n?")
+_HTML_COMMENTS = re.compile(r"<!--.*?-->", re.S)
+_TRAILING_SPACES = re.compile(r"[ \t]+$", re.M)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_readme(readme: str) -> str:
+    """Fins de ligne, espaces de fin, commentaires HTML et lignes vides répétées sont sans effet sur le résumé"""
+    text = _HTML_COMMENTS.sub("", _LINE_ENDINGS.sub("\n", readme))
+    return _BLANK_LINES.sub("\n\n", _TRAILING_SPACES.sub("", text)).strip()
+
+
+def summary_key(readme: str, metadata: Dict[str, object], prompt_version: str, model: str) -> str:
+    """Empreinte SHA-256 du README normalisé, des métadonnées utiles, de la version du prompt et du modèle"""
+    payload = json.dumps({
+        "readme": normalize_readme(readme or ""),
+        "metadata": {name: metadata.get(name) for name in KEY_METADATA},
+        "prompt_version": prompt_version,
+        "model": model,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SummaryCache:
+    """Table llm_summary_cache : une entrée par empreinte, compteur de hits et durée d'inférence évitée"""
+
+    def __init__(self):
+        # Compteurs du processus (exposés sur /metrics) ; stats() agrège la table pour tous les workers
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    async def get(self, conn, key: str) -> Optional[Tuple[dict, int]]:
+        """(résumé, durée d'inférence en ms) ; un hit est compté dans la table"""
+        row = await conn.fetchrow(
+            """
+            -- name: llm_summary_cache_get
+            UPDATE llm_summary_cache
+            SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP
+            WHERE cache_key = $1
+            RETURNING summary, inference_ms
+            """,
+            key
+        )
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_seconds += (row['inference_ms'] or 0) / 1000
+        return row['summary'], row['inference_ms']
+
+    async def set(self, conn, key: str, repo_full_name: str, model: str, prompt_version: str, summary: dict,
+                  inference_ms: Optional[int]):
+        await conn.execute(
+            """
+            -- name: llm_summary_cache_set
+            INSERT INTO llm_summary_cache (cache_key, repo_full_name, model, prompt_version, summary, inference_ms)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (cache_key) DO UPDATE
+                SET summary = EXCLUDED.summary, inference_ms = EXCLUDED.inference_ms,
+                    created_at = CURRENT_TIMESTAMP
+            """,
+            key, repo_full_name, model, prompt_version, summary, inference_ms
+        )
+
+    async def bust(self, conn, repo_full_names: Iterable[str]) -> int:
+        """Oublier toutes les entrées des dépôts (toutes versions de prompt et tous modèles)"""
+        result = await conn.execute(
+            "-- name: llm_summary_cache_bust\nDELETE FROM llm_summary_cache WHERE repo_full_name = ANY($1::TEXT[])",
+            list(repo_full_names)
+        )
+        return int(result.split()[-1])
+
+    async def stats(self, conn) -> dict:
+        row = await conn.fetchrow(
+            """
+            -- name: llm_summary_cache_stats
+            SELECT COUNT(*) AS entries,
+                   COUNT(DISTINCT repo_full_name) AS repos,
+                   COALESCE(SUM(hits), 0)::BIGINT AS hits,
+                   COALESCE(SUM(hits * COALESCE(inference_ms, 0)), 0)::BIGINT AS saved_ms
+            FROM llm_summary_cache
+            """
+        )
+        lookups = self.hits + self.misses
+        return {
+            "entries": row['entries'],
+            "repos": row['repos'],
+            "hits": row['hits'],
+            "saved_seconds": round(row['saved_ms'] / 1000, 1),
+            "process": {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "saved_seconds": round(self.saved_seconds, 1),
+            },
+        }
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Les modules du backend s'importent par leur nom (uvicorn main:app depuis dashboard/backend)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,131 @@
+"""Flush des tampons d'écriture : forme des paramètres envoyés à PostgreSQL."""
+import asyncio
+import json
+import uuid
+
+import asyncpg
+import pytest
+from fastapi.testclient import TestClient
+
+import buffers
+import db
+import main
+
+
+class RecordingConnection:
+    """Garde les requêtes exécutées au lieu de les envoyer à la base"""
+
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, query: str, *args):
+        self.executed.append((query, args))
+        return "UPDATE %d" % len(args[0])
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = RecordingConnection()
+
+    async def acquire(*args, **kwargs):
+        return connection
+
+    async def release(conn):
+        pass
+
+    monkeypatch.setattr(db, "acquire", acquire)
+    monkeypatch.setattr(db, "release", release)
+    return connection
+
+
+def test_session_flush_sends_one_modes_value_per_session(connection):
+    accumulator = buffers.SessionActivityAccumulator()
+    no_modes, one_mode, two_modes = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    accumulator.add(no_modes, {"page_views": 2})
+    accumulator.add(one_mode, {"mode_switches": 1, "modes_viewed": ["cdi"]})
+    accumulator.add(two_modes, {"modes_viewed": ["cdi"]})
+    accumulator.add(two_modes, {"modes_viewed": ["freelance", "cdi"], "cv_downloaded": True})
+
+    asyncio.run(accumulator.flush())
+
+    [(query, args)] = connection.executed
+    ids, modes = args[0], args[7]
+    # Tableau plat de textes : ni tableau 2D ni listes de longueurs différentes
+    assert "$8::TEXT[]" in query
+    assert all(isinstance(value, str) for value in modes)
+    assert dict(zip(ids, map(json.loads, modes))) == {
+        no_modes: [], one_mode: ["cdi"], two_modes: ["cdi", "freelance"]
+    }
+    assert accumulator.flushed == 3
+    assert len(accumulator) == 0
+
+
+class CopyConnection:
+    """COPY simulé : rejette tout lot contenant une ligne marquée, coupe après `fail_after` copies"""
+
+    def __init__(self, bad: set, fail_after: int = None):
+        self.bad = bad
+        self.fail_after = fail_after
+        self.copied = []
+
+    async def copy_records_to_table(self, table: str, records, columns):
+        if self.fail_after is not None and len(self.copied) >= self.fail_after:
+            raise ConnectionResetError("connection lost")
+        if any(record[0] in self.bad for record in records):
+            raise asyncpg.StringDataRightTruncationError("value too long for type character varying(50)")
+        self.copied.append(list(records))
+
+
+def use_connection(monkeypatch, connection):
+    async def acquire(*args, **kwargs):
+        return connection
+
+    async def release(conn):
+        pass
+
+    monkeypatch.setattr(db, "acquire", acquire)
+    monkeypatch.setattr(db, "release", release)
+
+
+def test_rejected_event_only_drops_itself(monkeypatch):
+    connection = CopyConnection(bad={7})
+    use_connection(monkeypatch, connection)
+    buffer = buffers.AnalyticsEventBuffer(max_size=16)
+    buffer.add([(index,) for index in range(16)])
+
+    asyncio.run(buffer.flush())
+
+    copied = sorted(record[0] for chunk in connection.copied for record in chunk)
+    assert copied == [index for index in range(16) if index != 7]
+    assert (buffer.flushed, buffer.dropped, len(buffer)) == (15, 1, 0)
+
+
+def test_transient_error_while_splitting_requeues_uncopied_events(monkeypatch):
+    connection = CopyConnection(bad={0}, fail_after=1)
+    use_connection(monkeypatch, connection)
+    buffer = buffers.AnalyticsEventBuffer(max_size=8)
+    buffer.add([(index,) for index in range(8)])
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(buffer.flush())
+
+    [copied] = connection.copied
+    assert copied == [(1,)]
+    assert [record[0] for record in buffer._records] == [2, 3, 4, 5, 6, 7]
+    assert (buffer.flushed, buffer.dropped, len(buffer)) == (1, 1, 6)
+
+
+def test_oversized_event_is_refused_before_buffering(monkeypatch):
+    monkeypatch.setattr(main.analytics_buffer, "_records", [])
+    event = {
+        "session_id": str(uuid.uuid4()), "event_type": "page_view", "event_category": None,
+        "event_label": None, "event_value": None, "portfolio_mode": "cdi", "page_url": "/",
+        "referrer_url": None, "target_type": None, "target_id": None, "metadata": {},
+    }
+    client = TestClient(main.app)
+
+    assert client.post("/api/analytics/events", json=[event, {**event, "page_url": "/" * 501}]).status_code == 422
+    assert client.post("/api/analytics/event", json={**event, "target_id": 2**31}).status_code == 422
+    assert len(main.analytics_buffer) == 0
+    assert client.post("/api/analytics/events", json=[event]).status_code == 200
+    assert len(main.analytics_buffer) == 1
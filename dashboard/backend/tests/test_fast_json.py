@@ -0,0 +1,229 @@
+"""Contrat de fast_json : mêmes octets que la sérialisation response_model de FastAPI."""
+import copy
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import db
+import fast_json
+import main
+
+PARIS = timezone(timedelta(hours=2))
+NAIVE = datetime(2024, 3, 1, 9, 30, 0, 123456)
+UTC = datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc)
+AWARE = datetime(2024, 3, 1, 11, 30, 0, 1, tzinfo=PARIS)
+
+# Flottants que orjson et json écrivent différemment (exposant, sous-normal) ou identiquement (bornes)
+LARGE_FLOATS = [1e16, 1.5e300, -2.5e20, 1e-4, 1e-5, 5e-324, -0.0, 0.1 + 0.2, 9007199254740993.0]
+
+
+def portfolio_item(index: int, **values) -> dict:
+    row = {
+        "id": index, "repo": f"repo-{index}", "title": "Titre", "short_pitch": "Pitch", "long_desc": "Description",
+        "tags": ["python", "données"], "stack": ["postgres"], "impact": "Impact",
+        "github_url": f"https://github.com/bench/repo-{index}", "github_stars": 12, "github_forks": 3,
+        "github_language": "Python", "last_commit_date": UTC, "ai_confidence_score": Decimal("0.85"),
+        "status": "approved", "created_at": NAIVE - timedelta(days=index), "updated_at": AWARE,
+        "human_reviewed": True, "business_metrics": {"roi": 2.5, "users": 1200},
+        "technical_metrics": {"latency_ms": 42}, "achievements": ["Livré"], "complexity_score": 3,
+        "team_size": 1, "project_duration_months": 6, "demo_url": None, "live_url": None,
+    }
+    row.update(values)
+    return row
+
+
+def project(index: int, **values) -> dict:
+    row = {
+        "id": index, "title": "Projet", "slug": f"projet-{index}", "short_description": "Résumé",
+        "long_description": None, "github_url": None, "github_repo_name": None, "github_stars": 4,
+        "github_forks": None, "github_language": "Go", "demo_url": None, "image_url": None, "category": "data",
+        "tags": ["api"], "technologies": ["docker"], "metrics": {"accuracy": 0.93, "p99_ms": 120},
+        "business_impact": None, "is_featured": True, "is_published": True, "display_order": index,
+        "project_date": date(2024, 1, index), "duration_months": 3, "team_size": 2, "role": "Lead",
+        "created_at": NAIVE, "updated_at": AWARE,
+    }
+    row.update(values)
+    return row
+
+
+def timeline_event(index: int, **values) -> dict:
+    row = {
+        "id": index, "date": date(2020, index, 1), "end_date": None, "title": "Poste", "description": None,
+        "category": "experience", "icon": None, "metrics": {"projects": 7, "share": 0.25}, "tags": ["ml"],
+        "link_url": None, "display_order": index, "is_highlight": False, "created_at": UTC,
+    }
+    row.update(values)
+    return row
+
+
+def blog_post(index: int, **values) -> dict:
+    row = {
+        "id": index, "title": "Article", "slug": f"article-{index}", "excerpt": "Extrait",
+        "content": "Contenu « accentué »   et \"guillemets\"", "meta_title": None, "meta_description": None,
+        "keywords": ["sql"], "cover_image_url": None, "category": "tech", "tags": ["perf"],
+        "read_time_minutes": 4, "view_count": 10, "like_count": 0, "is_published": True, "is_featured": True,
+        "published_at": UTC - timedelta(days=index), "created_at": NAIVE, "updated_at": AWARE,
+    }
+    row.update(values)
+    return row
+
+
+# Lignes telles que les routes les passent à model_list, dont les cas limites de conversion
+CASES = {
+    "PortfolioItem": (main.PortfolioItem, [
+        portfolio_item(1),
+        portfolio_item(2, ai_confidence_score=Decimal("0.123456789012345678901"), created_at=datetime(1, 1, 1)),
+        portfolio_item(3, ai_confidence_score=1, github_stars=True, updated_at=UTC),
+        portfolio_item(4, business_metrics={}, technical_metrics={}, achievements=[], last_commit_date=None),
+    ]),
+    "Project": (main.Project, [project(1), project(2, metrics=None), project(3, metrics={"nested": [{"a": 1.0}]})]),
+    "TimelineEvent": (main.TimelineEvent, [timeline_event(1), timeline_event(2, end_date=date(2021, 6, 30))]),
+    "BlogPost": (main.BlogPost, [blog_post(1), blog_post(2, published_at=None), blog_post(3, published_at=AWARE)]),
+}
+
+
+def response_model_body(model, items: List[dict]) -> bytes:
+    """Corps écrit par FastAPI pour une route response_model=List[model] renvoyant ces lignes"""
+    app = FastAPI()
+
+    @app.get("/items", response_model=List[model])
+    async def items_route():
+        return [model(**item) for item in copy.deepcopy(items)]
+
+    return TestClient(app).get("/items").content
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def encoder_backend(request, monkeypatch):
+    """Avec orjson et avec le repli json (orjson absent)"""
+    if not request.param:
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson is not installed")
+    fast_json.encoder_for.cache_clear()
+    yield
+    fast_json.encoder_for.cache_clear()
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_encode_matches_response_model(case, encoder_backend):
+    model, items = CASES[case]
+    assert fast_json.encoder_for(model).encode(copy.deepcopy(items)) == response_model_body(model, items)
+
+
+def test_columns_out_of_model_order_and_missing_defaults(encoder_backend):
+    item = portfolio_item(1)
+    reordered = dict(reversed(list(item.items())))
+    del reordered["demo_url"], reordered["complexity_score"]
+    expected = response_model_body(main.PortfolioItem, [reordered])
+    assert fast_json.encoder_for(main.PortfolioItem).encode([reordered]) == expected
+
+
+@pytest.mark.parametrize("value", LARGE_FLOATS, ids=repr)
+def test_large_and_tiny_floats(value, encoder_backend):
+    items = [
+        portfolio_item(1, ai_confidence_score=value, business_metrics={"ratio": value, "series": [1.0, value]}),
+        portfolio_item(2, technical_metrics={"deep": {"value": value}}),
+    ]
+    expected = response_model_body(main.PortfolioItem, items)
+    assert fast_json.encoder_for(main.PortfolioItem).encode(items) == expected
+
+
+@pytest.mark.parametrize("value", [float("inf"), float("-inf"), float("nan")], ids=repr)
+@pytest.mark.parametrize("field", ["ai_confidence_score", "business_metrics"])
+def test_non_finite_floats_fail_like_response_model(value, field, encoder_backend):
+    """response_model lève ValueError (json.dumps allow_nan=False) : pas de null silencieux"""
+    item = portfolio_item(1, **{field: value if field == "ai_confidence_score" else {"ratio": value}})
+    with pytest.raises(ValueError):
+        response_model_body(main.PortfolioItem, [item])
+    with pytest.raises(ValueError):
+        fast_json.encoder_for(main.PortfolioItem).encode([item])
+
+
+def test_encode_leaves_items_untouched():
+    items = copy.deepcopy(CASES["PortfolioItem"][1])
+    fast_json.encoder_for(main.PortfolioItem).encode(items)
+    assert items == CASES["PortfolioItem"][1]
+
+
+# ==================== ROUTES ====================
+
+class FakeConnection:
+    """Répond aux requêtes des routes converties d'après la table lue"""
+
+    def __init__(self, tables: dict):
+        self.tables = tables
+
+    async def fetch(self, query: str, *args):
+        if "FROM project_modes" in query:
+            return [{"project_id": row["id"], "is_featured": row["is_featured"]} for row in self.tables["projects"]]
+        for table, rows in self.tables.items():
+            if f"FROM {table}" in query:
+                limit = args[-1] if "LIMIT $" in query else None
+                return copy.deepcopy(rows[:limit] if isinstance(limit, int) else rows)
+        return []
+
+    async def fetchrow(self, query: str, *args):
+        return None
+
+
+ROUTE_TABLES = {
+    "portfolio_items": CASES["PortfolioItem"][1] + [
+        portfolio_item(5, ai_confidence_score=1e-7, business_metrics={"revenue": 2.5e16})
+    ],
+    "projects": CASES["Project"][1],
+    "timeline_events": CASES["TimelineEvent"][1],
+    "blog_posts": CASES["BlogPost"][1],
+}
+
+ROUTES = [
+    "/api/portfolio",
+    "/api/portfolio?limit=2",
+    "/api/projects",
+    "/api/mode-projects?mode=cdi",
+    "/api/timeline",
+    "/api/blog?limit=2",
+    "/api/blog",
+    "/api/bundle/home?mode=cdi",
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    connection = FakeConnection(ROUTE_TABLES)
+
+    async def acquire(*args, **kwargs):
+        return connection
+
+    async def release(conn):
+        pass
+
+    monkeypatch.setattr(db, "acquire", acquire)
+    monkeypatch.setattr(db, "release", release)
+    # Chaque requête doit passer par la route, pas par le cache de réponses
+    monkeypatch.setattr(main.response_cache, "enabled", False)
+    main.mode_project_order.invalidate()
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("path", ROUTES)
+def test_route_bytes_and_headers_match(path, client, monkeypatch):
+    monkeypatch.setattr(fast_json, "FAST_SERIALIZATION", False)
+    expected = client.get(path)
+    monkeypatch.setattr(fast_json, "FAST_SERIALIZATION", True)
+    fast = client.get(path)
+
+    assert expected.status_code == 200
+    assert fast.status_code == expected.status_code
+    assert fast.content == expected.content
+    assert sorted(fast.headers.items()) == sorted(expected.headers.items())
+
+
+def test_cursor_header_is_kept(client, monkeypatch):
+    monkeypatch.setattr(fast_json, "FAST_SERIALIZATION", True)
+    assert client.get("/api/portfolio?limit=2").headers.get(main.NEXT_CURSOR_HEADER)
+    assert client.get("/api/blog?limit=2").headers.get(main.NEXT_CURSOR_HEADER)
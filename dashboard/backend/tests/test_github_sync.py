@@ -0,0 +1,175 @@
+"""Synchronisation GitHub incrémentale contre le faux serveur de bench/fake_github.py."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import github_sync
+import main
+from bench.fake_github import FakeGitHub, serve
+from github_sync import GitHubClient, GitHubRateLimitError, GitHubSync, MemorySyncState
+
+USERNAME = "bench"
+
+
+@pytest.fixture
+def fake():
+    # 10 dépôts (dont 1 fork et 2 sans étoile) sur 3 pages de 4
+    fake = FakeGitHub(USERNAME, repos=10, per_page_max=4)
+    server = serve(fake)
+    fake.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Attentes de quota enregistrées au lieu d'être dormies"""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(github_sync.asyncio, "sleep", sleep)
+    return delays
+
+
+def run_sync(fake: FakeGitHub, state: MemorySyncState, commit: bool = True, **client_options):
+    async def sync():
+        client = GitHubClient(base_url=fake.base_url, token="", **client_options)
+        try:
+            sync = GitHubSync(client, state, username=USERNAME, min_stars=1)
+            result = await sync.run()
+            if commit:
+                await sync.commit(result.watermarks)
+            return result
+        finally:
+            await client.close()
+
+    return asyncio.run(sync())
+
+
+def test_first_sync_fetches_every_readme(fake):
+    state = MemorySyncState()
+    result = run_sync(fake, state)
+
+    assert sorted(repo.repo_name for repo in result.repos) == [
+        "project-001", "project-002", "project-003", "project-004", "project-007", "project-008", "project-009"
+    ]
+    assert all(repo.readme_changed and repo.readme_text.startswith("# project-") for repo in result.repos)
+    assert result.requests == 3 + 7
+    assert result.not_modified == 0
+
+
+def test_repeat_sync_only_sends_304s(fake):
+    state = MemorySyncState()
+    run_sync(fake, state)
+    result = run_sync(fake, state)
+
+    assert result.repos == []
+    assert result.requests == result.not_modified == 3
+
+
+def test_unchanged_pushed_at_skips_readme(fake):
+    state = MemorySyncState()
+    run_sync(fake, state)
+    # Nouvelle étoile : la page change, pas le dernier push
+    fake.repos["project-004"]["stargazers_count"] += 1
+    result = run_sync(fake, state)
+
+    assert result.repos == []
+    assert result.unchanged == 3
+    assert (result.requests, result.not_modified) == (3, 2)
+
+
+def test_readme_304_is_served_from_cache(fake):
+    state = MemorySyncState()
+    run_sync(fake, state)
+    # Push sans modification du README
+    fake.repos["project-009"]["pushed_at"] = "2025-01-01T00:00:00Z"
+    result = run_sync(fake, state)
+
+    [repo] = result.repos
+    assert repo.repo_name == "project-009"
+    assert repo.readme_changed is False
+    assert repo.readme_text == fake.readmes["project-009"]
+    # Page modifiée + 2 pages inchangées + README inchangé
+    assert (result.requests, result.not_modified) == (4, 3)
+
+
+def test_low_remaining_quota_waits_for_reset(fake, sleeps):
+    fake.remaining, fake.reset = 12, int(time.time()) + 30
+    result = run_sync(fake, MemorySyncState(), concurrency=1, reserve=10, max_wait=60)
+
+    assert len(result.repos) == 7
+    assert sleeps and all(0 < delay <= 30 for delay in sleeps)
+
+
+def test_exhausted_quota_beyond_max_wait_raises(fake, sleeps):
+    fake.remaining, fake.reset = 0, int(time.time()) + 3600
+    state = MemorySyncState()
+
+    with pytest.raises(GitHubRateLimitError):
+        run_sync(fake, state, max_wait=60)
+    assert sleeps == []
+    assert state.watermarks == {}
+
+
+def test_retry_after_429_waits_then_retries(sleeps):
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json=[], headers={"ETag": '"empty"'}),
+    ]
+
+    async def get():
+        client = GitHubClient(base_url="https://github.test", token="",
+                              transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        try:
+            return await client.get("/users/bench/repos"), client.requests
+        finally:
+            await client.close()
+
+    response, requests = asyncio.run(get())
+    assert (response.status_code, requests) == (200, 2)
+    assert len(sleeps) == 1 and 0 < sleeps[0] <= 2
+
+
+def test_retry_after_beyond_max_wait_raises(sleeps):
+    transport = httpx.MockTransport(lambda request: httpx.Response(429, headers={"Retry-After": "600"}))
+
+    async def get():
+        client = GitHubClient(base_url="https://github.test", token="", max_wait=60, transport=transport)
+        try:
+            await client.get("/users/bench/repos")
+        finally:
+            await client.close()
+
+    with pytest.raises(GitHubRateLimitError):
+        asyncio.run(get())
+    assert sleeps == []
+
+
+def test_route_without_commit_leaves_watermarks_untouched(fake, monkeypatch):
+    state = MemorySyncState()
+
+    async def sync(commit: bool):
+        client = GitHubClient(base_url=fake.base_url, token="")
+        monkeypatch.setattr(main, "github_sync", GitHubSync(client, state, username=USERNAME, min_stars=1))
+        try:
+            return await main.sync_github(commit=commit)
+        finally:
+            await client.close()
+
+    body = asyncio.run(sync(commit=False))
+    assert body["committed"] is False and body["changed"] == 7
+    assert state.watermarks == {}
+    # README en cache dès la synchronisation, indexés par ETag
+    assert len(state.readmes) == 7
+
+    # Non enregistrés : les mêmes dépôts reviennent
+    assert asyncio.run(sync(commit=False))["changed"] == 7
+    assert asyncio.run(sync(commit=True))["changed"] == 7
+    assert set(state.watermarks) == {watermark["resource"] for watermark in body["watermarks"]}
+    assert asyncio.run(sync(commit=False))["changed"] == 0
@@ -0,0 +1,54 @@
+"""Resynchronisation du cache de réponses après une (re)connexion LISTEN."""
+import asyncio
+
+import response_cache
+from response_cache import CachePolicy, ResponseCache
+
+POLICY = CachePolicy(tags=("projects",), ttl=60)
+VALUE = ("application/json", b"[]", [])
+
+
+class SharedBackend(response_cache.MemoryBackend):
+    """Backend partagé simulé : compte les vidages complets"""
+
+    shared = True
+
+    def __init__(self):
+        super().__init__()
+        self.cleared = 0
+
+    async def clear(self):
+        self.cleared += 1
+        await super().clear()
+
+
+def resync(cache: ResponseCache):
+    async def notify():
+        cache.on_table_changed(None)
+        await asyncio.gather(*cache._tasks)
+
+    asyncio.run(notify())
+
+
+def test_resync_keeps_shared_entries():
+    cache = ResponseCache("postgres")
+    cache.backend = backend = SharedBackend()
+    snapshot = cache.snapshot(POLICY.tags)
+    asyncio.run(cache.set("/api/projects?", POLICY, VALUE, snapshot))
+
+    resync(cache)
+
+    assert backend.cleared == 0
+    assert asyncio.run(cache.get("/api/projects?")) == VALUE
+    # Réponse calculée avant la resynchronisation : pas stockée
+    asyncio.run(cache.set("/api/projects?limit=1", POLICY, VALUE, snapshot))
+    assert asyncio.run(cache.get("/api/projects?limit=1")) is None
+
+
+def test_resync_clears_process_memory():
+    cache = ResponseCache("memory")
+    asyncio.run(cache.set("/api/projects?", POLICY, VALUE, cache.snapshot(POLICY.tags)))
+
+    resync(cache)
+
+    assert asyncio.run(cache.get("/api/projects?")) is None
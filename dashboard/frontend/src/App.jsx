@@ -46,22 +46,16 @@ function PortfolioApp() {
 
   const fetchData = () => {
     setLoading(true);
-    // Fetch all data with mode-specific endpoints
-    Promise.all([
-      fetch('/api/profile').then(res => res.json()),
-      fetch('/api/timeline').then(res => res.json()),
-      fetch(`/api/mode-projects?mode=${currentMode}&featured_only=true`).then(res => res.json()),
-      fetch('/api/blog?featured_only=true&limit=3').then(res => res.json()),
-      fetch('/api/testimonials?featured_only=true').then(res => res.json()),
-      fetch('/api/skills?primary_only=true').then(res => res.json())
-    ])
-      .then(([profileData, timelineData, projectsData, blogData, testimonialsData, skillsData]) => {
-        setProfile(profileData);
-        setTimeline(timelineData);
-        setProjects(projectsData);
-        setBlogPosts(blogData);
-        setTestimonials(testimonialsData);
-        setSkills(skillsData);
+    // Fetch all homepage data in a single round trip
+    fetch(`/api/bundle/home?mode=${currentMode}`)
+      .then(res => res.json())
+      .then(bundle => {
+        setProfile(bundle.profile);
+        setTimeline(bundle.timeline);
+        setProjects(bundle.projects);
+        setBlogPosts(bundle.blog);
+        setTestimonials(bundle.testimonials);
+        setSkills(bundle.skills);
         setLoading(false);
       })
       .catch(err => {
@@ -46,17 +46,14 @@ export function ModeProvider({ children }) {
 
   const fetchContentOverrides = async (mode) => {
     try {
-      // Fetch overrides for common content types
-      const [heroPitch, title, availability] = await Promise.all([
-        fetch(`/api/content/hero_pitch?mode=${mode}`).then(res => res.json()),
-        fetch(`/api/content/title?mode=${mode}`).then(res => res.json()),
-        fetch(`/api/content/availability?mode=${mode}`).then(res => res.json())
-      ]);
+      // Fetch overrides for common content types in one call
+      const response = await fetch(`/api/content?mode=${mode}&types=hero_pitch,title,availability`);
+      const { content } = await response.json();
 
       setContentOverrides({
-        hero_pitch: heroPitch.overrides.hero_pitch || null,
-        title: title.overrides.title || null,
-        availability: availability.overrides.availability || null
+        hero_pitch: content.hero_pitch.hero_pitch || null,
+        title: content.title.title || null,
+        availability: content.availability.availability || null
       });
     } catch (error) {
       console.error('Failed to fetch content overrides:', error);
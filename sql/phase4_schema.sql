@@ -0,0 +1,714 @@
+-- ============================================
+-- PHASE 4: PERFORMANCE
+-- ============================================
+-- Triggers, index et tables techniques utilisés par le backend du dashboard
+-- Purpose: Caches invalidés par NOTIFY, agrégats incrémentaux, index dédiés
+
+-- ============================================
+-- 1. MODE CONTENT OVERRIDES: NOTIFY ON CHANGE
+-- ============================================
+-- Le backend garde mode_content_overrides en mémoire et le recharge à chaque notification
+CREATE OR REPLACE FUNCTION notify_mode_content_overrides_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('mode_content_overrides_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_mode_content_overrides_notify ON mode_content_overrides;
+CREATE TRIGGER trigger_mode_content_overrides_notify
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON mode_content_overrides
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_mode_content_overrides_changed();
+
+-- ============================================
+-- 2. TABLE VERSIONS (ETAGS)
+-- ============================================
+-- Compteur de version par table, incrémenté à chaque écriture et notifié au backend,
+-- qui en dérive des ETags forts pour les endpoints de lecture
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(100) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    INSERT INTO table_versions (table_name, version)
+    VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE
+        SET version = table_versions.version + 1,
+            updated_at = CURRENT_TIMESTAMP
+    RETURNING version INTO new_version;
+
+    -- Délivré au COMMIT uniquement : un rollback ne change pas l'ETag servi
+    PERFORM pg_notify('table_version_changed', TG_TABLE_NAME || ':' || new_version);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['profile', 'timeline_events', 'skills', 'projects', 'testimonials',
+                             'portfolio_modes', 'portfolio_items']
+    LOOP
+        -- portfolio_items est créée par le schéma n8n : ignorée si absente
+        CONTINUE WHEN to_regclass(t) IS NULL;
+        INSERT INTO table_versions (table_name) VALUES (t) ON CONFLICT (table_name) DO NOTHING;
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_%s_version ON %I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trigger_%s_version
+             AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+             FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()',
+            t, t
+        );
+    END LOOP;
+END $$;
+
+COMMENT ON TABLE table_versions IS 'Phase 4: Per-table change counters used to compute HTTP ETags';
+
+-- ============================================
+-- 3. RESPONSE CACHE (SHARED BACKEND)
+-- ============================================
+-- Utilisée quand RESPONSE_CACHE_BACKEND=postgres : cache partagé entre workers,
+-- UNLOGGED car reconstructible (pas de WAL, vidée après un crash)
+CREATE UNLOGGED TABLE IF NOT EXISTS response_cache (
+    cache_key TEXT PRIMARY KEY,
+    tags TEXT[] NOT NULL DEFAULT '{}',
+    content_type VARCHAR(100),
+    body BYTEA NOT NULL,
+    headers JSONB NOT NULL DEFAULT '[]',
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- En-têtes rejoués avec le corps (ex. X-Next-Cursor), ajoutés après la première version de la table
+ALTER TABLE response_cache ADD COLUMN IF NOT EXISTS headers JSONB NOT NULL DEFAULT '[]';
+
+CREATE INDEX IF NOT EXISTS idx_response_cache_tags ON response_cache USING GIN(tags);
+CREATE INDEX IF NOT EXISTS idx_response_cache_created ON response_cache(created_at DESC);
+
+COMMENT ON TABLE response_cache IS 'Phase 4: Shared HTTP response cache, invalidated by table tags';
+
+-- ============================================
+-- 4. ANALYTICS ROLLUPS (INCREMENTAL)
+-- ============================================
+-- Agrégats horaires / journaliers par mode et type d'événement, alimentés par
+-- refresh_analytics_rollups() qui ne lit que les événements des transactions pas encore traitées.
+-- portfolio_mode NULL est stocké '' (colonne de clé primaire)
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+    name VARCHAR(100) PRIMARY KEY,
+    last_event_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Dernière transaction d'insertion agrégée (voir analytics_events.insert_xid, section 5)
+ALTER TABLE analytics_rollup_state ADD COLUMN IF NOT EXISTS last_xid XID8;
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_hourly (
+    bucket TIMESTAMP NOT NULL,
+    portfolio_mode VARCHAR(50) NOT NULL DEFAULT '',
+    event_type VARCHAR(50) NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, portfolio_mode, event_type)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_daily (
+    day DATE NOT NULL,
+    portfolio_mode VARCHAR(50) NOT NULL DEFAULT '',
+    event_type VARCHAR(50) NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    unique_sessions BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, portfolio_mode, event_type)
+);
+
+-- Sessions distinctes par jour / mode / type : déduplication des unique_sessions
+-- et COUNT(DISTINCT) sur une fenêtre sans relire les événements bruts
+CREATE TABLE IF NOT EXISTS analytics_rollup_sessions (
+    day DATE NOT NULL,
+    portfolio_mode VARCHAR(50) NOT NULL DEFAULT '',
+    event_type VARCHAR(50) NOT NULL,
+    session_id UUID NOT NULL,
+    PRIMARY KEY (day, portfolio_mode, event_type, session_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_rollup_daily_mode ON analytics_rollup_daily(portfolio_mode, day DESC);
+CREATE INDEX IF NOT EXISTS idx_analytics_rollup_sessions_mode ON analytics_rollup_sessions(portfolio_mode, day DESC);
+
+-- Traite environ p_batch événements (toujours une transaction d'insertion entière) et renvoie
+-- le nombre traité. Le watermark porte sur insert_xid, pas sur l'id : un COPY encore en cours
+-- peut détenir des id inférieurs à ceux déjà visibles et les rendre visibles plus tard. Seules
+-- les transactions sous le xmin du snapshot courant sont lues : elles sont toutes terminées,
+-- et toute insertion future aura un xid supérieur.
+DROP FUNCTION IF EXISTS refresh_analytics_rollups(INTEGER, INTERVAL);
+CREATE OR REPLACE FUNCTION refresh_analytics_rollups(p_batch INTEGER DEFAULT 50000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_from BIGINT;
+    v_to BIGINT;
+    v_last_xid XID8;
+    v_to_xid XID8;
+    v_horizon XID8 := pg_snapshot_xmin(pg_current_snapshot());
+    v_count INTEGER;
+BEGIN
+    -- Un seul agrégateur à la fois (plusieurs workers, n8n)
+    IF NOT pg_try_advisory_xact_lock(hashtext('refresh_analytics_rollups')) THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO analytics_rollup_state (name) VALUES ('analytics_events')
+    ON CONFLICT (name) DO NOTHING;
+
+    SELECT last_event_id, COALESCE(last_xid, '0'::XID8) INTO v_from, v_last_xid
+    FROM analytics_rollup_state
+    WHERE name = 'analytics_events';
+
+    CREATE TEMP TABLE IF NOT EXISTS analytics_rollup_batch (
+        created_at TIMESTAMP,
+        portfolio_mode VARCHAR(50),
+        event_type VARCHAR(50),
+        session_id UUID
+    ) ON COMMIT DELETE ROWS;
+
+    -- Événements antérieurs à insert_xid (NULL) : tous commités avant l'ajout de la colonne,
+    -- l'ancien watermark par id reste exact pour eux
+    SELECT MAX(id) INTO v_to
+    FROM (
+        SELECT id FROM analytics_events
+        WHERE id > v_from AND insert_xid IS NULL
+        ORDER BY id
+        LIMIT p_batch
+    ) batch;
+
+    IF v_to IS NOT NULL THEN
+        INSERT INTO analytics_rollup_batch
+        SELECT created_at, COALESCE(portfolio_mode, ''), event_type, session_id
+        FROM analytics_events
+        WHERE id > v_from AND id <= v_to AND insert_xid IS NULL;
+    ELSE
+        SELECT insert_xid INTO v_to_xid
+        FROM (
+            SELECT insert_xid FROM analytics_events
+            WHERE insert_xid > v_last_xid AND insert_xid < v_horizon
+            ORDER BY insert_xid
+            LIMIT p_batch
+        ) batch
+        ORDER BY insert_xid DESC
+        LIMIT 1;
+
+        IF v_to_xid IS NULL THEN
+            RETURN 0;
+        END IF;
+
+        INSERT INTO analytics_rollup_batch
+        SELECT created_at, COALESCE(portfolio_mode, ''), event_type, session_id
+        FROM analytics_events
+        WHERE insert_xid > v_last_xid AND insert_xid <= v_to_xid;
+    END IF;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    INSERT INTO analytics_rollup_hourly AS h (bucket, portfolio_mode, event_type, event_count)
+    SELECT date_trunc('hour', created_at), portfolio_mode, event_type, COUNT(*)
+    FROM analytics_rollup_batch
+    GROUP BY 1, 2, 3
+    ON CONFLICT (bucket, portfolio_mode, event_type)
+    DO UPDATE SET event_count = h.event_count + EXCLUDED.event_count;
+
+    WITH new_sessions AS (
+        INSERT INTO analytics_rollup_sessions (day, portfolio_mode, event_type, session_id)
+        SELECT DISTINCT created_at::DATE, portfolio_mode, event_type, session_id
+        FROM analytics_rollup_batch
+        ON CONFLICT DO NOTHING
+        RETURNING day, portfolio_mode, event_type
+    ),
+    session_counts AS (
+        SELECT day, portfolio_mode, event_type, COUNT(*) AS sessions
+        FROM new_sessions
+        GROUP BY 1, 2, 3
+    ),
+    event_counts AS (
+        SELECT created_at::DATE AS day, portfolio_mode, event_type, COUNT(*) AS events
+        FROM analytics_rollup_batch
+        GROUP BY 1, 2, 3
+    )
+    INSERT INTO analytics_rollup_daily AS d (day, portfolio_mode, event_type, event_count, unique_sessions)
+    SELECT e.day, e.portfolio_mode, e.event_type, e.events, COALESCE(s.sessions, 0)
+    FROM event_counts e
+    LEFT JOIN session_counts s USING (day, portfolio_mode, event_type)
+    ON CONFLICT (day, portfolio_mode, event_type)
+    DO UPDATE SET
+        event_count = d.event_count + EXCLUDED.event_count,
+        unique_sessions = d.unique_sessions + EXCLUDED.unique_sessions;
+
+    UPDATE analytics_rollup_state
+    SET last_event_id = COALESCE(v_to, last_event_id),
+        last_xid = COALESCE(v_to_xid, last_xid),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE name = 'analytics_events';
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- La vue lit désormais les agrégats (fraîcheur : ANALYTICS_ROLLUP_INTERVAL)
+DROP VIEW IF EXISTS analytics_daily_summary;
+CREATE VIEW analytics_daily_summary AS
+SELECT
+    day as date,
+    NULLIF(portfolio_mode, '') as portfolio_mode,
+    event_type,
+    event_count,
+    unique_sessions
+FROM analytics_rollup_daily
+ORDER BY date DESC, event_count DESC;
+
+COMMENT ON TABLE analytics_rollup_hourly IS 'Phase 4: Hourly event counts by mode and event type';
+COMMENT ON TABLE analytics_rollup_daily IS 'Phase 4: Daily event counts and unique sessions by mode and event type';
+COMMENT ON TABLE analytics_rollup_sessions IS 'Phase 4: Distinct sessions per day, mode and event type';
+
+-- ============================================
+-- 5. ANALYTICS EVENTS: MONTHLY PARTITIONS
+-- ============================================
+-- analytics_events devient une table partitionnée par mois sur created_at.
+-- Les index sont déclarés sur la table parente et donc créés sur chaque partition.
+-- Partitions nommées analytics_events_pAAAAMM ; la partition DEFAULT reçoit les dates hors plage.
+-- Si DEFAULT contient déjà des lignes du mois (maintenance interrompue, horloge décalée), la création
+-- échouerait : DEFAULT est détachée le temps de créer la partition et d'y déplacer ces lignes.
+CREATE OR REPLACE FUNCTION create_analytics_events_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    v_name TEXT := 'analytics_events_p' || to_char(p_month, 'YYYYMM');
+    v_move BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    IF to_regclass('analytics_events_default') IS NOT NULL THEN
+        EXECUTE 'SELECT EXISTS (SELECT 1 FROM analytics_events_default WHERE created_at >= $1 AND created_at < $2)'
+            INTO v_move USING v_start, v_end;
+    END IF;
+
+    IF v_move THEN
+        ALTER TABLE analytics_events DETACH PARTITION analytics_events_default;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF analytics_events FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+
+    IF v_move THEN
+        -- insert_xid conservé : les agrégats ne recomptent pas les lignes déplacées
+        EXECUTE format(
+            'INSERT INTO %I SELECT * FROM analytics_events_default WHERE created_at >= %L AND created_at < %L',
+            v_name, v_start, v_end
+        );
+        DELETE FROM analytics_events_default WHERE created_at >= v_start AND created_at < v_end;
+        ALTER TABLE analytics_events ATTACH PARTITION analytics_events_default DEFAULT;
+    END IF;
+
+    RETURN v_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Conversion de la table existante (no-op si elle est déjà partitionnée)
+DO $$
+DECLARE
+    v_month DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('analytics_events')) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE analytics_events RENAME TO analytics_events_unpartitioned;
+    ALTER TABLE analytics_events_unpartitioned RENAME CONSTRAINT analytics_events_pkey TO analytics_events_unpartitioned_pkey;
+    ALTER INDEX idx_analytics_events_session RENAME TO idx_analytics_events_unpartitioned_session;
+    ALTER INDEX idx_analytics_events_type RENAME TO idx_analytics_events_unpartitioned_type;
+    ALTER INDEX idx_analytics_events_mode RENAME TO idx_analytics_events_unpartitioned_mode;
+
+    CREATE TABLE analytics_events (
+        id BIGINT NOT NULL DEFAULT nextval('analytics_events_id_seq'),
+        session_id UUID NOT NULL,
+        event_type VARCHAR(50) NOT NULL,
+        event_category VARCHAR(50),
+        event_label VARCHAR(200),
+        event_value INTEGER,
+        portfolio_mode VARCHAR(50),
+        page_url VARCHAR(500),
+        referrer_url VARCHAR(500),
+        target_type VARCHAR(50),
+        target_id INTEGER,
+        metadata JSONB DEFAULT '{}',
+        -- Clé de partitionnement : fait partie de la clé primaire
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    -- La séquence doit survivre à la suppression de l'ancienne table
+    ALTER SEQUENCE analytics_events_id_seq OWNED BY analytics_events.id;
+
+    CREATE INDEX idx_analytics_events_session ON analytics_events(session_id, created_at DESC);
+    CREATE INDEX idx_analytics_events_type ON analytics_events(event_type, created_at DESC);
+    CREATE INDEX idx_analytics_events_mode ON analytics_events(portfolio_mode, created_at DESC);
+
+    CREATE TABLE analytics_events_default PARTITION OF analytics_events DEFAULT;
+
+    -- Une partition par mois de données existantes, puis le mois courant et les 3 suivants
+    FOR v_month IN
+        SELECT generate_series(
+            date_trunc('month', LEAST(COALESCE(MIN(created_at), LOCALTIMESTAMP), LOCALTIMESTAMP)),
+            date_trunc('month', LOCALTIMESTAMP) + INTERVAL '3 months',
+            INTERVAL '1 month'
+        )::DATE
+        FROM analytics_events_unpartitioned
+    LOOP
+        PERFORM create_analytics_events_partition(v_month);
+    END LOOP;
+
+    INSERT INTO analytics_events
+    SELECT id, session_id, event_type, event_category, event_label, event_value, portfolio_mode,
+           page_url, referrer_url, target_type, target_id, metadata,
+           COALESCE(created_at, LOCALTIMESTAMP)
+    FROM analytics_events_unpartitioned;
+
+    DROP TABLE analytics_events_unpartitioned;
+END $$;
+
+-- Transaction d'insertion de chaque événement : watermark exact des agrégats (section 4).
+-- Une seule instruction : NULL pour les lignes existantes (pas de réécriture), DEFAULT pour les
+-- suivantes, sans fenêtre où une insertion concurrente recevrait NULL.
+ALTER TABLE analytics_events
+    ADD COLUMN IF NOT EXISTS insert_xid XID8,
+    ALTER COLUMN insert_xid SET DEFAULT pg_current_xact_id();
+CREATE INDEX IF NOT EXISTS idx_analytics_events_insert_xid ON analytics_events(insert_xid);
+-- Lignes antérieures à la colonne (agrégées par id) : index qui ne grossit plus
+CREATE INDEX IF NOT EXISTS idx_analytics_events_legacy_id ON analytics_events(id) WHERE insert_xid IS NULL;
+
+COMMENT ON TABLE analytics_events IS 'Phase 3: User interaction tracking for analytics (Phase 4: monthly partitions)';
+
+-- Maintenance : crée les partitions des p_months_ahead prochains mois et détache celles
+-- entièrement plus anciennes que p_retention_months (supprimées si p_drop).
+-- Chaque mois est traité dans son propre bloc : un échec est renvoyé en action 'failed'.
+-- Les agrégats de la section 4 conservent l'historique des partitions supprimées.
+CREATE OR REPLACE FUNCTION maintain_analytics_partitions(
+    p_months_ahead INTEGER DEFAULT 3,
+    p_retention_months INTEGER DEFAULT 13,
+    p_drop BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE(action TEXT, partition_name TEXT) AS $$
+DECLARE
+    v_month DATE;
+    v_name TEXT;
+    v_cutoff DATE := (date_trunc('month', LOCALTIMESTAMP) - make_interval(months => p_retention_months))::DATE;
+BEGIN
+    -- Un seul processus de maintenance à la fois (plusieurs workers, n8n)
+    IF NOT pg_try_advisory_xact_lock(hashtext('maintain_analytics_partitions')) THEN
+        RETURN;
+    END IF;
+
+    FOR v_month IN
+        SELECT generate_series(
+            date_trunc('month', LOCALTIMESTAMP),
+            date_trunc('month', LOCALTIMESTAMP) + make_interval(months => p_months_ahead),
+            INTERVAL '1 month'
+        )::DATE
+    LOOP
+        -- Un mois en échec n'empêche ni les autres créations ni la rétention
+        BEGIN
+            v_name := create_analytics_events_partition(v_month);
+            IF v_name IS NOT NULL THEN
+                action := 'created';
+                partition_name := v_name;
+                RETURN NEXT;
+            END IF;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE WARNING 'analytics_events partition for % not created: %', to_char(v_month, 'YYYY-MM'), SQLERRM;
+            action := 'failed';
+            partition_name := 'analytics_events_p' || to_char(v_month, 'YYYYMM');
+            RETURN NEXT;
+        END;
+    END LOOP;
+
+    FOR v_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'analytics_events'::regclass
+          AND c.relname ~ '^analytics_events_p[0-9]{6}$'
+          AND to_date(right(c.relname, 6), 'YYYYMM') < v_cutoff
+        ORDER BY c.relname
+    LOOP
+        BEGIN
+            EXECUTE format('ALTER TABLE analytics_events DETACH PARTITION %I', v_name);
+            IF p_drop THEN
+                EXECUTE format('DROP TABLE %I', v_name);
+                action := 'dropped';
+            ELSE
+                action := 'detached';
+            END IF;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE WARNING 'analytics_events partition % not removed: %', v_name, SQLERRM;
+            action := 'failed';
+        END;
+        partition_name := v_name;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- 6. KEYSET PAGINATION INDEXES
+-- ============================================
+-- Un index par ordre de tri paginé (clé de tri, id) : chaque page est un parcours
+-- d'index borné par le curseur, quelle que soit sa profondeur
+CREATE INDEX IF NOT EXISTS idx_blog_published_keyset
+    ON blog_posts(published_at DESC NULLS LAST, id DESC) WHERE is_published = TRUE;
+-- Remplacé par idx_blog_published_keyset (même préfixe)
+DROP INDEX IF EXISTS idx_blog_published;
+
+-- portfolio_items et portfolio_events sont créées par le schéma n8n : ignorées si absentes
+DO $$
+BEGIN
+    IF to_regclass('portfolio_items') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_portfolio_items_created_keyset
+            ON portfolio_items(created_at DESC, id DESC);
+    END IF;
+    IF to_regclass('portfolio_events') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_portfolio_events_ts_keyset
+            ON portfolio_events(ts DESC, id DESC);
+    END IF;
+END $$;
+
+-- ============================================
+-- 7. FULL-TEXT SEARCH
+-- ============================================
+-- Colonnes tsvector générées (config 'french', comme le contenu) + index GIN, lues par /api/search.
+-- Poids : A = titre, B = résumé / mots-clés / technologies, C = texte long
+-- array_to_string n'est que STABLE : wrapper IMMUTABLE pour les colonnes générées (TEXT[] uniquement)
+CREATE OR REPLACE FUNCTION search_array_text(TEXT[])
+RETURNS TEXT AS $$
+    SELECT COALESCE(array_to_string($1, ' '), '')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('french', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('french', COALESCE(short_description, '') || ' ' || search_array_text(technologies)), 'B') ||
+    setweight(to_tsvector('french', COALESCE(long_description, '')), 'C')
+) STORED;
+
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('french', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('french', COALESCE(excerpt, '') || ' ' || search_array_text(keywords)), 'B') ||
+    setweight(to_tsvector('french', COALESCE(content, '')), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_projects_search ON projects USING GIN(search_vector);
+CREATE INDEX IF NOT EXISTS idx_blog_posts_search ON blog_posts USING GIN(search_vector);
+
+-- Le backend garde le classement de chaque recherche jusqu'au prochain changement des tables indexées.
+-- blog_posts n'a pas de version d'ETag : seules les colonnes indexées ou filtrées la notifient
+-- (les incréments de view_count du compteur de vues ne vident pas le classement)
+INSERT INTO table_versions (table_name) VALUES ('blog_posts') ON CONFLICT (table_name) DO NOTHING;
+DROP TRIGGER IF EXISTS trigger_blog_posts_version ON blog_posts;
+CREATE TRIGGER trigger_blog_posts_version
+AFTER INSERT OR DELETE OR TRUNCATE
+   OR UPDATE OF title, slug, excerpt, content, keywords, is_published ON blog_posts
+FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+-- portfolio_items est créée par le schéma n8n : ignorée si absente
+DO $$
+BEGIN
+    IF to_regclass('portfolio_items') IS NOT NULL THEN
+        ALTER TABLE portfolio_items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('french', COALESCE(title, '')), 'A') ||
+            setweight(to_tsvector('french',
+                COALESCE(short_pitch, '') || ' ' || search_array_text(tags) || ' ' || search_array_text(stack)), 'B') ||
+            setweight(to_tsvector('french', COALESCE(long_desc, '') || ' ' || COALESCE(impact, '')), 'C')
+        ) STORED;
+        -- Mêmes statuts que /api/search (brouillons et archives exclus)
+        CREATE INDEX IF NOT EXISTS idx_portfolio_items_search_public ON portfolio_items USING GIN(search_vector)
+            WHERE status IN ('approved', 'published');
+        -- Remplacé par idx_portfolio_items_search_public
+        DROP INDEX IF EXISTS idx_portfolio_items_search;
+    END IF;
+END $$;
+
+-- ============================================
+-- 8. SOCIAL SHARES: NORMALIZED COLUMNS + COUNTERS
+-- ============================================
+-- Les endpoints /api/share/* écrivent platform et event_kind en colonnes (indexables),
+-- et incrémentent portfolio_share_counters dans la même transaction : /api/social-analytics
+-- lit ces compteurs au lieu de parcourir portfolio_events (LIKE '%_share' + payload->>'platform')
+CREATE TABLE IF NOT EXISTS portfolio_share_counters (
+    repo VARCHAR(200) NOT NULL,
+    platform VARCHAR(30) NOT NULL,
+    shares INTEGER NOT NULL DEFAULT 0,
+    last_share_at TIMESTAMP,
+    PRIMARY KEY (repo, platform)
+);
+
+COMMENT ON TABLE portfolio_share_counters IS 'Phase 4: Social share counts per repo and platform';
+
+-- portfolio_events est créée par le schéma n8n : ignorée si absente
+DO $$
+BEGIN
+    IF to_regclass('portfolio_events') IS NULL THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE portfolio_events ADD COLUMN IF NOT EXISTS platform VARCHAR(30);
+    ALTER TABLE portfolio_events ADD COLUMN IF NOT EXISTS event_kind VARCHAR(30);
+
+    -- Reprise des partages déjà journalisés
+    UPDATE portfolio_events
+    SET platform = payload->>'platform', event_kind = 'share'
+    WHERE action LIKE '%\_share' AND event_kind IS NULL;
+
+    CREATE INDEX IF NOT EXISTS idx_portfolio_events_share_platform
+        ON portfolio_events(platform, ts DESC) WHERE event_kind = 'share';
+    CREATE INDEX IF NOT EXISTS idx_portfolio_events_share_repo
+        ON portfolio_events(repo, platform) WHERE event_kind = 'share';
+
+    IF NOT EXISTS (SELECT 1 FROM portfolio_share_counters) THEN
+        INSERT INTO portfolio_share_counters (repo, platform, shares, last_share_at)
+        SELECT repo, platform, COUNT(*), MAX(ts)
+        FROM portfolio_events
+        WHERE event_kind = 'share' AND repo IS NOT NULL AND platform IS NOT NULL
+        GROUP BY repo, platform;
+    END IF;
+END $$;
+
+-- ============================================
+-- 9. PROJECT ORDER PER MODE
+-- ============================================
+-- Une ligne par (projet, mode ciblé) avec la priorité du mode : /api/mode-projects lit l'ordre
+-- dans un index couvrant au lieu de filtrer target_modes et trier mode_priority->>mode sur tous
+-- les projets. Tenue à jour par trigger depuis projects (target_modes, mode_priority, ...).
+CREATE TABLE IF NOT EXISTS project_modes (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    mode_key VARCHAR(50) NOT NULL,
+    priority INTEGER,  -- NULL = pas de priorité pour ce mode (trié en dernier)
+    -- Copies de projects pour que l'index couvre filtre et tri
+    project_date DATE,
+    is_published BOOLEAN NOT NULL DEFAULT TRUE,
+    is_featured BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (project_id, mode_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_project_modes_order
+    ON project_modes(mode_key, priority DESC NULLS LAST, project_date DESC, project_id DESC)
+    INCLUDE (is_featured)
+    WHERE is_published = TRUE;
+
+-- Priorité entière du mode, NULL si absente ou invalide (une valeur mal saisie ne bloque pas l'écriture)
+CREATE OR REPLACE FUNCTION mode_priority_value(priorities JSONB, mode TEXT)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN priorities->>mode ~ '^-?[0-9]{1,9}$' THEN (priorities->>mode)::INTEGER END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION sync_project_modes()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM project_modes
+    WHERE project_id = NEW.id
+      AND NOT (mode_key = ANY(COALESCE(NEW.target_modes, '{}'::TEXT[])));
+
+    INSERT INTO project_modes (project_id, mode_key, priority, project_date, is_published, is_featured)
+    SELECT DISTINCT ON (m) NEW.id, m, mode_priority_value(NEW.mode_priority, m), NEW.project_date,
+           COALESCE(NEW.is_published, FALSE), COALESCE(NEW.is_featured, FALSE)
+    FROM unnest(NEW.target_modes) AS m
+    WHERE m IS NOT NULL
+    ON CONFLICT (project_id, mode_key) DO UPDATE
+        SET priority = EXCLUDED.priority,
+            project_date = EXCLUDED.project_date,
+            is_published = EXCLUDED.is_published,
+            is_featured = EXCLUDED.is_featured
+        WHERE (project_modes.priority, project_modes.project_date, project_modes.is_published, project_modes.is_featured)
+              IS DISTINCT FROM
+              (EXCLUDED.priority, EXCLUDED.project_date, EXCLUDED.is_published, EXCLUDED.is_featured);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_projects_sync_modes ON projects;
+CREATE TRIGGER trigger_projects_sync_modes
+AFTER INSERT OR UPDATE OF target_modes, mode_priority, project_date, is_published, is_featured ON projects
+FOR EACH ROW
+EXECUTE FUNCTION sync_project_modes();
+
+-- Reprise des projets existants (ré-exécutable)
+INSERT INTO project_modes (project_id, mode_key, priority, project_date, is_published, is_featured)
+SELECT DISTINCT ON (p.id, m) p.id, m, mode_priority_value(p.mode_priority, m), p.project_date,
+       COALESCE(p.is_published, FALSE), COALESCE(p.is_featured, FALSE)
+FROM projects p, unnest(p.target_modes) AS m
+WHERE m IS NOT NULL
+ON CONFLICT (project_id, mode_key) DO UPDATE
+    SET priority = EXCLUDED.priority,
+        project_date = EXCLUDED.project_date,
+        is_published = EXCLUDED.is_published,
+        is_featured = EXCLUDED.is_featured;
+
+DELETE FROM project_modes pm
+USING projects p
+WHERE pm.project_id = p.id
+  AND NOT (pm.mode_key = ANY(COALESCE(p.target_modes, '{}'::TEXT[])));
+
+COMMENT ON TABLE project_modes IS 'Phase 4: Projects per targeted mode with their priority, synced from projects by trigger';
+
+-- ============================================
+-- 10. GITHUB SYNC WATERMARKS
+-- ============================================
+-- Filigranes de la synchronisation GitHub du backend (github_sync.py) : ETag de chaque page de
+-- la liste des dépôts ('repos:<user>:<page>') et, par dépôt ('repo:<owner>/<name>'), ETag du
+-- README et pushed_at. Renvoyés en If-None-Match : un dépôt inchangé coûte une réponse 304.
+CREATE TABLE IF NOT EXISTS github_sync_state (
+    resource TEXT PRIMARY KEY,
+    etag TEXT,
+    pushed_at TIMESTAMPTZ,
+    synced_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE github_sync_state IS 'Phase 4: ETag / pushed_at watermarks of the incremental GitHub sync';
+
+-- Dernier README lu par dépôt ('repo:<owner>/<name>') et son ETag : un README inchangé (304)
+-- est renvoyé depuis cette copie. Écrit dès la synchronisation, indépendamment des filigranes.
+CREATE TABLE IF NOT EXISTS github_readme_cache (
+    resource TEXT PRIMARY KEY,
+    etag TEXT NOT NULL,
+    readme_text TEXT NOT NULL,
+    fetched_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE github_readme_cache IS 'Phase 4: Last README fetched per repository, served on 304 Not Modified';
+
+-- ============================================
+-- 11. LLM SUMMARY CACHE
+-- ============================================
+-- Résumés de projets déjà générés par le LLM, indexés par l'empreinte SHA-256 de ce qui est
+-- envoyé au modèle (README normalisé, métadonnées, version du prompt, modèle) : un dépôt
+-- inchangé n'est pas re-résumé. hits * inference_ms = temps d'inférence évité.
+CREATE TABLE IF NOT EXISTS llm_summary_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    repo_full_name TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    summary JSONB NOT NULL,
+    inference_ms INTEGER,
+    hits BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_summary_cache_repo ON llm_summary_cache(repo_full_name);
+
+COMMENT ON TABLE llm_summary_cache IS 'Phase 4: LLM project summaries keyed by a hash of the model input';